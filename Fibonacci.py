@@ -1,25 +1,168 @@
 # -*- coding: utf-8 -*-
-""
+# Fibonacci
 
+# Explanation:
+# This is an execution of the Fibonacci Sequence. The script used to keep every term in a list (Fib[-1] + Fib[-2]
+# appended n times), so reaching F(n) took n additions of numbers of up to 0.69 n bits and kept all of them:
+# quadratic time and memory. This module offers:
+# - fibonacci(n): F(n) by fast doubling, F(2k) = F(k) (2 F(k+1) - F(k)) and F(2k+1) = F(k)^2 + F(k+1)^2, walking
+#   the bits of n: O(log n) multiplications, and only the last few are of big numbers.
+# - fibonacci_terms(): a generator of the sequence that keeps only the last two terms, for printing or streaming it.
+# - fibonacci_mod(n, m): F(n) mod m by fast doubling on numbers below m. The sequence mod m repeats with the Pisano
+#   period of m, so a large n is first reduced modulo the period, computed from the prime factors of m and cached per
+#   m, when trial division finds those factors quickly; moduli with large prime factors skip the reduction.
 
+# Usage:
+#   python Fibonacci.py                     # asks for a number of terms and prints them, as before
+#   from Fibonacci import fibonacci, fibonacci_mod, fibonacci_terms
+#   fibonacci(10 ** 6); fibonacci_mod(10 ** 18, 10 ** 9 + 7)
 
-# This is an execution of the Fibonacci Sequence 
+import functools
+import math
 
+# Largest trial divisor fibonacci_mod tries when factoring for a Pisano period before giving up on the reduction
+MAX_TRIAL_DIVISOR = 10 ** 5
 
 
-terms = int(input("How many terms would you like for me to go to?"))
+def _doubling(n, modulus=None):
+    """(F(n), F(n + 1)), optionally mod modulus"""
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        # (F(k), F(k + 1)) -> (F(2k), F(2k + 1)), then one step more for a 1 bit
+        a, b = a * (2 * b - a), a * a + b * b
+        if bit == '1':
+            a, b = b, a + b
+        if modulus is not None:
+            a, b = a % modulus, b % modulus
+    return a, b
 
-Fib = [0,1]
 
-x = 0
+def fibonacci_pair(n):
+    """(F(n), F(n + 1)) by fast doubling"""
+    if n < 0:
+        raise ValueError('n must be at least 0')
+    return _doubling(n)
 
-while x < terms:
-    a = Fib[-1] + Fib[-2]
-    Fib.append(a)
-    x += 1 
-print(Fib)
 
-# to print not in a list
-for n in Fib:
-    print(n, end = " ")
-    
\ No newline at end of file
+def fibonacci(n):
+    """F(n) by fast doubling, with F(0) = 0 and F(1) = 1"""
+    if n < 0:
+        raise ValueError('n must be at least 0')
+    if n < 2:
+        return n
+    # The last doubling step computes only the term asked for: it is the one with the largest numbers
+    a, b = _doubling(n >> 1)
+    return a * (2 * b - a) if n % 2 == 0 else a * a + b * b
+
+
+def fibonacci_terms(count=None, modulus=None):
+    """F(0), F(1), ... (count terms, or without end), optionally mod modulus, keeping only the last two"""
+    a, b = 0, 1 if modulus is None else 1 % modulus
+    produced = 0
+    while count is None or produced < count:
+        yield a
+        a, b = b, a + b if modulus is None else (a + b) % modulus
+        produced += 1
+
+
+def _prime_factors(n, limit=None):
+    """{prime: exponent} of n by trial division; ValueError if that needs divisors above limit"""
+    factors = {}
+    p = 2
+    while p * p <= n:
+        if limit is not None and p > limit:
+            raise ValueError(f'Factoring {n} needs trial divisors above {limit}')
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+        p += 1 if p == 2 else 2
+    if n > 1:
+        factors[n] = factors.get(n, 0) + 1
+    return factors
+
+
+def _divisors(n, limit=None):
+    """Divisors of n in increasing order"""
+    divisors = [1]
+    for p, exponent in _prime_factors(n, limit).items():
+        divisors = [d * p ** k for d in divisors for k in range(exponent + 1)]
+    return sorted(divisors)
+
+
+def _is_period(length, modulus):
+    return _doubling(length, modulus) == (0, 1 % modulus)
+
+
+def _prime_power_period(p, exponent, limit=None):
+    """Pisano period of p ** exponent"""
+    if p == 2:
+        period = 3
+    elif p == 5:
+        period = 20
+    else:
+        # The period of a prime p divides p - 1 when p = ±1 mod 5 and 2 (p + 1) otherwise
+        bound = p - 1 if p % 5 in (1, 4) else 2 * (p + 1)
+        period = next(d for d in _divisors(bound, limit) if _is_period(d, p))
+    # The period of p ** k is the period of p times a power of p, at most p ** (k - 1)
+    modulus = p ** exponent
+    while not _is_period(period, modulus):
+        period *= p
+    return period
+
+
+def _period(modulus, limit=None):
+    if modulus < 1:
+        raise ValueError('modulus must be at least 1')
+    if modulus == 1:
+        return 1
+    # The period of a product of coprime factors is the lcm of their periods
+    return math.lcm(*(_prime_power_period(p, exponent, limit)
+                      for p, exponent in _prime_factors(modulus, limit).items()))
+
+
+@functools.lru_cache(maxsize=None)
+def pisano_period(modulus):
+    """Length of the period of the Fibonacci sequence mod modulus (cached per modulus)"""
+    return _period(modulus)
+
+
+@functools.lru_cache(maxsize=None)
+def _cheap_period(modulus):
+    """Pisano period of modulus if trial division up to MAX_TRIAL_DIVISOR finds it, else None (cached)"""
+    try:
+        return _period(modulus, MAX_TRIAL_DIVISOR)
+    except ValueError:
+        return None
+
+
+def fibonacci_mod(n, modulus):
+    """F(n) mod modulus, with n first reduced modulo the Pisano period when that is cheap and shortens the work"""
+    if n < 0:
+        raise ValueError('n must be at least 0')
+    if modulus < 1:
+        raise ValueError('modulus must be at least 1')
+    # The period is at most 6 modulus, so reducing only helps for larger n, and only if the factors of the modulus
+    # (and of p - 1 or 2 (p + 1) for its primes p) are found quickly; otherwise doubling on n is O(log n) anyway
+    if n >= 6 * modulus:
+        period = _cheap_period(modulus)
+        if period is not None:
+            n %= period
+    return _doubling(n, modulus)[0]
+
+
+def main():
+    terms = int(input("How many terms would you like for me to go to?"))
+
+    # The script's list held the first two terms and then `terms` more; print it as before, a term at a time
+    print('[', end='')
+    for index, n in enumerate(fibonacci_terms(terms + 2)):
+        print(n if not index else f', {n}', end='')
+    print(']')
+
+    # to print not in a list
+    for n in fibonacci_terms(terms + 2):
+        print(n, end=" ")
+
+
+if __name__ == '__main__':
+    main()
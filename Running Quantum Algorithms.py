@@ -90,3 +90,13 @@ job = execute(qc, backend)
 result = job.result()
 
 print(result.get_counts())
+
+# Submit several circuits without blocking on each result
+# AsyncJobPool keeps up to max_in_flight jobs in the remote queue at once and polls them with backoff,
+# reusing the backend (and its provider session) loaded above
+from quantum_algorithms.jobs import AsyncJobPool
+
+pool = AsyncJobPool(backend, max_in_flight=10)
+for result in pool.run_all([qc] * 5):
+    print(result.get_counts())
+pool.close()
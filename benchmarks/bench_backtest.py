@@ -0,0 +1,52 @@
+# Benchmark: walk-forward backtest time as the history grows, warm-started versus refitted from scratch
+#
+# Backtests synthetic data (see wbs_data.py) of every size in --years x --elements, with horizons 1 to 3 and the
+# first window at 10 pairs, and reports the time and the one-year-ahead MAE of:
+#   ridge          running sums updated with the new pairs (warm) versus a new Ridge at every origin (cold)
+#   random_forest  a third of the trees replaced at each origin (warm) versus a new forest (cold); forests are only
+#                  run up to --forest-limit elements
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wbs_data import synthetic_costs  # noqa: E402
+from wbs_forecast.backtest import backtest, summarize  # noqa: E402
+from wbs_forecast.ingest import normalize  # noqa: E402
+from wbs_forecast.pipeline import Prepared, prepare  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--years', type=int, nargs='+', default=[20, 40, 80])
+    parser.add_argument('--elements', type=int, nargs='+', default=[6, 32, 128])
+    parser.add_argument('--forest-limit', type=int, default=32)
+    args = parser.parse_args()
+
+    # Ridge with more elements than years warns about its ill-conditioned systems on every origin
+    warnings.filterwarnings('ignore', message='.*ill-conditioned')
+    # Warm up, so the first case does not pay for importing scikit-learn
+    backtest(Prepared(prepare(normalize(synthetic_costs(6, 20)))), 'ridge', warm=False)
+    print(f'{"model":<14} {"years":>5} {"elements":>8} {"origins":>7} {"warm (s)":>8} {"cold (s)":>8} '
+          f'{"speed-up":>8} {"warm MAE":>9} {"cold MAE":>9}')
+    for years in args.years:
+        for elements in args.elements:
+            prepared = Prepared(prepare(normalize(synthetic_costs(elements, years)), elements=None))
+            models = ['ridge'] + (['random_forest'] if elements <= args.forest_limit else [])
+            for model in models:
+                runs = {}
+                for warm in (True, False):
+                    start = time.perf_counter()
+                    results = backtest(prepared, model, warm=warm)
+                    runs[warm] = (time.perf_counter() - start, summarize(results)['mae'].iloc[0])
+                (warm_s, warm_mae), (cold_s, cold_mae) = runs[True], runs[False]
+                print(f'{model:<14} {years:5d} {elements:8d} {years - 11:7d} {warm_s:8.2f} {cold_s:8.2f} '
+                      f'{cold_s / warm_s:7.1f}x {warm_mae:9.0f} {cold_mae:9.0f}')
+
+
+if __name__ == '__main__':
+    main()
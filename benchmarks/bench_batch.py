@@ -0,0 +1,53 @@
+# Benchmark: forecasting every element of a sheet, in elements per second
+#
+# Forecasts synthetic sheets (see wbs_data.py) of up to 50,000 elements with wbs_forecast.batch, streaming the rows
+# to a Parquet file, for:
+#   ridge, linear   all batches fitted at once with NumPy
+#   ridge (loop)    the same models fitted batch by batch with scikit-learn, as the scripts fit theirs
+#   random_forest   one forest per batch, in 1 and --jobs worker processes
+# The sheet is built in memory, so the times exclude reading the workbook (see bench_ingest.py).
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wbs_data import synthetic_costs  # noqa: E402
+from wbs_forecast.batch import forecast_frame  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--elements', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--years', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count())
+    parser.add_argument('--loop-limit', type=int, default=10000, help='most elements for the batch-by-batch runs')
+    parser.add_argument('--forest-limit', type=int, default=5000, help='most elements for the random forests')
+    args = parser.parse_args()
+
+    print(f'CPUs: {os.cpu_count()}')
+    print(f'{"model":<16} {"jobs":>4} {"elements":>8} {"seconds":>8} {"elements/s":>10}')
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'forecasts.parquet')
+        # Warm up, so the first case does not pay for importing scikit-learn and pyarrow
+        forecast_frame(synthetic_costs(100, args.years), output, 'ridge', args.batch_size, vectorize=False)
+        for elements in args.elements:
+            df = synthetic_costs(elements, args.years)
+            cases = [('ridge', 'ridge', 1, True), ('linear', 'linear', 1, True)]
+            if elements <= args.loop_limit:
+                cases.append(('ridge (loop)', 'ridge', 1, False))
+            if elements <= args.forest_limit:
+                cases += [('random_forest', 'random_forest', jobs, True) for jobs in sorted({1, args.jobs})]
+            for label, model, jobs, vectorize in cases:
+                start = time.perf_counter()
+                count = forecast_frame(df, output, model, args.batch_size, jobs, vectorize=vectorize)
+                seconds = time.perf_counter() - start
+                print(f'{label:<16} {jobs:4d} {count:8d} {seconds:8.2f} {count / seconds:10.0f}')
+
+
+if __name__ == '__main__':
+    main()
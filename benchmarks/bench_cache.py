@@ -0,0 +1,64 @@
+# Result Cache Benchmark
+
+# Explanation:
+# Runs the example suite (every script circuit, plus the scaled versions) twice against a fresh on-disk cache,
+# once on the local simulator and once through Aer, and reports the wall-clock time of each pass and the hit rate.
+
+# Usage:
+#   python benchmarks/bench_cache.py --qubits 16 --max-mb 64
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum_algorithms.cache import ResultCache
+from quantum_algorithms.circuits import example_circuits, qft_circuit
+from quantum_algorithms.runner import run_circuit, run_statevector
+
+from bench_peephole import script_circuits
+
+
+def run_suite(circuits, statevector_circuits, cache, backend):
+    """Run every circuit once and return the elapsed time"""
+    start = time.perf_counter()
+    for qc in circuits:
+        run_circuit(qc, backend=backend, seed=42, cache=cache)
+    for qc in statevector_circuits:
+        run_statevector(qc, cache=cache)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--qubits', type=int, default=16)
+    parser.add_argument('--max-mb', type=float, default=64)
+    args = parser.parse_args()
+
+    measured = [qc for qc in script_circuits().values() if qc.num_clbits]
+    measured += [qc for qc in example_circuits(args.qubits).values() if qc.num_clbits]
+    statevector = [qft_circuit(3), qft_circuit(4), qft_circuit(args.qubits)]
+
+    backends = {'local': None}
+    try:
+        from qiskit_aer import AerSimulator
+        backends['aer'] = AerSimulator()
+    except ImportError:
+        pass
+
+    for label, backend in backends.items():
+        with tempfile.TemporaryDirectory() as path:
+            cache = ResultCache(path, max_bytes=int(args.max_mb * 1024 ** 2))
+            first = run_suite(measured, statevector, cache, backend)
+            second = run_suite(measured, statevector, cache, backend)
+            stats = cache.stats()
+            cache.close()
+        print(f'{label:<6} first run {first:8.3f} s   second run {second:8.3f} s   '
+              f'hit rate {stats["hit_rate"]:.0%}   entries {stats["entries"]}   {stats["bytes"] / 1024:.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
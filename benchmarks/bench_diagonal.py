@@ -0,0 +1,55 @@
+# Diagonal Batching Benchmark
+
+# Explanation:
+# Simulates the QFT example for a range of qubit counts with three strategies for its cp gates:
+# - per-gate: every gate applied as a matrix contraction (one sweep each)
+# - per-gate diagonal: every diagonal gate applied as its own element-wise multiply
+# - batched: consecutive diagonal gates combined into one phase vector and applied once
+# Gate fusion is left off so only the effect of the diagonal handling is measured.
+
+# Usage:
+#   python benchmarks/bench_diagonal.py --qubits 16 20 24 28
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum_algorithms.circuits import qft_circuit
+from quantum_algorithms.diagonal import batch_diagonal_gates
+from quantum_algorithms.gates import circuit_to_gates
+from quantum_algorithms.statevector import run_gates
+
+
+def time_gates(gates, num_qubits, repeat):
+    """Best wall-clock time of simulating a gate list"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_gates(gates, num_qubits)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--qubits', type=int, nargs='+', default=[16, 18, 20, 22, 24])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'n':>4}{'passes':>8}{'batched':>9}{'per-gate s':>12}{'diag s':>10}{'batched s':>11}{'speedup':>9}")
+    for n in args.qubits:
+        gates, _ = circuit_to_gates(qft_circuit(n))
+        per_gate_diagonal = batch_diagonal_gates(gates, min_run=len(gates) + 1)
+        batched = batch_diagonal_gates(gates)
+        per_gate_time = time_gates(gates, n, args.repeat)
+        diagonal_time = time_gates(per_gate_diagonal, n, args.repeat)
+        batched_time = time_gates(batched, n, args.repeat)
+        print(f'{n:>4}{len(gates):>8}{len(batched):>9}{per_gate_time:>12.3f}{diagonal_time:>10.3f}'
+              f'{batched_time:>11.3f}{per_gate_time / batched_time:>8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
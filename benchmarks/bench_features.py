@@ -0,0 +1,88 @@
+# Benchmark: memory of lag features for 10k elements x 20 lags
+#
+# Builds the features of a synthetic sheet (see wbs_data.py) of --elements elements and --years years, prepared as
+# the pipeline does (years x elements, float64), and reports each method's peak memory allocated while building
+# (tracemalloc, which sees NumPy's and pandas' buffers), the memory the result holds and the time:
+#   shift + concat     pandas: one shifted float64 copy of the frame per lag, concatenated into one wide frame
+#   strided lags       build_features: the lags as a strided view of one float32 copy of the values
+#   + means, growth    the same with rolling means over --windows and the growth rate, which are real blocks
+#   pandas, all        shift + concat with the same rolling means and growth, for comparison
+#   X matrix           the strided features concatenated into the one float32 matrix a model is fitted on
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wbs_data import synthetic_costs  # noqa: E402
+from wbs_forecast.features import build_features  # noqa: E402
+
+
+def measure(function):
+    """(peak MiB allocated while running, seconds, result)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20, seconds, result
+
+
+def pandas_features(data, lags, windows=(), growth=False):
+    """Lags, rolling means and growth by shift and concat, as one would write them with pandas"""
+    import pandas as pd
+    # Oldest lag first, the order of build_features' columns
+    blocks = {f'lag_{lag}': data.shift(lag) for lag in range(lags, 0, -1)}
+    for window in windows:
+        blocks[f'mean_{window}'] = data.rolling(window).mean().shift(1)
+    if growth:
+        blocks['growth'] = data.pct_change(fill_method=None).shift(1)
+    return pd.concat(blocks, axis=1).iloc[max([lags] + list(windows)):]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--elements', type=int, default=10000)
+    parser.add_argument('--years', type=int, default=40)
+    parser.add_argument('--lags', type=int, default=20)
+    parser.add_argument('--windows', type=int, nargs='*', default=[3, 5, 10])
+    args = parser.parse_args()
+
+    data = synthetic_costs(args.elements, args.years).T
+    data.index = data.index.astype(int)
+    print(f'{args.elements} elements x {args.years} years, {args.lags} lags: the prepared frame is '
+          f'{data.to_numpy().nbytes / 2 ** 20:.1f} MiB')
+    print(f'{"method":<16} {"peak MiB":>9} {"held MiB":>9} {"seconds":>8} {"columns":>9}')
+
+    def report(label, peak, held, seconds, columns):
+        print(f'{label:<16} {peak:9.1f} {held:9.1f} {seconds:8.3f} {columns:9d}')
+
+    peak, seconds, frame = measure(lambda: pandas_features(data, args.lags))
+    report('shift + concat', peak, frame.memory_usage(index=False).sum() / 2 ** 20, seconds, frame.shape[1])
+    del frame
+
+    peak, seconds, features = measure(lambda: build_features(data, args.lags))
+    report('strided lags', peak, features.nbytes / 2 ** 20, seconds, len(features.columns()))
+
+    peak, seconds, features = measure(lambda: build_features(data, args.lags, args.windows, growth=True))
+    report('+ means, growth', peak, features.nbytes / 2 ** 20, seconds, len(features.columns()))
+
+    peak, seconds, frame = measure(lambda: pandas_features(data, args.lags, args.windows, growth=True))
+    report('pandas, all', peak, frame.memory_usage(index=False).sum() / 2 ** 20, seconds, frame.shape[1])
+    expected = frame.to_numpy()
+    del frame
+
+    peak, seconds, X = measure(lambda: features.X)
+    report('X matrix', peak, X.nbytes / 2 ** 20, seconds, X.shape[1])
+    # Same features in the same order, up to float32 rounding
+    assert np.allclose(X, expected[:len(X)], rtol=1e-5, atol=1e-6)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# Fibonacci Benchmark
+
+# Explanation:
+# Times F(n) for each --n with:
+# - list loop: the script's original loop (append Fib[-1] + Fib[-2] to a list). It keeps every term, about
+#   0.35 n^2 bits in all (43 GB for n = 10^6), so it only runs for n up to --list-max; above that its memory is
+#   reported instead.
+# - streaming loop: the same additions through fibonacci_terms, keeping two terms. It runs for n up to --loop-max;
+#   above that its time is estimated from the largest n measured, as the additions make it quadratic.
+# - fast doubling: fibonacci(n).
+# Every computed F(n) is checked against fast doubling, and fibonacci_mod is timed for a large n and modulus.
+
+# Usage:
+#   python benchmarks/bench_fibonacci.py --n 1000000 10000000
+
+import argparse
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Fibonacci import fibonacci, fibonacci_mod, fibonacci_terms, pisano_period  # noqa: E402
+
+# Bits of F(n) per unit of n: log2 of the golden ratio
+BITS_PER_TERM = math.log2((1 + math.sqrt(5)) / 2)
+
+
+def list_loop(n):
+    """F(n) as the script computed it, with the whole sequence in a list"""
+    Fib = [0, 1]
+    x = 1
+    while x < n:
+        Fib.append(Fib[-1] + Fib[-2])
+        x += 1
+    return Fib[n]
+
+
+def streaming_loop(n):
+    """F(n) by the same additions, keeping two terms"""
+    for value in fibonacci_terms(n + 1):
+        pass
+    return value
+
+
+def timed(function, n):
+    start = time.perf_counter()
+    value = function(n)
+    return time.perf_counter() - start, value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n', type=int, nargs='+', default=[10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7])
+    parser.add_argument('--list-max', type=int, default=30000)
+    parser.add_argument('--loop-max', type=int, default=10 ** 6)
+    args = parser.parse_args()
+
+    print(f'{"n":>10} {"method":<16} {"seconds":>10} {"peak MiB":>10}')
+    loop_rate = None
+    for n in args.n:
+        seconds, expected = timed(fibonacci, n)
+        print(f'{n:10d} {"fast doubling":<16} {seconds:10.4f} {"":>10}')
+
+        if n <= args.list_max:
+            tracemalloc.start()
+            seconds, value = timed(list_loop, n)
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+            assert value == expected
+            print(f'{n:10d} {"list loop":<16} {seconds:10.4f} {peak:10.1f}')
+        else:
+            memory = BITS_PER_TERM * n * n / 2 / 8 / 2 ** 20
+            print(f'{n:10d} {"list loop":<16} {"skipped":>10} {f"~{memory:.0f}":>10}')
+
+        if n <= args.loop_max:
+            seconds, value = timed(streaming_loop, n)
+            assert value == expected
+            loop_rate = seconds / n ** 2
+            print(f'{n:10d} {"streaming loop":<16} {seconds:10.4f} {"":>10}')
+        elif loop_rate is not None:
+            print(f'{n:10d} {"streaming loop":<16} {f"~{loop_rate * n ** 2:.0f}":>10} {"(estimate)":>10}')
+
+    modulus = 10 ** 9 + 7
+    start = time.perf_counter()
+    period = pisano_period(modulus)
+    value = fibonacci_mod(10 ** 100, modulus)
+    print(f'F(10^100) mod {modulus} = {value} (Pisano period {period}): {time.perf_counter() - start:.6f} s')
+
+
+if __name__ == '__main__':
+    main()
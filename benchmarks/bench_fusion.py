@@ -0,0 +1,52 @@
+# Gate Fusion Benchmark
+
+# Explanation:
+# Simulates the example circuits scaled to 20+ qubits with and without gate fusion and reports
+# the number of statevector sweeps and the runtime of each variant.
+
+# Usage:
+#   python benchmarks/bench_fusion.py --qubits 20 22
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum_algorithms.circuits import example_circuits
+from quantum_algorithms.fusion import fuse_gates
+from quantum_algorithms.gates import circuit_to_gates
+from quantum_algorithms.statevector import run_gates
+
+
+def time_gates(gates, num_qubits, repeat):
+    """Best wall-clock time of simulating a gate list"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_gates(gates, num_qubits)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--qubits', type=int, nargs='+', default=[20, 22])
+    parser.add_argument('--max-fused-qubits', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'circuit':<20}{'n':>4}{'sweeps':>8}{'fused':>8}{'plain s':>10}{'fused s':>10}{'speedup':>9}")
+    for n in args.qubits:
+        for name, qc in example_circuits(n).items():
+            gates, _ = circuit_to_gates(qc)
+            fused = fuse_gates(gates, qc.num_qubits, max_qubits=args.max_fused_qubits)
+            plain_time = time_gates(gates, qc.num_qubits, args.repeat)
+            fused_time = time_gates(fused, qc.num_qubits, args.repeat)
+            print(f'{name:<20}{qc.num_qubits:>4}{len(gates):>8}{len(fused):>8}'
+                  f'{plain_time:>10.3f}{fused_time:>10.3f}{plain_time / fused_time:>8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# Benchmark: import time of the package versus the scripts' top-level imports
+#
+# Every import is timed in a fresh interpreter, so nothing is already cached in sys.modules. The wall-clock time
+# includes interpreter startup; the `-X importtime` column is the cumulative time of the imported module alone.
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = {
+    'python startup': 'pass',
+    'shor classical helpers': 'from quantum_algorithms.shor import shors_classical_part',
+    'package': 'import quantum_algorithms',
+    'package.qft (circuits)': 'from quantum_algorithms import qft',
+    'runner (numpy + qiskit)': 'from quantum_algorithms.runner import run_circuit',
+    'script imports': 'from qiskit import QuantumCircuit, Aer, execute\n'
+                      'from qiskit.visualization import plot_histogram',
+}
+
+
+def wall_time(statement, repeats):
+    """Median wall-clock time of a fresh interpreter that runs statement"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], cwd=ROOT, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def import_time(statement):
+    """Total cumulative -X importtime of the top-level modules imported by statement, in seconds"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT, check=True,
+                            capture_output=True, text=True)
+    total = 0
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)', line)
+        # Only count modules at the top of the import tree, their children are included in the cumulative time
+        if match and len(match.group(2)) == 1:
+            total += int(match.group(1))
+    return total / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = import_time('pass')
+    print(f'{"import":<26} {"wall (s)":>9} {"importtime (s)":>15}')
+    for label, statement in STATEMENTS.items():
+        print(f'{label:<26} {wall_time(statement, args.repeats):9.3f} '
+              f'{import_time(statement) - baseline:15.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# Benchmark: updating a model for one new year versus rebuilding it
+#
+# For synthetic sheets (see wbs_data.py) of --elements elements (all modelled together) and --years years, builds the
+# incremental state from every year but the last, then times adding the last year:
+#   rebuild      prepare the whole sheet and fit a new model (what the scripts do every year)
+#   incremental  hash the years, transpose and append the new year, and update the stored model (rank-one update for
+#                ridge, 25 new trees for the random forest)
+# Both include loading and saving the stored state; neither includes reading the workbook (see bench_ingest.py).
+# MAE is the one-step-ahead error of the model built on the old years on the new year, and the forecast difference
+# is the largest relative difference between the two models' forecasts for the year after.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wbs_data import synthetic_costs  # noqa: E402
+from wbs_forecast.incremental import update_frame  # noqa: E402
+
+
+def best_of(repeat, function):
+    """Shortest of repeat runs, and the last result"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--elements', type=int, nargs='+', default=[6, 32, 128])
+    parser.add_argument('--years', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'{"model":<14} {"elements":>8} {"rebuild (s)":>11} {"update (s)":>10} {"speed-up":>8} {"MAE":>8} '
+          f'{"forecast diff":>13}')
+    with tempfile.TemporaryDirectory() as directory:
+        # Warm up, so the first case does not pay for importing scikit-learn
+        update_frame(synthetic_costs(6, 20), 'warm-up', 'ridge', None, directory=directory)
+        for elements in args.elements:
+            full = synthetic_costs(elements, args.years)
+            old = full.iloc[:, :-1]
+            for model in ('ridge', 'random_forest'):
+                def rebuild():
+                    return update_frame(full, 'rebuild', model, None, directory=directory, rebuild=True)
+
+                def incremental():
+                    update_frame(old, 'incremental', model, None, directory=directory)
+                    start = time.perf_counter()
+                    result = update_frame(full, 'incremental', model, None, directory=directory)
+                    result.seconds = time.perf_counter() - start
+                    return result
+
+                rebuild_s, rebuilt = best_of(args.repeat, rebuild)
+                updated = min((incremental() for _ in range(args.repeat)), key=lambda result: result.seconds)
+                assert updated.mode == 'incremental'
+                difference = np.abs(updated.forecast.to_numpy() / rebuilt.forecast.to_numpy() - 1).max()
+                print(f'{model:<14} {elements:8d} {rebuild_s:11.3f} {updated.seconds:10.3f} '
+                      f'{rebuild_s / updated.seconds:7.1f}x {updated.new_year_mae:8.0f} {difference:13.2%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Benchmark: loading a WBS workbook with pd.read_excel versus the columnar cache
+#
+# Writes a synthetic workbook (see wbs_data.py) and times, for each size:
+#   read_excel     pd.read_excel(path, index_col=0), what every run of the scripts does
+#   first load     load_workbook on an empty cache: hash + read_excel + columnar write
+#   cached         load_workbook when the workbook is unchanged (size and mtime match)
+#   touched        load_workbook after the mtime changed but not the content (hash, then read the cache)
+# for the Feather and Parquet caches.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from wbs_data import write_workbook  # noqa: E402
+from wbs_forecast.ingest import load_workbook  # noqa: E402
+
+
+def timed(function, repeat=1):
+    """Best time of repeat calls, and the last result"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--elements', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--years', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f'{"elements":>8} {"years":>5} {"xlsx MB":>8} {"format":>8} {"read_excel":>10} {"first load":>10} '
+          f'{"cached":>8} {"touched":>8} {"speedup":>8}')
+    with tempfile.TemporaryDirectory() as directory:
+        for elements in args.elements:
+            path = os.path.join(directory, f'wbs_{elements}.xlsx')
+            write_workbook(path, elements, args.years)
+            size = os.path.getsize(path) / 1e6
+            reference, read_excel = timed(lambda: pd.read_excel(path, index_col=0))
+            for fmt in ('feather', 'parquet'):
+                cache = os.path.join(directory, f'cache_{fmt}_{elements}')
+                _, first = timed(lambda: load_workbook(path, fmt=fmt, cache=cache))
+                df, cached = timed(lambda: load_workbook(path, fmt=fmt, cache=cache), repeat=5)
+                os.utime(path)
+                _, touched = timed(lambda: load_workbook(path, fmt=fmt, cache=cache))
+                assert df.shape == reference.shape and (df.to_numpy() == reference.to_numpy()).all()
+                print(f'{elements:8d} {args.years:5d} {size:8.1f} {fmt:>8} {read_excel:10.3f} {first:10.3f} '
+                      f'{cached:8.4f} {touched:8.4f} {read_excel / cached:7.0f}x')
+
+
+if __name__ == '__main__':
+    main()
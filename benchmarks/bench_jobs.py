@@ -0,0 +1,58 @@
+# Asynchronous Submission Benchmark
+
+# Explanation:
+# Runs the same set of Bernstein-Vazirani circuits against FakeQueueBackend twice: with the blocking pattern of
+# `Running Quantum Algorithms.py` (submit, wait for the result, submit the next one) and through AsyncJobPool.
+# Queue delays are given in simulated seconds and compressed with --time-scale, and the throughput is reported
+# in circuits per simulated hour.
+
+# Usage:
+#   python benchmarks/bench_jobs.py --circuits 40 --queue-delay 30 120 300 --in-flight 20
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum_algorithms.circuits import bernstein_vazirani_circuit
+from quantum_algorithms.jobs import AsyncJobPool, FakeQueueBackend
+
+
+def hidden_strings(count, n):
+    """Distinct hidden strings for the benchmark circuits"""
+    return [format(i + 1, f'0{n}b') for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--circuits', type=int, default=40)
+    parser.add_argument('--qubits', type=int, default=8)
+    parser.add_argument('--queue-delay', type=float, nargs='+', default=[30.0, 120.0, 300.0])
+    parser.add_argument('--in-flight', type=int, default=20)
+    parser.add_argument('--time-scale', type=float, default=0.005)
+    args = parser.parse_args()
+
+    circuits = [bernstein_vazirani_circuit(s) for s in hidden_strings(args.circuits, args.qubits)]
+    print(f"{'queue delay':>12}{'blocking /h':>14}{'async /h':>12}{'speedup':>10}")
+    for delay in args.queue_delay:
+        scale = args.time_scale
+        backend = FakeQueueBackend(queue_delay=delay, time_scale=scale, seed=1)
+        start = time.perf_counter()
+        for qc in circuits:
+            backend.run(qc, seed_simulator=1).result().get_counts()
+        blocking = args.circuits / ((time.perf_counter() - start) / scale) * 3600
+
+        backend = FakeQueueBackend(queue_delay=delay, time_scale=scale, seed=1)
+        pool = AsyncJobPool(backend, max_in_flight=args.in_flight, poll_interval=5 * scale,
+                            max_poll_interval=60 * scale)
+        start = time.perf_counter()
+        pool.run_all(circuits, seed_simulator=1)
+        pooled = args.circuits / ((time.perf_counter() - start) / scale) * 3600
+        pool.close()
+        print(f'{delay:>11.0f}s{blocking:>14.0f}{pooled:>12.0f}{pooled / blocking:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
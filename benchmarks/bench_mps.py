@@ -0,0 +1,72 @@
+# Benchmark: matrix product state versus dense simulation of the QFT and phase estimation
+#
+# "qft" is the QFT example on a basis-state input, "qft product" the QFT of a random product state (every qubit
+# rotated by a random RY angle), which is more entangled, and "qpe" the phase estimation example. The dense
+# simulator only runs up to --max-dense qubits; where it runs, "infidelity" is 1 - |<dense|mps>|^2 and can be
+# compared with the truncation error the MPS estimates on its own.
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qiskit import QuantumCircuit  # noqa: E402
+
+from quantum_algorithms.circuits import qft, qft_circuit, qpe_circuit  # noqa: E402
+from quantum_algorithms.gates import circuit_to_gates  # noqa: E402
+from quantum_algorithms.mps import run_mps  # noqa: E402
+from quantum_algorithms.peephole import optimize_circuit  # noqa: E402
+from quantum_algorithms.statevector import prepare_gates, run_gates  # noqa: E402
+
+
+def product_qft_circuit(n, seed=0):
+    """QFT of a random product state"""
+    rng = np.random.default_rng(seed)
+    qc = QuantumCircuit(n)
+    for qubit in range(n):
+        qc.ry(rng.uniform(0, np.pi), qubit)
+    qft(qc, n)
+    return qc
+
+
+def timed(function):
+    """Run function and return (result, seconds)"""
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[12, 16, 20, 24, 60, 100])
+    parser.add_argument('--max-dense', type=int, default=24)
+    parser.add_argument('--max-bond', type=int, default=32)
+    args = parser.parse_args()
+
+    print(f'{"circuit":<12} {"qubits":>6} {"dense (s)":>10} {"mps (s)":>9} {"max bond":>8} {"swaps":>6} '
+          f'{"trunc. error":>12} {"infidelity":>10}')
+    for size in args.sizes:
+        circuits = {
+            'qft': qft_circuit(size),
+            'qft product': product_qft_circuit(size),
+            'qpe': qpe_circuit(size - 1, measure=False),
+        }
+        for name, qc in circuits.items():
+            gates, _ = circuit_to_gates(optimize_circuit(qc, absorb_swaps=False))
+            n = qc.num_qubits
+            state, elapsed = timed(lambda: run_mps(gates, n, max_bond=args.max_bond))
+            dense_time = infidelity = ''
+            if n <= args.max_dense:
+                dense, seconds = timed(lambda: run_gates(prepare_gates(gates, n), n).reshape(-1))
+                dense_time = f'{seconds:.3f}'
+                infidelity = f'{1 - abs(np.vdot(dense, state.to_statevector())) ** 2:.1e}'
+            print(f'{name:<12} {n:6d} {dense_time:>10} {elapsed:9.3f} {max(state.bond_dimensions()):8d} '
+                  f'{state.swaps:6d} {state.truncation_error:12.1e} {infidelity:>10}')
+
+
+if __name__ == '__main__':
+    main()
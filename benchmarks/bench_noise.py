@@ -0,0 +1,69 @@
+# Benchmark: noisy simulation with the density-matrix and trajectory engines
+#
+# Convergence: total variation distance between the trajectory-averaged outcome probabilities and the exact
+# density-matrix ones, for growing numbers of trajectories. Throughput: trajectories per second as the circuits grow.
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum_algorithms.circuits import grover_circuit, qpe_circuit, qft_circuit  # noqa: E402
+from quantum_algorithms.gates import circuit_to_gates  # noqa: E402
+from quantum_algorithms.noise import (NoiseModel, density_matrix_probabilities,  # noqa: E402
+                                      trajectory_probabilities)
+from quantum_algorithms.peephole import optimize_circuit  # noqa: E402
+
+
+def gates_of(qc):
+    """Optimized gate list of qc, as the noisy simulator sees it"""
+    gates, _ = circuit_to_gates(optimize_circuit(qc))
+    return gates
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depolarizing', type=float, default=0.01)
+    parser.add_argument('--damping', type=float, default=0.005)
+    parser.add_argument('--trajectories', type=int, default=200)
+    args = parser.parse_args()
+    noise = NoiseModel(args.depolarizing, amplitude_damping=args.damping)
+    print(f'{noise}')
+
+    print('\nConvergence of trajectories to the density matrix (total variation distance)')
+    for name, qc in [('grover n=5', grover_circuit(5)), ('qpe n_count=6', qpe_circuit(6))]:
+        gates = gates_of(qc)
+        start = time.perf_counter()
+        exact = density_matrix_probabilities(gates, qc.num_qubits, noise)
+        dm_time = time.perf_counter() - start
+        row = [f'{name:<14} density matrix {dm_time:6.3f} s |']
+        for trajectories in (10, 100, 1000, 10000):
+            probabilities = trajectory_probabilities(gates, qc.num_qubits, noise, trajectories, seed=0)
+            row.append(f'T={trajectories}: {0.5 * np.abs(probabilities - exact).sum():.4f}')
+        print('  '.join(row))
+
+    print('\nThroughput')
+    print(f'{"circuit":<16} {"gates":>6} {"density matrix (s)":>19} {"trajectories/s":>15}')
+    for name, qc in [('grover n=4', grover_circuit(4)), ('grover n=8', grover_circuit(8)),
+                     ('qft n=10', qft_circuit(10)), ('qft n=12', qft_circuit(12)), ('qft n=16', qft_circuit(16)),
+                     ('qft n=20', qft_circuit(20))]:
+        gates = gates_of(qc)
+        n = qc.num_qubits
+        dm = ''
+        if n <= 10:
+            start = time.perf_counter()
+            density_matrix_probabilities(gates, n, noise)
+            dm = f'{time.perf_counter() - start:.3f}'
+        trajectories = args.trajectories if n <= 16 else max(4, args.trajectories // 20)
+        start = time.perf_counter()
+        trajectory_probabilities(gates, n, noise, trajectories, seed=0)
+        rate = trajectories / (time.perf_counter() - start)
+        print(f'{name:<16} {len(gates):6d} {dm:>19} {rate:15.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# Benchmark: writing 1M prediction rows
+#
+# Builds --rows prediction rows (model, wbs, year, forecast: 4 models x 5 years x elements) in chunks of --chunk rows,
+# as a batch forecast produces them, and times:
+#   run (Parquet)  PredictionWriter streaming the chunks into a new run of the prediction dataset
+#   read back      read_predictions over that run
+#   CSV            ForecastWriter appending the chunks to one CSV file
+#   to_excel       DataFrame.to_excel of the first --excel-rows rows, as the scripts wrote their forecasts (Excel's
+#                  writers are too slow for 1M rows in a benchmark; rows per second shows how it scales)
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wbs_data import element_ids  # noqa: E402
+from wbs_forecast.output import ForecastWriter, PredictionWriter, read_predictions  # noqa: E402
+
+MODELS = ('random_forest', 'extra_trees', 'linear', 'ridge')
+YEARS = range(2025, 2030)
+
+
+def prediction_chunks(rows, chunk):
+    """Prediction rows in frames of chunk rows"""
+    import pandas as pd
+    elements = np.array(element_ids(rows // (len(MODELS) * len(YEARS)) + 1))
+    per_model = len(elements) * len(YEARS)
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, chunk):
+        index = np.arange(start, min(start + chunk, rows))
+        yield pd.DataFrame({'model': np.array(MODELS)[index // per_model],
+                            'wbs': elements[index % per_model // len(YEARS)],
+                            'year': np.array(YEARS)[index % len(YEARS)],
+                            'forecast': rng.lognormal(10, 1, len(index))})
+
+
+def size_mib(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 2 ** 20
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--chunk', type=int, default=50000)
+    parser.add_argument('--excel-rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    chunks = list(prediction_chunks(args.rows, args.chunk))
+    print(f'{"writer":<16} {"rows":>8} {"seconds":>8} {"rows/s":>10} {"MiB":>7}')
+
+    def report(label, rows, seconds, path):
+        print(f'{label:<16} {rows:8d} {seconds:8.2f} {rows / seconds:10.0f} {size_mib(path):7.1f}')
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = os.path.join(directory, 'predictions')
+        start = time.perf_counter()
+        with PredictionWriter(root) as writer:
+            for frame in chunks:
+                writer.write(frame)
+        report('run (Parquet)', writer.rows, time.perf_counter() - start, writer.path)
+
+        start = time.perf_counter()
+        rows = len(read_predictions(root))
+        report('read back', rows, time.perf_counter() - start, writer.path)
+
+        path = os.path.join(directory, 'predictions.csv')
+        start = time.perf_counter()
+        with ForecastWriter(path) as csv:
+            for frame in chunks:
+                csv.write(frame)
+        report('CSV', csv.rows, time.perf_counter() - start, path)
+
+        import pandas as pd
+        subset = pd.concat(chunks, ignore_index=True).iloc[:args.excel_rows]
+        path = os.path.join(directory, 'predicted.xlsx')
+        start = time.perf_counter()
+        subset.to_excel(path)
+        report('to_excel', len(subset), time.perf_counter() - start, path)
+
+
+if __name__ == '__main__':
+    main()
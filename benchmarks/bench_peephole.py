@@ -0,0 +1,83 @@
+# Peephole Optimizer Report
+
+# Explanation:
+# Prints the gate count and depth of every example circuit of the repository before and after the peephole
+# optimizer, at the sizes used by the scripts and scaled up. Composite gates (the QFT library circuit used by
+# QPE and Shor) are inlined in the "before" numbers as well, so both columns count the same kind of gates.
+
+# Usage:
+#   python benchmarks/bench_peephole.py --qubits 20
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qiskit import QuantumCircuit
+
+from quantum_algorithms.circuits import (bernstein_vazirani_circuit, deutsch_circuit, deutsch_jozsa_circuit,
+                                         grover_circuit, qft_circuit, qpe_circuit, shor_circuit)
+from quantum_algorithms.peephole import circuit_stats, flatten_circuit, optimize_circuit
+
+
+def script_circuits():
+    """The circuits as built by the scripts in the repository root"""
+    superposition = QuantumCircuit(1, 1)
+    superposition.h(0)
+    superposition.measure(0, 0)
+    bell = QuantumCircuit(2, 2)
+    bell.h(0)
+    bell.cx(0, 1)
+    bell.measure([0, 1], [0, 1])
+    return {
+        'deutsch constant': deutsch_circuit(balanced=False),
+        'deutsch balanced': deutsch_circuit(balanced=True),
+        'deutsch-jozsa constant n=2': deutsch_jozsa_circuit(2, balanced=False),
+        'deutsch-jozsa balanced n=2': deutsch_jozsa_circuit(2),
+        'deutsch-jozsa balanced n=3': deutsch_jozsa_circuit(3),
+        'bernstein-vazirani 101': bernstein_vazirani_circuit('101'),
+        'bernstein-vazirani 1101': bernstein_vazirani_circuit('1101'),
+        'grover n=3': grover_circuit(3),
+        'qft |101>': qft_circuit(3),
+        'qft |1001>': qft_circuit(4),
+        'qpe n=3': qpe_circuit(3),
+        'qpe n=4': qpe_circuit(4),
+        'shor N=15': shor_circuit(7, 15, 3),
+        'shor N=21': shor_circuit(4, 21, 4),
+        'superposition': superposition,
+        'bell (IBMQ)': bell,
+    }
+
+
+def scaled_circuits(n):
+    """The same constructions scaled to n qubits"""
+    return {
+        f'deutsch-jozsa constant n={n}': deutsch_jozsa_circuit(n, balanced=False),
+        f'deutsch-jozsa balanced n={n}': deutsch_jozsa_circuit(n),
+        f'bernstein-vazirani n={n}': bernstein_vazirani_circuit(('1101' * n)[:n]),
+        f'grover n={n} x3': grover_circuit(n, iterations=3),
+        f'qft n={n}': qft_circuit(n),
+        f'qft n={n} measured': qft_circuit(n, measure=True),
+        f'qpe n={n}': qpe_circuit(n),
+        f'shor n={n}': shor_circuit(7, 15, n),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--qubits', type=int, nargs='*', default=[20])
+    args = parser.parse_args()
+
+    circuits = script_circuits()
+    for n in args.qubits:
+        circuits.update(scaled_circuits(n))
+    print(f"{'circuit':<32}{'gates':>7}{'depth':>7}{'gates after':>13}{'depth after':>13}")
+    for name, qc in circuits.items():
+        size, depth = circuit_stats(flatten_circuit(qc))
+        opt_size, opt_depth = circuit_stats(optimize_circuit(qc))
+        print(f'{name:<32}{size:>7}{depth:>7}{opt_size:>13}{opt_depth:>13}')
+
+
+if __name__ == '__main__':
+    main()
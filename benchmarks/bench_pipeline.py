@@ -0,0 +1,81 @@
+# Benchmark: the four forecast scripts run separately versus through the shared pipeline
+#
+# "before" runs the original flow of each script (pd.read_excel, transpose, select, fit, predict) in its own
+# process, as running the four scripts does. "after" runs all four variants in one process with
+# `python -m wbs_forecast.pipeline --variants ...`, first with an empty cache and then with the cache filled by the
+# first run. Times are wall clock, including interpreter start-up and imports.
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wbs_data import write_workbook  # noqa: E402
+
+VARIANTS = ['testing', 'me', 'other', 'random_forrest']
+
+
+def legacy_flow(path, variant):
+    """The original scripts' flow, without the Excel output and the notebook display"""
+    import pandas as pd
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.linear_model import LinearRegression
+    from sklearn.model_selection import train_test_split
+    selected = ['1.01', '1.02', '1.03', '1.04', '1.05', '1.06']
+    df = pd.read_excel(path, index_col=0)
+    df.columns = df.columns.astype(str)
+    df = df.T
+    df.index = df.index.astype(int)
+    if variant == 'random_forrest':
+        df.columns = df.columns.astype(str)
+        features = df.columns[df.columns.str.startswith(tuple(selected))]
+    elif variant == 'testing':
+        features = [col for col in df.columns if col in selected]
+    else:
+        features = [col for col in selected if col in df.columns]
+    df_filtered = df[features].dropna()
+    X, y = df_filtered.iloc[:-1, :], df_filtered.iloc[1:, :]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    model = LinearRegression() if variant == 'other' else RandomForestRegressor(n_estimators=100, random_state=42)
+    model.fit(X_train, y_train)
+    model.predict(X_test)
+    return model.predict(df_filtered.iloc[-1:, :])
+
+
+def wall_clock(command, env):
+    """Seconds to run a command to completion"""
+    start = time.perf_counter()
+    subprocess.run(command, check=True, env=env, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--elements', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--years', type=int, default=50)
+    parser.add_argument('--legacy', nargs=2, metavar=('PATH', 'VARIANT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.legacy:
+        legacy_flow(*args.legacy)
+        return
+
+    print(f'{"elements":>8} {"years":>5} {"before (s)":>10} {"after, cold (s)":>15} {"after, warm (s)":>15}')
+    with tempfile.TemporaryDirectory() as directory:
+        for elements in args.elements:
+            path = write_workbook(os.path.join(directory, f'wbs_{elements}.xlsx'), elements, args.years)
+            env = dict(os.environ, PYTHONPATH=ROOT, WBS_FORECAST_CACHE=os.path.join(directory, f'cache_{elements}'))
+            before = sum(wall_clock([sys.executable, __file__, '--legacy', path, variant], env)
+                         for variant in VARIANTS)
+            command = [sys.executable, '-m', 'wbs_forecast.pipeline', path, '--variants'] + VARIANTS
+            cold = wall_clock(command, env)
+            warm = wall_clock(command, env)
+            print(f'{elements:8d} {args.years:5d} {before:10.2f} {cold:15.2f} {warm:15.2f}')
+
+
+if __name__ == '__main__':
+    main()
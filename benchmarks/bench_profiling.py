@@ -0,0 +1,66 @@
+# Benchmark: cost of the profiling spans, disabled and enabled
+#
+# The per-span cost is measured on an empty `with span(...)` block. The end-to-end cost runs many small QFT
+# circuits through run_circuit, where the fixed per-stage cost matters most, without a profiler, with one, and with
+# one that also tracks memory.
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum_algorithms.circuits import qft_circuit  # noqa: E402
+from quantum_algorithms.profiling import profile, span  # noqa: E402
+from quantum_algorithms.runner import run_circuit  # noqa: E402
+
+
+def empty_spans(count):
+    """Seconds for count empty spans"""
+    start = time.perf_counter()
+    for _ in range(count):
+        with span('stage', qubits=4):
+            pass
+    return time.perf_counter() - start
+
+
+def pipeline(runs, qubits):
+    """Seconds to build and run runs QFT circuits"""
+    start = time.perf_counter()
+    for i in range(runs):
+        run_circuit(qft_circuit(qubits, x=i % 2 ** qubits, measure=True), shots=256, seed=i)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--spans', type=int, default=1_000_000)
+    parser.add_argument('--runs', type=int, default=300)
+    parser.add_argument('--qubits', type=int, default=4)
+    args = parser.parse_args()
+
+    pipeline(5, args.qubits)  # warm up imports
+    disabled = empty_spans(args.spans)
+    with profile():
+        enabled = empty_spans(args.spans)
+    print(f'empty span: {disabled / args.spans * 1e9:.0f} ns disabled, {enabled / args.spans * 1e9:.0f} ns enabled')
+
+    # Alternate the two modes, so drifting machine load affects both alike
+    plain, timed = [], []
+    for _ in range(5):
+        plain.append(pipeline(args.runs, args.qubits))
+        with profile() as profiler:
+            timed.append(pipeline(args.runs, args.qubits))
+    plain, timed = min(plain), min(timed)
+    with profile(memory=True):
+        traced = pipeline(args.runs, args.qubits)
+    spans = len(profiler.events) / args.runs
+    print(f'{args.runs} runs of a {args.qubits}-qubit QFT, {spans:.0f} spans each:')
+    print(f'  disabled      {plain:.3f} s  (spans ~{spans * disabled / args.spans / (plain / args.runs):.3%} of it)')
+    print(f'  enabled       {timed:.3f} s  ({timed / plain - 1:+.1%})')
+    print(f'  with memory   {traced:.3f} s  ({traced / plain - 1:+.1%})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# Benchmark: rendering many histograms one by one versus in a batch report
+#
+# "inline" is what the scripts do: plot_histogram(counts) for every result, saved and closed so memory stays bounded.
+# "report" collects the same results in a Report and renders them with reused figures, with 1 and N workers.
+# A smaller set of statevectors compares plot_bloch_multivector with the Bloch renderer the same way.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum_algorithms.reporting import Report  # noqa: E402
+
+
+def random_counts(rng, num_qubits, shots=1024):
+    """Counts of a random distribution over num_qubits bits"""
+    probabilities = rng.dirichlet(np.ones(2 ** num_qubits))
+    values = rng.multinomial(shots, probabilities)
+    return {format(i, f'0{num_qubits}b'): int(v) for i, v in enumerate(values) if v}
+
+
+def render_inline(results, directory):
+    """Call plot_histogram for every result, as the scripts do"""
+    import matplotlib.pyplot as plt
+    from qiskit.visualization import plot_histogram
+    for name, counts in results:
+        figure = plot_histogram(counts, title=name)
+        figure.savefig(os.path.join(directory, f'{name}.png'))
+        plt.close(figure)
+
+
+def random_statevector(rng, num_qubits):
+    """Haar-like random statevector"""
+    amplitudes = rng.normal(size=2 ** num_qubits) + 1j * rng.normal(size=2 ** num_qubits)
+    return amplitudes / np.linalg.norm(amplitudes)
+
+
+def render_bloch_inline(results, directory):
+    """Call plot_bloch_multivector for every statevector"""
+    import matplotlib.pyplot as plt
+    from qiskit.visualization import plot_bloch_multivector
+    for name, statevector in results:
+        figure = plot_bloch_multivector(statevector, title=name)
+        figure.savefig(os.path.join(directory, f'{name}.png'))
+        plt.close(figure)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--qubits', type=int, default=4)
+    parser.add_argument('--statevectors', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = [(f'run{i:05d}', random_counts(rng, args.qubits)) for i in range(args.count)]
+    print(f'{args.count} histograms of {args.qubits} qubits, {os.cpu_count()} CPUs')
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        render_inline(results, directory)
+        inline = time.perf_counter() - start
+        print(f'plot_histogram one by one: {inline:7.2f} s  ({args.count / inline:6.1f} figures/s)')
+
+        for workers in sorted({1, args.workers}):
+            report = Report()
+            for name, counts in results:
+                report.add_counts(name, counts)
+            start = time.perf_counter()
+            report.render(directory, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f'Report.render, {workers:2d} worker(s): {elapsed:7.2f} s  ({args.count / elapsed:6.1f} figures/s, '
+                  f'{inline / elapsed:.1f}x)')
+
+        report.save(os.path.join(directory, 'results.qar'))
+        size = os.path.getsize(os.path.join(directory, 'results.qar'))
+        print(f'Raw results for later rendering: {size / 1024:.0f} KiB')
+
+        states = [(f'state{i:05d}', random_statevector(rng, args.qubits)) for i in range(args.statevectors)]
+        print(f'{args.statevectors} Bloch multivectors of {args.qubits} qubits')
+        start = time.perf_counter()
+        render_bloch_inline(states, directory)
+        inline = time.perf_counter() - start
+        print(f'plot_bloch_multivector one by one: {inline:7.2f} s  ({args.statevectors / inline:6.1f} figures/s)')
+        report = Report()
+        for name, statevector in states:
+            report.add_statevector(name, statevector)
+        start = time.perf_counter()
+        report.render(directory, workers=1)
+        elapsed = time.perf_counter() - start
+        print(f'Report.render, 1 worker:           {elapsed:7.2f} s  ({args.statevectors / elapsed:6.1f} figures/s, '
+              f'{inline / elapsed:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
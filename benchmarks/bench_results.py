@@ -0,0 +1,102 @@
+# Benchmark: JSON versus the binary result format for 20-qubit counts and statevectors
+#
+# "open" is the time to get the result back as an array (binary format: a view into the mapped file), "dict" the
+# time to get counts back as the bitstring dict that Result.get_counts returns.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum_algorithms.results import ResultReader, ResultWriter, encode_counts  # noqa: E402
+
+
+def timed(function):
+    """Run function once and return (result, seconds)"""
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def json_dump(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def json_load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--qubits', type=int, default=20)
+    parser.add_argument('--shots', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    size = 2 ** args.qubits
+    statevector = rng.normal(size=size) + 1j * rng.normal(size=size)
+    statevector /= np.linalg.norm(statevector)
+    values = rng.multinomial(args.shots, np.abs(statevector) ** 2)
+    counts = {format(i, f'0{args.qubits}b'): int(v) for i, v in enumerate(values) if v}
+    print(f'{args.qubits} qubits: {len(counts)} distinct outcomes from {args.shots} shots, '
+          f'statevector of {size} amplitudes')
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f'{"":<22} {"size (MB)":>10} {"write (s)":>10} {"open (s)":>10} {"dict (s)":>10}')
+
+        path = os.path.join(directory, 'counts.json')
+        _, write = timed(lambda: json_dump(path, counts))
+        _, load = timed(lambda: json_load(path))
+        print(f'{"counts, JSON":<22} {os.path.getsize(path) / 1e6:10.2f} {write:10.3f} {"":>10} {load:10.3f}')
+
+        path = os.path.join(directory, 'counts.qar')
+        _, write = timed(lambda: ResultWriter(path).write_counts('counts', counts))
+        reader, open_time = timed(lambda: ResultReader(path))
+        decoded, to_dict = timed(lambda: reader.get_counts('counts'))
+        assert decoded == counts
+        print(f'{"counts, binary":<22} {os.path.getsize(path) / 1e6:10.2f} {write:10.3f} {open_time:10.4f} '
+              f'{to_dict:10.3f}')
+
+        path = os.path.join(directory, 'statevector.json')
+        _, write = timed(lambda: json_dump(path, [statevector.real.tolist(), statevector.imag.tolist()]))
+        _, load = timed(lambda: np.array(json_load(path)).T @ np.array([1, 1j]))
+        print(f'{"statevector, JSON":<22} {os.path.getsize(path) / 1e6:10.2f} {write:10.3f} {load:10.3f}')
+
+        path = os.path.join(directory, 'statevector.npz')
+        _, write = timed(lambda: np.savez(path, statevector=statevector))
+        _, load = timed(lambda: np.load(path)['statevector'])
+        print(f'{"statevector, NPZ":<22} {os.path.getsize(path) / 1e6:10.2f} {write:10.3f} {load:10.4f}')
+
+        path = os.path.join(directory, 'statevector.qar')
+        _, write = timed(lambda: ResultWriter(path).write_statevector('statevector', statevector))
+        loaded, load = timed(lambda: ResultReader(path).get_statevector('statevector'))
+        assert np.array_equal(loaded, statevector)
+        print(f'{"statevector, binary":<22} {os.path.getsize(path) / 1e6:10.2f} {write:10.3f} {load:10.4f}')
+
+        # Streaming: a run appends 100 results while a reader picks them up
+        path = os.path.join(directory, 'stream.qar')
+        writer = ResultWriter(path)
+        reader = ResultReader(path)
+        small = dict(list(counts.items())[:1000])
+        start = time.perf_counter()
+        for i in range(100):
+            writer.write_counts(f'run{i}', small)
+            reader.refresh()
+        elapsed = time.perf_counter() - start
+        writer.close()
+        print(f'Streaming: 100 appends of {len(small)}-outcome counts, each followed by a refresh: {elapsed:.3f} s '
+              f'({len(reader)} records)')
+        outcomes, _, _ = encode_counts(small)
+        print(f'Outcome dtype for {args.qubits} qubits: {outcomes.dtype}')
+
+
+if __name__ == '__main__':
+    main()
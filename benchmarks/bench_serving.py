@@ -0,0 +1,100 @@
+# Benchmark: forecast latency of the prediction service versus retraining for every forecast
+#
+# Trains the scripts' random forest and linear models on synthetic data (see wbs_data.py), saves them, starts
+# `python -m wbs_forecast.service serve` in another process and measures, for each model:
+#   retrain       fit_and_forecast for every forecast, as each run of the scripts does
+#   service       one single-row query after another over a kept-alive connection
+#   batched       queries of --batch rows each (latency per query, throughput in rows per second)
+# p50/p99 are latencies per query; the rate is queries (or rows for batched queries) per second.
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wbs_data import synthetic_costs  # noqa: E402
+from wbs_forecast.ingest import normalize  # noqa: E402
+from wbs_forecast.persistence import save_model  # noqa: E402
+from wbs_forecast.pipeline import Prepared, fit_and_forecast, prepare  # noqa: E402
+from wbs_forecast.service import Client  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_service(directory, port):
+    """Start the service in a subprocess and wait until it answers"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    process = subprocess.Popen([sys.executable, '-m', 'wbs_forecast.service', 'serve', '--models-dir', directory,
+                                '--port', str(port)], env=env, stdout=subprocess.DEVNULL)
+    for _ in range(200):
+        try:
+            Client('127.0.0.1', port).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError('The service did not start')
+
+
+def timed(function, count):
+    """Latency of count calls, in seconds each"""
+    latencies = np.empty(count)
+    for i in range(count):
+        start = time.perf_counter()
+        function()
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+def report(label, model, latencies, rows=1):
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    rate = rows * len(latencies) / latencies.sum()
+    print(f'{model:<14} {label:<10} {rows:5d} {p50:9.3f} {p99:9.3f} {rate:11.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--retrains', type=int, default=20)
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    prepared = Prepared(prepare(normalize(synthetic_costs(6, 50))))
+    future = prepared.future_X.to_numpy()
+    rng = np.random.default_rng(0)
+    batch = future * rng.uniform(0.8, 1.2, size=(args.batch, future.shape[1]))
+    print(f'{"model":<14} {"mode":<10} {"rows":>5} {"p50 (ms)":>9} {"p99 (ms)":>9} {"per second":>11}')
+    with tempfile.TemporaryDirectory() as directory:
+        for model in ('random_forest', 'linear'):
+            result = fit_and_forecast(prepared, model)
+            save_model(result.model, os.path.join(directory, model), prepared.data.columns, prepared.next_year)
+        port = free_port()
+        process = start_service(directory, port)
+        client = Client('127.0.0.1', port)
+        try:
+            for model in ('random_forest', 'linear'):
+                report('retrain', model, timed(lambda: fit_and_forecast(prepared, model), args.retrains))
+                client.predict(model, future)
+                report('service', model, timed(lambda: client.predict(model, future), args.queries))
+                report('batched', model, timed(lambda: client.predict(model, batch), args.queries // 20),
+                       rows=args.batch)
+        finally:
+            client.close()
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
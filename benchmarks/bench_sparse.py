@@ -0,0 +1,64 @@
+# Benchmark: sparse versus dense simulation of Bernstein-Vazirani and Deutsch-Jozsa
+#
+# Peak memory is measured with tracemalloc (NumPy reports its allocations to it). The dense simulator is only run
+# where its 2^n statevector fits in memory; "max nonzero" is the largest number of basis states the sparse engine
+# held at once, with and without gate scheduling.
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum_algorithms.circuits import bernstein_vazirani_circuit, deutsch_jozsa_circuit  # noqa: E402
+from quantum_algorithms.gates import circuit_to_gates  # noqa: E402
+from quantum_algorithms.peephole import optimize_circuit  # noqa: E402
+from quantum_algorithms.sparse import run_sparse  # noqa: E402
+from quantum_algorithms.statevector import prepare_gates, run_gates  # noqa: E402
+
+
+def measure(function):
+    """Run function and return (result, seconds, peak MiB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[16, 20, 24, 40, 50, 62])
+    parser.add_argument('--max-dense', type=int, default=24)
+    args = parser.parse_args()
+
+    print(f'{"circuit":<22} {"qubits":>6} {"dense (s)":>10} {"dense MiB":>10} {"sparse (s)":>10} {"sparse MiB":>10} '
+          f'{"max nonzero":>11} {"unscheduled":>11}')
+    for size in args.sizes:
+        circuits = {
+            'bernstein_vazirani': bernstein_vazirani_circuit(('1101' * size)[:size - 1]),
+            'deutsch_jozsa': deutsch_jozsa_circuit(size - 1),
+            'deutsch_jozsa const': deutsch_jozsa_circuit(size - 1, balanced=False),
+        }
+        for name, qc in circuits.items():
+            gates, _ = circuit_to_gates(optimize_circuit(qc))
+            n = qc.num_qubits
+            dense = ['', '']
+            if n <= args.max_dense:
+                _, elapsed, peak = measure(lambda: run_gates(prepare_gates(gates, n), n))
+                dense = [f'{elapsed:.3f}', f'{peak:.1f}']
+            # A threshold above 1 keeps the sparse engine from switching to dense
+            state, elapsed, peak = measure(lambda: run_sparse(gates, n, density_threshold=2.0))
+            unscheduled = ''
+            if n <= 20:
+                unscheduled = str(run_sparse(gates, n, density_threshold=2.0, schedule=False).max_nonzero)
+            print(f'{name:<22} {n:6d} {dense[0]:>10} {dense[1]:>10} {elapsed:10.4f} {peak:10.3f} '
+                  f'{state.max_nonzero:11d} {unscheduled:>11}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+# Benchmark Suite
+
+# Explanation:
+# Runs every example circuit (QFT, QPE, Grover, Deutsch-Jozsa, Bernstein-Vazirani, Deutsch and Shor) over a range of
+# qubit counts and shots on every simulation engine, and records for each case:
+# - build: constructing the circuit with its builder in `circuits.py`
+# - transpile: the peephole optimizer, plus qiskit.transpile for Aer
+# - simulate: running the engine and sampling the counts
+# - peak memory of the whole case, from a separate run under tracemalloc (NumPy reports its allocations to it), so
+#   tracing does not slow down the timed runs
+# A case that raises is recorded as an error row (its metrics empty) and the run goes on with the next case; the
+# run exits with status 1 at the end if any case failed.
+# Times are the best of --repeat runs. Every result is appended as one JSON line to the history file, with the git
+# commit and library versions, so runs on different commits can be compared. --save-baseline stores the results as
+# the baseline; later runs flag every case whose time or memory grew by more than --tolerance (and by more than a
+# small absolute floor, so noise on millisecond cases is not flagged) and exit with status 1.
+
+# Engines and their default qubit limits (change them with --limit engine=qubits):
+#   statevector  dense simulator in `statevector.py`
+#   sparse       sparse simulator in `sparse.py` (switches to dense on dense states, hence the same limit)
+#   mps          matrix product state simulator in `mps.py`
+#   aer          Aer's qasm_simulator, when qiskit_aer is installed
+
+# Usage:
+#   python benchmarks/bench_suite.py --qubits 4 8 12 16 --shots 1024 8192 --save-baseline
+#   python benchmarks/bench_suite.py --qubits 4 8 12 16 --shots 1024 8192
+#   python benchmarks/bench_suite.py --algorithms qft qpe --engines mps --qubits 30 60 --limit mps=60
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantum_algorithms.circuits import EXAMPLE_BUILDERS  # noqa: E402
+from quantum_algorithms.peephole import optimize_circuit  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LIMITS = {'statevector': 24, 'sparse': 24, 'mps': 100, 'aer': 24}
+METRICS = ('build_s', 'transpile_s', 'simulate_s', 'peak_mib')
+# Increases below these are never flagged, whatever the relative change
+FLOORS = {'build_s': 0.005, 'transpile_s': 0.005, 'simulate_s': 0.005, 'peak_mib': 1.0}
+SEED = 1234
+
+
+def aer_backend():
+    """Aer's qasm_simulator, or None when qiskit_aer is not installed"""
+    try:
+        from qiskit_aer import Aer
+    except ImportError:
+        return None
+    return Aer.get_backend('qasm_simulator')
+
+
+def build(algorithm, num_qubits):
+    """Build an example circuit, measuring every qubit if the example has no measurements"""
+    qc = EXAMPLE_BUILDERS[algorithm](num_qubits)
+    if not qc.num_clbits:
+        qc.measure_all()
+    return qc
+
+
+def transpile(qc, engine, backend):
+    """Optimize qc, and transpile it for Aer"""
+    qc = optimize_circuit(qc)
+    if engine == 'aer':
+        from qiskit import transpile as qiskit_transpile
+        qc = qiskit_transpile(qc, backend, seed_transpiler=SEED)
+    return qc
+
+
+def simulate(qc, engine, shots, backend):
+    """Run an optimized circuit on an engine and return its counts"""
+    if engine == 'statevector':
+        from quantum_algorithms.statevector import sample_counts
+        return sample_counts(qc, shots=shots, seed=SEED, optimize=False)
+    if engine == 'sparse':
+        from quantum_algorithms.sparse import sample_counts_sparse
+        return sample_counts_sparse(qc, shots=shots, seed=SEED, optimize=False)
+    if engine == 'mps':
+        from quantum_algorithms.mps import sample_counts_mps
+        return sample_counts_mps(qc, shots=shots, seed=SEED, optimize=False)
+    return backend.run(qc, shots=shots, seed_simulator=SEED).result().get_counts()
+
+
+def run_case(algorithm, engine, num_qubits, shots, backend, repeat, memory=True):
+    """Time the three stages of one case, best of repeat runs, and measure its peak memory"""
+    times = {'build_s': [], 'transpile_s': [], 'simulate_s': []}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        qc = build(algorithm, num_qubits)
+        built = time.perf_counter()
+        compiled = transpile(qc, engine, backend)
+        transpiled = time.perf_counter()
+        simulate(compiled, engine, shots, backend)
+        done = time.perf_counter()
+        times['build_s'].append(built - start)
+        times['transpile_s'].append(transpiled - built)
+        times['simulate_s'].append(done - transpiled)
+    result = {key: min(values) for key, values in times.items()}
+    result['peak_mib'] = None
+    if memory:
+        tracemalloc.start()
+        simulate(transpile(build(algorithm, num_qubits), engine, backend), engine, shots, backend)
+        result['peak_mib'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    result['qubits'] = qc.num_qubits
+    return result
+
+
+def environment():
+    """Commit and library versions recorded with every result"""
+    import numpy
+    import qiskit
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'host': platform.node(), 'python': platform.python_version(),
+            'numpy': numpy.__version__, 'qiskit': qiskit.__version__}
+
+
+def case_key(result):
+    """Key identifying a case across runs"""
+    return f"{result['algorithm']}/{result['engine']}/{result['qubits']}/{result['shots']}"
+
+
+def regressions(result, baseline, tolerance):
+    """Metrics of result that grew by more than tolerance (and the absolute floor) over the baseline"""
+    reference = baseline.get(case_key(result))
+    if reference is None:
+        return []
+    flagged = []
+    for metric in METRICS:
+        old, new = reference.get(metric), result.get(metric)
+        if old is None or new is None:
+            continue
+        if new > old * (1 + tolerance) and new - old > FLOORS[metric]:
+            flagged.append(f'{metric} {old:.3g} -> {new:.3g}')
+    return flagged
+
+
+def parse_limits(items):
+    """Engine qubit limits from engine=qubits arguments, on top of the defaults"""
+    limits = dict(DEFAULT_LIMITS)
+    for item in items:
+        engine, _, value = item.partition('=')
+        if engine not in DEFAULT_LIMITS:
+            raise SystemExit(f'Unknown engine in --limit: {engine}')
+        limits[engine] = int(value)
+    return limits
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every example circuit on every engine')
+    parser.add_argument('--algorithms', nargs='+', choices=list(EXAMPLE_BUILDERS), default=list(EXAMPLE_BUILDERS))
+    parser.add_argument('--engines', nargs='+', choices=list(DEFAULT_LIMITS), default=list(DEFAULT_LIMITS))
+    parser.add_argument('--qubits', type=int, nargs='+', default=[4, 8, 12, 16])
+    parser.add_argument('--shots', type=int, nargs='+', default=[1024])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--limit', nargs='*', default=[], metavar='ENGINE=QUBITS')
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced run for peak memory')
+    parser.add_argument('--history', default=os.path.join(HERE, 'history.jsonl'))
+    parser.add_argument('--baseline', default=os.path.join(HERE, 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='relative increase flagged as a regression')
+    args = parser.parse_args()
+
+    limits = parse_limits(args.limit)
+    backend = aer_backend() if 'aer' in args.engines else None
+    engines = [engine for engine in args.engines if engine != 'aer' or backend is not None]
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    context = dict(environment(), timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'))
+
+    print(f'{"algorithm":<20} {"engine":<12} {"qubits":>6} {"shots":>6} {"build (s)":>10} {"transp. (s)":>11} '
+          f'{"sim. (s)":>9} {"peak MiB":>9}  regressions')
+    results, errors, flagged_cases, seen = [], [], 0, set()
+    with open(args.history, 'a') as history:
+        for algorithm in args.algorithms:
+            for num_qubits in args.qubits:
+                for engine in engines:
+                    for shots in args.shots:
+                        # Builders such as Deutsch's have a fixed size, so several qubit counts give one case
+                        size = build(algorithm, num_qubits).num_qubits
+                        if size > limits[engine] or (algorithm, engine, size, shots) in seen:
+                            continue
+                        seen.add((algorithm, engine, size, shots))
+                        try:
+                            result = run_case(algorithm, engine, num_qubits, shots, backend, args.repeat,
+                                              memory=not args.no_memory)
+                        except Exception as error:
+                            tracemalloc.stop()
+                            result = dict({metric: None for metric in METRICS}, qubits=size,
+                                          error=f'{type(error).__name__}: {error}')
+                        result = dict(context, algorithm=algorithm, engine=engine, shots=shots, **result)
+                        history.write(json.dumps(result) + '\n')
+                        history.flush()
+                        if 'error' in result:
+                            errors.append(result)
+                            print(f"{algorithm:<20} {engine:<12} {size:6d} {shots:6d} {'error':>10}  "
+                                  f"{result['error']}")
+                            continue
+                        results.append(result)
+                        flagged = regressions(result, baseline, args.tolerance)
+                        flagged_cases += bool(flagged)
+                        peak = '' if result['peak_mib'] is None else f"{result['peak_mib']:.1f}"
+                        print(f"{algorithm:<20} {engine:<12} {result['qubits']:6d} {shots:6d} "
+                              f"{result['build_s']:10.4f} {result['transpile_s']:11.4f} {result['simulate_s']:9.4f} "
+                              f"{peak:>9}  {', '.join(flagged)}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({case_key(result): result for result in results}, f, indent=1)
+        print(f'Saved {len(results)} cases as the baseline in {args.baseline}')
+    elif baseline:
+        print(f'{flagged_cases} of {len(results)} cases regressed by more than {args.tolerance:.0%}')
+    if errors:
+        print(f'{len(errors)} cases failed')
+    if errors or (baseline and not args.save_baseline and flagged_cases):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
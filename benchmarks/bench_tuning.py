@@ -0,0 +1,43 @@
+# Benchmark: random forest tuning wall-clock, with and without the score cache, on 1 and N processes
+#
+# Tunes RandomForestRegressor on synthetic data (see wbs_data.py) over DEFAULT_GRID (48 candidates) with successive
+# halving on 5 walk-forward folds, and reports the wall-clock time, the number of fits and of cached scores of:
+#   no cache        scores are only reused from one round to the next within the search
+#   cold cache      the same, writing the scores and the best model to an empty cache
+#   warm cache      the search again, reading everything from the cache
+# for each number of processes in --jobs (1 and all CPUs by default).
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wbs_data import synthetic_costs  # noqa: E402
+from wbs_forecast.ingest import normalize  # noqa: E402
+from wbs_forecast.pipeline import Prepared, prepare  # noqa: E402
+from wbs_forecast.tuning import tune  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--elements', type=int, default=6)
+    parser.add_argument('--years', type=int, default=50)
+    parser.add_argument('--jobs', type=int, nargs='+', default=sorted({1, os.cpu_count()}))
+    args = parser.parse_args()
+
+    prepared = Prepared(prepare(normalize(synthetic_costs(args.elements, args.years)), elements=None))
+    print(f'CPUs: {os.cpu_count()}')
+    print(f'{"run":<12} {"jobs":>4} {"seconds":>8} {"fits":>5} {"cached":>6}  best')
+    for jobs in args.jobs:
+        with tempfile.TemporaryDirectory() as cache:
+            runs = [('no cache', False), ('cold cache', True), ('warm cache', True)]
+            for label, use_cache in runs:
+                result = tune(prepared, n_jobs=jobs, cache=cache, use_cache=use_cache)
+                print(f'{label:<12} {jobs:4d} {result.seconds:8.2f} {result.fits:5d} {result.cached:6d}  '
+                      f'{result.best_params} (MAE {result.best_mae:.0f})')
+
+
+if __name__ == '__main__':
+    main()
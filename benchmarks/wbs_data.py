@@ -0,0 +1,38 @@
+# Synthetic WBS workbooks for the forecasting benchmarks
+#
+# Elements are numbered like a work breakdown structure: the 99 second-level elements 1.01 to 1.99 first (so the
+# scripts' 1.01 to 1.06 always exist), then third-level elements 1.01.001, 1.01.002, ... under them. Each element's
+# yearly cost grows at its own rate with multiplicative noise; the last year is 2024, so the forecast is for 2025.
+
+import numpy as np
+
+LAST_YEAR = 2024
+
+
+def element_ids(count):
+    """WBS numbers of count elements"""
+    ids = [f'1.{group:02d}' for group in range(1, 100)][:count]
+    child = 0
+    while len(ids) < count:
+        ids.append(f'1.{child % 99 + 1:02d}.{child // 99 + 1:03d}')
+        child += 1
+    return ids
+
+
+def synthetic_costs(elements, years, seed=0):
+    """DataFrame of costs with WBS elements as rows and years (ints, ending at 2024) as columns"""
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    base = rng.lognormal(10, 1, size=(elements, 1))
+    growth = rng.normal(0.03, 0.02, size=(elements, 1))
+    t = np.arange(years)
+    noise = rng.lognormal(0, 0.05, size=(elements, years))
+    values = base * (1 + growth) ** t * noise
+    columns = list(range(LAST_YEAR - years + 1, LAST_YEAR + 1))
+    return pd.DataFrame(values.round(2), index=pd.Index(element_ids(elements), name='wbs'), columns=columns)
+
+
+def write_workbook(path, elements, years, seed=0):
+    """Write a synthetic workbook laid out like the scripts' input file"""
+    synthetic_costs(elements, years, seed).to_excel(path)
+    return path
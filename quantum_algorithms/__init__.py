@@ -0,0 +1,62 @@
+# Quantum Algorithms
+
+# Reusable circuit builders and simulation tools for the algorithm examples in this repository.
+
+# Names are exported lazily: importing the package (or a module like `shor`) does not load NumPy, Qiskit or
+# matplotlib; each submodule is imported the first time one of its names is used.
+
+import importlib
+
+_EXPORTS = {
+    'qft': 'circuits',
+    'inverse_qft': 'circuits',
+    'qft_circuit': 'circuits',
+    'grover_circuit': 'circuits',
+    'bernstein_vazirani_circuit': 'circuits',
+    'deutsch_jozsa_circuit': 'circuits',
+    'deutsch_circuit': 'circuits',
+    'qpe_circuit': 'circuits',
+    'shor_circuit': 'circuits',
+    'example_circuits': 'circuits',
+    'shors_classical_part': 'shor',
+    'shors_quantum_part': 'shor',
+    'factors_from_period': 'shor',
+    'simulate_statevector': 'statevector',
+    'sample_counts': 'statevector',
+    'MatrixProductState': 'mps',
+    'simulate_mps': 'mps',
+    'sample_counts_mps': 'mps',
+    'simulate_sparse': 'sparse',
+    'sample_counts_sparse': 'sparse',
+    'optimize_circuit': 'peephole',
+    'circuit_stats': 'peephole',
+    'get_calibration': 'mitigation',
+    'mitigate_counts': 'mitigation',
+    'NoiseModel': 'noise',
+    'noisy_counts': 'noise',
+    'run_circuit': 'runner',
+    'run_statevector': 'runner',
+    'ResultCache': 'cache',
+    'AsyncJobPool': 'jobs',
+    'FakeQueueBackend': 'jobs',
+    'CircuitBatcher': 'batching',
+    'ResultReader': 'results',
+    'ResultWriter': 'results',
+    'Report': 'reporting',
+    'run_batched': 'batching',
+    'profile': 'profiling',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,77 @@
+# Circuit Batching
+
+# Explanation:
+# `Running Quantum Algorithms.py` submits one circuit per job, so every circuit pays the remote queue latency and
+# the per-job overhead. Remote backends accept many circuits (experiments) per job, up to a backend limit.
+# CircuitBatcher collects circuits from its callers, packs them into jobs of at most that many experiments, and hands
+# every caller the counts of its own circuit once the job that carried it completes. Each circuit is transpiled for the
+# backend (through a ResultCache when given one) before it is packed, since backend.run does not transpile.
+
+from concurrent.futures import Future
+
+
+def backend_max_experiments(backend):
+    """Largest number of circuits the backend accepts in one job, or None if it has no limit"""
+    limit = getattr(backend, 'max_experiments', None)
+    if limit is None:
+        # BackendV2 exposes max_circuits, BackendV1 keeps the limit in its configuration
+        limit = getattr(backend, 'max_circuits', None)
+    if limit is None and hasattr(backend, 'configuration'):
+        limit = getattr(backend.configuration(), 'max_experiments', None)
+    return limit
+
+
+class CircuitBatcher:
+    """Group circuits into multi-experiment jobs and demultiplex the results back to each caller"""
+
+    def __init__(self, backend, max_batch=None, pool=None, cache=None, seed_transpiler=None, **run_options):
+        self.backend = backend
+        self.max_batch = max_batch or backend_max_experiments(backend)
+        self.pool = pool
+        self.cache = cache
+        self.seed_transpiler = seed_transpiler
+        self.run_options = run_options
+        self._pending = []
+        self.jobs_submitted = 0
+
+    def submit(self, circuit):
+        """Queue a circuit and return a Future that resolves to its counts"""
+        future = Future()
+        self._pending.append((circuit, future))
+        if self.max_batch is not None and len(self._pending) >= self.max_batch:
+            self.flush()
+        return future
+
+    def flush(self):
+        """Submit every queued circuit, in jobs of at most max_batch experiments, and wait for the results"""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        from .cache import transpile_circuits
+        size = self.max_batch or len(pending)
+        batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+        try:
+            compiled = transpile_circuits([circuit for circuit, _ in pending], self.backend, self.cache,
+                                          self.seed_transpiler)
+            jobs = [compiled[i:i + size] for i in range(0, len(compiled), size)]
+            self.jobs_submitted += len(jobs)
+            if self.pool is not None:
+                results = self.pool.run_all(jobs, transpile=False, **self.run_options)
+            else:
+                results = [self.backend.run(job, **self.run_options).result() for job in jobs]
+        except Exception as error:
+            for _, future in pending:
+                future.set_exception(error)
+            raise
+        for batch, result in zip(batches, results):
+            for i, (_, future) in enumerate(batch):
+                future.set_result(result.get_counts(i))
+
+
+def run_batched(circuits, backend, max_batch=None, pool=None, cache=None, seed_transpiler=None, **run_options):
+    """Run circuits in as few jobs as the backend allows and return their counts in order"""
+    batcher = CircuitBatcher(backend, max_batch=max_batch, pool=pool, cache=cache, seed_transpiler=seed_transpiler,
+                             **run_options)
+    futures = [batcher.submit(qc) for qc in circuits]
+    batcher.flush()
+    return [future.result() for future in futures]
@@ -0,0 +1,219 @@
+# Result Cache
+
+# Explanation:
+# Every run of the example scripts re-transpiles and re-executes identical circuits (the same 3-qubit QFT on |101⟩,
+# the same Bernstein-Vazirani string). This module keeps a persistent, content-addressed cache on disk so a second run
+# of the same circuit on the same backend with the same options and seed is answered from the cache.
+
+# Layout:
+# - Entries are keyed on a SHA-256 of the circuit's canonical serialization plus the backend name, the run options
+#   and the seed. The serialization lists every instruction with its parameters and bit indices, with library
+#   circuits such as QFT inlined; multi-controlled gates are kept by name, since expanding their definitions
+#   (as an OpenQASM export would) costs more than simulating them.
+# - Payloads live in <cache dir>/objects/<first two hex digits>/<key>; an SQLite index records their size and
+#   last access time, plus hit/miss counters.
+# - When the total size goes over max_bytes, the least recently used entries are evicted.
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from .peephole import flatten_instructions
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'quantum_algorithms')
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+
+class ResultCache:
+    """Size-bounded LRU cache of transpiled circuits, counts and statevectors stored on disk"""
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or os.environ.get('QUANTUM_ALGORITHMS_CACHE', DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(self.path, 'objects'), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self.path, 'index.sqlite'))
+        self._db.execute('CREATE TABLE IF NOT EXISTS entries '
+                         '(key TEXT PRIMARY KEY, kind TEXT, size INTEGER, last_access REAL)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)')
+        self._db.commit()
+
+    def _object_path(self, key):
+        """File holding the payload of a key"""
+        return os.path.join(self.path, 'objects', key[:2], key)
+
+    def get(self, key):
+        """Return the stored bytes for key, or None on a miss"""
+        row = self._db.execute('SELECT key FROM entries WHERE key = ?', (key,)).fetchone()
+        data = None
+        if row is not None:
+            try:
+                with open(self._object_path(key), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                self._db.execute('DELETE FROM entries WHERE key = ?', (key,))
+        if data is None:
+            self._count('misses')
+        else:
+            self._db.execute('UPDATE entries SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._count('hits')
+        self._db.commit()
+        return data
+
+    def put(self, key, data, kind='blob'):
+        """Store bytes under key and evict old entries if the cache is over its size bound"""
+        path = self._object_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see a partial payload
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)', (key, kind, len(data), time.time()))
+        self._evict()
+        self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute('SELECT key, size FROM entries ORDER BY last_access').fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._object_path(key))
+            except FileNotFoundError:
+                pass
+            self._db.execute('DELETE FROM entries WHERE key = ?', (key,))
+            self._count('evictions')
+            total -= size
+
+    def _count(self, name):
+        """Increment a persistent counter"""
+        self._db.execute('INSERT INTO counters VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1',
+                         (name,))
+
+    def stats(self):
+        """Hit/miss counters, hit rate and current size of the cache"""
+        counters = dict(self._db.execute('SELECT name, value FROM counters').fetchall())
+        entries, size = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        hits, misses = counters.get('hits', 0), counters.get('misses', 0)
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'evictions': counters.get('evictions', 0),
+            'entries': entries,
+            'bytes': size,
+        }
+
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        for (key,) in self._db.execute('SELECT key FROM entries').fetchall():
+            try:
+                os.remove(self._object_path(key))
+            except FileNotFoundError:
+                pass
+        self._db.execute('DELETE FROM entries')
+        self._db.execute('DELETE FROM counters')
+        self._db.commit()
+
+    def close(self):
+        """Close the index database"""
+        self._db.close()
+
+
+def backend_name(backend):
+    """Name of a Qiskit backend (BackendV1 or V2), or of the local simulator when backend is None"""
+    if backend is None:
+        return 'local_statevector'
+    name = backend.name
+    return name() if callable(name) else name
+
+
+def canonical_form(qc):
+    """Text serialization of a circuit that is identical for identical circuits"""
+    ops, global_phase = flatten_instructions(qc)
+    lines = [f'qubits {qc.num_qubits} clbits {qc.num_clbits} phase {float(global_phase)!r}']
+    for operation, qubits, clbits in ops:
+        params = ','.join(repr(float(p)) if isinstance(p, (int, float)) else repr(p) for p in operation.params)
+        condition = getattr(operation, 'condition', None)
+        lines.append(f'{operation.name}({params}) q{list(qubits)} c{list(clbits)} if{condition!r}')
+    return '\n'.join(lines)
+
+
+def circuit_key(qc, kind, backend=None, seed=None, **options):
+    """Content address of a circuit run: canonical serialization plus backend, options and seed"""
+    payload = {
+        'kind': kind,
+        'circuit': canonical_form(qc),
+        'backend': backend_name(backend),
+        'seed': seed,
+        'options': {name: repr(value) for name, value in sorted(options.items())},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def cached_transpile(qc, backend, cache, seed=None, **options):
+    """Transpile qc for backend, reusing a cached result when one exists"""
+    from qiskit import qpy, transpile
+    key = circuit_key(qc, 'transpile', backend, seed, **options)
+    data = cache.get(key)
+    if data is not None:
+        return qpy.load(io.BytesIO(data))[0]
+    compiled = transpile(qc, backend, seed_transpiler=seed, **options)
+    buffer = io.BytesIO()
+    qpy.dump(compiled, buffer)
+    cache.put(key, buffer.getvalue(), kind='transpile')
+    return compiled
+
+
+def transpile_circuits(circuits, backend, cache=None, seed=None, **options):
+    """Transpile a circuit or a list of circuits for backend, through cache when one is given
+
+    Backends that run abstract circuits themselves (requires_transpile = False, such as FakeQueueBackend) get them
+    unchanged.
+    """
+    if not getattr(backend, 'requires_transpile', True):
+        return circuits
+    single = not isinstance(circuits, (list, tuple))
+    circuits = [circuits] if single else list(circuits)
+    if cache is None:
+        from qiskit import transpile
+        compiled = transpile(circuits, backend, seed_transpiler=seed, **options)
+    else:
+        compiled = [cached_transpile(qc, backend, cache, seed, **options) for qc in circuits]
+    return compiled[0] if single else compiled
+
+
+def cached_counts(qc, cache, run, backend=None, shots=1024, seed=None, **options):
+    """Return the counts of qc from the cache, or call run() and store its counts"""
+    # Unseeded runs are random by design, so only seeded ones are reused
+    if seed is None:
+        return run()
+    key = circuit_key(qc, 'counts', backend, seed, shots=shots, **options)
+    data = cache.get(key)
+    if data is not None:
+        return json.loads(data)
+    counts = run()
+    cache.put(key, json.dumps(counts).encode(), kind='counts')
+    return counts
+
+
+def cached_statevector(qc, cache, run, backend=None, **options):
+    """Return the statevector of qc from the cache, or call run() and store its result"""
+    key = circuit_key(qc, 'statevector', backend, **options)
+    data = cache.get(key)
+    if data is not None:
+        return np.load(io.BytesIO(data))
+    statevector = np.asarray(run())
+    buffer = io.BytesIO()
+    np.save(buffer, statevector)
+    cache.put(key, buffer.getvalue(), kind='statevector')
+    return statevector
@@ -0,0 +1,182 @@
+# Example Circuits
+
+# Explanation:
+# The algorithm scripts in the repository root each build one or two fixed-size circuits (n=3 or 4) inline.
+# This module collects the same constructions as reusable builders parametrized by the number of qubits,
+# so the simulators and benchmarks can scale the examples up without copying the circuit code around.
+# Qiskit is imported on first use, so importing this module (or the package) stays cheap.
+
+import math
+
+from .profiling import span, traced
+
+
+def _new_circuit(*registers):
+    """Create a Qiskit QuantumCircuit, importing Qiskit on first use"""
+    with span('build.import'):
+        from qiskit import QuantumCircuit
+    return QuantumCircuit(*registers)
+
+
+# Function to apply QFT on a quantum circuit
+@traced('build.qft')
+def qft(qc, n):
+    """Apply QFT on the first n qubits in the quantum circuit qc"""
+    for i in range(n):
+        qc.h(i)
+        for j in range(i + 1, n):
+            qc.cp(math.pi / 2 ** (j - i), j, i)
+    for i in range(n // 2):
+        qc.swap(i, n - i - 1)
+
+
+# Function to apply the inverse QFT on a quantum circuit
+@traced('build.qft')
+def inverse_qft(qc, n):
+    """Apply inverse QFT on the first n qubits in the quantum circuit qc"""
+    from qiskit.circuit.library import QFT
+    qc.append(QFT(num_qubits=n, inverse=True, do_swaps=False), range(n))
+
+
+# Function to create an oracle for the Grover search problem
+def oracle(qc, n):
+    """Apply the oracle to mark the solution state"""
+    qc.x(n - 1)
+    qc.h(n - 1)
+    qc.mcx(list(range(n - 1)), n - 1)
+    qc.h(n - 1)
+    qc.x(n - 1)
+
+
+# Function to apply the Grover diffusion operator
+def diffusion_operator(qc, n):
+    """Apply the Grover diffusion operator"""
+    qc.h(range(n))
+    qc.x(range(n))
+    qc.h(n - 1)
+    qc.mcx(list(range(n - 1)), n - 1)
+    qc.h(n - 1)
+    qc.x(range(n))
+    qc.h(range(n))
+
+
+@traced('build')
+def qft_circuit(n, x=None, measure=False):
+    """Build the QFT example on n qubits starting from the basis state |x⟩"""
+    # Default to the |101⟩ / |1001⟩ pattern of the examples: first and last qubit set
+    if x is None:
+        x = 1 | (1 << (n - 1))
+    qc = _new_circuit(n, n) if measure else _new_circuit(n)
+    for i in range(n):
+        if (x >> i) & 1:
+            qc.x(i)
+    qft(qc, n)
+    if measure:
+        qc.measure(range(n), range(n))
+    return qc
+
+
+@traced('build')
+def grover_circuit(n, iterations=1, measure=True):
+    """Build the Grover search example on n qubits"""
+    qc = _new_circuit(n, n)
+    qc.h(range(n))
+    for _ in range(iterations):
+        oracle(qc, n)
+        diffusion_operator(qc, n)
+    if measure:
+        qc.measure(range(n), range(n))
+    return qc
+
+
+@traced('build')
+def bernstein_vazirani_circuit(s, measure=True):
+    """Build the Bernstein-Vazirani circuit for the hidden bit string s"""
+    n = len(s)
+    qc = _new_circuit(n + 1, n)
+    qc.x(n)
+    qc.h(range(n + 1))
+    # The oracle flips the output qubit for every input qubit where s has a 1
+    for i, bit in enumerate(s):
+        if bit == '1':
+            qc.cx(i, n)
+    qc.h(range(n))
+    if measure:
+        qc.measure(range(n), range(n))
+    return qc
+
+
+@traced('build')
+def deutsch_jozsa_circuit(n, balanced=True, measure=True):
+    """Build the Deutsch-Jozsa circuit on n input qubits for a balanced or constant oracle"""
+    qc = _new_circuit(n + 1, n)
+    qc.x(n)
+    qc.h(range(n + 1))
+    # Balanced oracle f(x) = x1 XOR x2 XOR ... XOR xn; the constant oracle applies no gate
+    if balanced:
+        for i in range(n):
+            qc.cx(i, n)
+    qc.h(range(n))
+    if measure:
+        qc.measure(range(n), range(n))
+    return qc
+
+
+@traced('build')
+def deutsch_circuit(balanced=True, measure=True):
+    """Build Deutsch's circuit for the constant f(x) = 0 or the balanced f(x) = x ⊕ 1 oracle"""
+    qc = _new_circuit(2, 1)
+    qc.h(0)
+    qc.h(1)
+    if balanced:
+        qc.cx(0, 1)
+    qc.h(0)
+    if measure:
+        qc.measure(0, 0)
+    return qc
+
+
+@traced('build')
+def qpe_circuit(n_count, measure=True):
+    """Build the phase estimation example with n_count counting qubits"""
+    qc = _new_circuit(n_count + 1, n_count)
+    qc.x(n_count)
+    qc.h(range(n_count))
+    for i in range(n_count):
+        qc.cp(2 * math.pi / 2 ** (i + 1), i, n_count)
+    inverse_qft(qc, n_count)
+    if measure:
+        qc.measure(range(n_count), range(n_count))
+    return qc
+
+
+@traced('build')
+def shor_circuit(a, N, n_count, measure=True):
+    """Build the period-finding circuit used by the quantum part of Shor's algorithm"""
+    qc = _new_circuit(n_count + 1, n_count)
+    qc.x(n_count)
+    qc.h(range(n_count))
+    # Controlled-U^(2^i) phases with a^(2^i) reduced mod N, so wide counting registers do not overflow
+    for i in range(n_count):
+        qc.cp(2 * math.pi * pow(a, 2 ** i, N) / N, i, n_count)
+    inverse_qft(qc, n_count)
+    if measure:
+        qc.measure(range(n_count), range(n_count))
+    return qc
+
+
+# Builders of the repository's examples scaled to roughly n qubits, keyed by name
+EXAMPLE_BUILDERS = {
+    'qft': lambda n: qft_circuit(n),
+    'grover': lambda n: grover_circuit(n),
+    'bernstein_vazirani': lambda n: bernstein_vazirani_circuit(('1101' * n)[:n - 1]),
+    'deutsch_jozsa': lambda n: deutsch_jozsa_circuit(n - 1),
+    'deutsch': lambda n: deutsch_circuit(),
+    'qpe': lambda n: qpe_circuit(n - 1),
+    'shor': lambda n: shor_circuit(7, 15, n - 1),
+}
+
+
+def example_circuits(n):
+    """Return the example circuits of the repository scaled to roughly n qubits, keyed by name"""
+    return {name: build(n) for name, build in EXAMPLE_BUILDERS.items()}
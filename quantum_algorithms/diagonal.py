@@ -0,0 +1,77 @@
+# Diagonal-Gate Batching
+
+# Explanation:
+# The QFT, QPE and Shor circuits are dominated by controlled-phase (cp) gates. Like rz, z, s, t and p they are
+# diagonal in the computational basis, so a run of them only multiplies every amplitude by a phase and the gates
+# commute with each other. Instead of one pass over the statevector per gate, a run of consecutive diagonal gates
+# is collected into one precomputed phase vector over the qubits it touches and applied with a single
+# element-wise multiply.
+
+# How the phase vector is built:
+# The phases of the run are accumulated as angles in a real table over the run's qubits (2^m entries for m qubits),
+# each gate adding its angles with broadcasting, and exponentiated once at the end.
+
+import numpy as np
+
+from .gates import Gate, gate_qubits
+
+
+def is_diagonal(gate, atol=1e-12):
+    """Check whether a gate is diagonal in the computational basis"""
+    matrix = gate.matrix
+    if matrix.ndim == 1:
+        return True
+    return np.allclose(matrix, np.diag(np.diagonal(matrix)), atol=atol)
+
+
+def gate_diagonal(gate):
+    """Return the diagonal of a gate over gate_qubits(gate), controls included"""
+    diagonal = gate.matrix if gate.matrix.ndim == 1 else np.diagonal(gate.matrix)
+    if not gate.controls:
+        return diagonal
+    # Controls occupy the low bits: the gate only acts where they are all |1⟩
+    num_ctrl = len(gate.controls)
+    full = np.ones((len(diagonal), 2 ** num_ctrl), dtype=complex)
+    full[:, -1] = diagonal
+    return full.reshape(-1)
+
+
+def phase_vector(gates, qubits):
+    """Combine diagonal gates into one diagonal over the given qubits (bit j of an index belongs to qubits[j])"""
+    m = len(qubits)
+    axis = {q: m - 1 - i for i, q in enumerate(qubits)}
+    angles = np.zeros((2,) * m)
+    for gate in gates:
+        gate_axes = [axis[q] for q in reversed(gate_qubits(gate))]
+        shape = [1] * m
+        for a in gate_axes:
+            shape[a] = 2
+        term = np.angle(gate_diagonal(gate)).reshape((2,) * len(gate_axes)).transpose(np.argsort(gate_axes))
+        angles += term.reshape(shape)
+    return np.exp(1j * angles).reshape(-1)
+
+
+def batch_diagonal_gates(gates, min_run=2):
+    """Replace runs of at least min_run consecutive diagonal gates with a single phase-vector gate"""
+    batched = []
+    run = []
+    for gate in gates + [None]:
+        if gate is not None and is_diagonal(gate):
+            run.append(gate)
+            continue
+        if len(run) >= min_run:
+            qubits = sorted(set().union(*(gate_qubits(g) for g in run)))
+            batched.append(Gate('diagonal', tuple(qubits), phase_vector(run, qubits)))
+        else:
+            batched.extend(_as_diagonal(g) for g in run)
+        run = []
+        if gate is not None:
+            batched.append(gate)
+    return batched
+
+
+def _as_diagonal(gate):
+    """Store a single diagonal gate by its diagonal so it is applied as an element-wise multiply"""
+    if gate.matrix.ndim == 1:
+        return gate
+    return gate._replace(matrix=np.ascontiguousarray(np.diagonal(gate.matrix)))
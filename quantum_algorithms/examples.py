@@ -0,0 +1,88 @@
+# Example Runner
+
+# Explanation:
+# The algorithm scripts in the repository root import Qiskit, Aer and matplotlib at the top and run their examples
+# (and plot_histogram) as soon as they are imported. This module runs the same examples from the command line instead:
+# circuits are built from `circuits.py`, simulated with the local statevector simulator or Aer, and matplotlib is only
+# imported when a plot is requested. With --report the results are collected and rendered in one batch instead
+# (see `reporting.py`), which also works in headless runs.
+
+# Usage:
+#   python -m quantum_algorithms.examples                       # every example on 3 qubits
+#   python -m quantum_algorithms.examples qft grover -n 4 --aer --plot
+#   python -m quantum_algorithms.examples -n 5 --report report/
+#   python -m quantum_algorithms.examples qpe shor -n 12 --profile trace.json
+
+import argparse
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def aer_backend(name='qasm_simulator'):
+    """Load Aer on first use and return the named simulator"""
+    from qiskit import Aer
+    return Aer.get_backend(name)
+
+
+def run_example(name, num_qubits=3, shots=1024, seed=None, aer=False):
+    """Build one of the example circuits and return its counts"""
+    from .circuits import EXAMPLE_BUILDERS
+    from .runner import run_circuit
+    qc = EXAMPLE_BUILDERS[name](num_qubits)
+    return run_circuit(qc, backend=aer_backend() if aer else None, shots=shots, seed=seed)
+
+
+def plot_counts(counts, title=None):
+    """Show a histogram of counts, as the scripts do with plot_histogram"""
+    import matplotlib.pyplot as plt
+    from qiskit.visualization import plot_histogram
+    plot_histogram(counts, title=title)
+    plt.show()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the algorithm examples of this repository')
+    parser.add_argument('names', nargs='*', help='examples to run (default: all)')
+    parser.add_argument('-n', '--qubits', type=int, default=3)
+    parser.add_argument('--shots', type=int, default=1024)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--aer', action='store_true', help='run on the Aer qasm_simulator')
+    parser.add_argument('--plot', action='store_true', help='show a histogram of each result')
+    parser.add_argument('--report', metavar='DIR', help='render every histogram into DIR at the end')
+    parser.add_argument('--profile', metavar='TRACE', help='write a Chrome trace of the pipeline stages to TRACE')
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        from .profiling import profile
+        with profile(memory=True, trace=args.profile) as profiler:
+            _run_examples(args)
+        for stage, (count, seconds) in profiler.summary().items():
+            print(f'{stage:<14} {count:6d} spans {seconds:10.4f} s')
+        print(f'Wrote the trace to {args.profile}')
+    else:
+        _run_examples(args)
+
+
+def _run_examples(args):
+    """Run the examples selected on the command line"""
+    report = None
+    if args.report:
+        from .reporting import Report
+        report = Report()
+
+    from .circuits import EXAMPLE_BUILDERS
+    names = args.names or list(EXAMPLE_BUILDERS)
+    for name in names:
+        counts = run_example(name, args.qubits, args.shots, args.seed, args.aer)
+        print(f'{name}: {counts}')
+        if report is not None:
+            report.add_counts(name, counts)
+        elif args.plot:
+            plot_counts(counts, title=name)
+    if report is not None:
+        files = report.render(args.report)
+        print(f'Rendered {len(files)} histograms into {args.report}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# Gates
+
+# Explanation:
+# Common gate representation shared by the simulators in this package.
+# A gate is a matrix acting on its target qubits, applied only where all of its control qubits are |1⟩.
+# The matrix follows Qiskit's convention: bit j of a row/column index belongs to targets[j].
+# Diagonal gates may store only their diagonal as a 1-D matrix, which is applied as an element-wise multiply.
+
+# State layout:
+# The state of n qubits is stored as a tensor of shape (2,) * n, where axis 0 is qubit n-1 and the last axis is qubit 0,
+# so that flattening the tensor gives the usual little-endian amplitude order used by Qiskit.
+
+from collections import namedtuple
+
+import numpy as np
+
+Gate = namedtuple('Gate', ['name', 'targets', 'matrix', 'controls'], defaults=((),))
+
+# Instructions that carry no unitary action for the simulator
+IGNORED_INSTRUCTIONS = ('barrier', 'delay')
+
+
+def gate_qubits(gate):
+    """Return all qubits a gate touches, controls first"""
+    return tuple(gate.controls) + tuple(gate.targets)
+
+
+def circuit_to_gates(qc):
+    """Convert a Qiskit circuit into a list of Gate tuples and a list of (qubit, clbit) measurements"""
+    gates = []
+    measurements = []
+    _unroll(qc, [qc.find_bit(q).index for q in qc.qubits], [qc.find_bit(c).index for c in qc.clbits],
+            gates, measurements)
+    return gates, measurements
+
+
+def _unroll(qc, qubit_map, clbit_map, gates, measurements):
+    """Append the gates of qc to gates, translating its qubits through qubit_map"""
+    for instruction, qargs, cargs in qc.data:
+        qubits = [qubit_map[qc.find_bit(q).index] for q in qargs]
+        name = instruction.name
+        if name in IGNORED_INSTRUCTIONS:
+            continue
+        if name == 'measure':
+            measurements.append((qubits[0], clbit_map[qc.find_bit(cargs[0]).index]))
+            continue
+        if measurements:
+            raise ValueError('Gates after measurement are not supported by the statevector simulator')
+        gate = _to_gate(instruction, qubits)
+        if gate is not None:
+            gates.append(gate)
+            continue
+        if instruction.definition is None:
+            raise ValueError(f'Unsupported instruction: {name}')
+        # Composite instructions such as the QFT library circuit are unrolled into their definition
+        definition = instruction.definition
+        _unroll(definition, qubits, [clbit_map[qc.find_bit(c).index] for c in cargs], gates, measurements)
+
+
+def _to_gate(instruction, qubits):
+    """Return a Gate for instructions with a known matrix, or None if it has to be unrolled"""
+    num_ctrl = getattr(instruction, 'num_ctrl_qubits', 0)
+    if num_ctrl and instruction.ctrl_state == 2 ** num_ctrl - 1:
+        # Keep controls separate so multi-controlled gates (e.g. the Grover mcx) stay cheap
+        base = _to_gate(instruction.base_gate, qubits[num_ctrl:])
+        if base is not None:
+            return Gate(instruction.name, base.targets, base.matrix, tuple(qubits[:num_ctrl]))
+        return None
+    if len(qubits) > 3 and instruction.definition is not None:
+        return None
+    try:
+        matrix = instruction.to_matrix()
+    except Exception:
+        return None
+    return Gate(instruction.name, tuple(qubits), np.asarray(matrix, dtype=complex))
+
+
+def apply_gate(state, gate, num_qubits):
+    """Apply a gate to a state tensor whose first num_qubits axes are qubits and return the new state"""
+    apply = _apply_diagonal if gate.matrix.ndim == 1 else _apply_matrix
+    if not gate.controls:
+        return apply(state, gate.matrix, [num_qubits - 1 - q for q in reversed(gate.targets)])
+    # Restrict to the slice where every control qubit is |1⟩ and update it in place
+    index = [slice(None)] * state.ndim
+    for c in gate.controls:
+        index[num_qubits - 1 - c] = 1
+    index = tuple(index)
+    control_axes = sorted(num_qubits - 1 - c for c in gate.controls)
+    axes = []
+    for q in reversed(gate.targets):
+        axis = num_qubits - 1 - q
+        axes.append(axis - sum(1 for c in control_axes if c < axis))
+    state[index] = apply(state[index], gate.matrix, axes)
+    return state
+
+
+def _apply_matrix(tensor, matrix, axes):
+    """Contract a 2^k x 2^k matrix with the given tensor axes (most significant target first)"""
+    k = len(axes)
+    result = np.tensordot(matrix.reshape((2,) * (2 * k)), tensor, axes=(list(range(k, 2 * k)), axes))
+    return np.moveaxis(result, list(range(k)), axes)
+
+
+def _apply_diagonal(tensor, diagonal, axes):
+    """Multiply the given tensor axes (most significant target first) element-wise by a diagonal, in place"""
+    shape = [1] * tensor.ndim
+    for axis in axes:
+        shape[axis] = 2
+    # Reorder the diagonal's axes to follow the tensor's axis order before broadcasting
+    factor = diagonal.reshape((2,) * len(axes)).transpose(np.argsort(axes))
+    tensor *= factor.reshape(shape)
+    return tensor
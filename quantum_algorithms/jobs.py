@@ -0,0 +1,205 @@
+# Asynchronous Job Submission
+
+# Explanation:
+# The IBMQ example in `Running Quantum Algorithms.py` calls `execute(qc, backend)` and immediately blocks on
+# `job.result()`, so one slow remote queue stalls the whole process. AsyncJobPool keeps many jobs in flight instead:
+# submissions and status polls run in a thread pool (the provider calls are blocking network requests), polling backs
+# off exponentially while a job waits in the queue, and results are returned as jobs complete.
+# All jobs go through one backend object, so they share the provider session it was loaded from. Like execute, the
+# pool transpiles every circuit for the backend before submitting it (through a ResultCache when given one).
+
+# Testing without hardware:
+# FakeQueueBackend behaves like a remote backend: every job waits in a queue for a random delay, then runs on a single
+# device one job at a time, and its counts come from the local statevector simulator.
+
+import asyncio
+import functools
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobFailedError(RuntimeError):
+    """A submitted job finished in the ERROR or CANCELLED state"""
+
+
+class AsyncJobPool:
+    """Submit circuits to a backend with many jobs in flight and collect results as they complete"""
+
+    def __init__(self, backend, max_in_flight=10, poll_interval=1.0, max_poll_interval=60.0, backoff=2.0,
+                 max_workers=None, cache=None, seed_transpiler=None):
+        self.backend = backend
+        # Transpiled circuits are looked up in and stored to cache (a ResultCache) when one is given
+        self.cache = cache
+        self.seed_transpiler = seed_transpiler
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or max_in_flight)
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _limit(self):
+        """Semaphore bounding the jobs in flight, one per event loop (each run_all runs a new loop)"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def submit(self, circuits, transpile=True, **run_options):
+        """Submit one job, wait for it without blocking the event loop and return its result
+
+        The circuits are transpiled for the backend first, as execute did, unless transpile=False (for circuits that
+        already are).
+        """
+        from qiskit.providers import JobStatus
+        from qiskit.providers.jobstatus import JOB_FINAL_STATES
+        from .cache import transpile_circuits
+        if transpile:
+            # In the event loop's thread: the cache's SQLite connection belongs to it
+            circuits = transpile_circuits(circuits, self.backend, self.cache, self.seed_transpiler)
+        loop = asyncio.get_running_loop()
+        async with self._limit():
+            job = await loop.run_in_executor(self._executor,
+                                             functools.partial(self.backend.run, circuits, **run_options))
+            interval = self.poll_interval
+            while True:
+                status = await loop.run_in_executor(self._executor, job.status)
+                if status in JOB_FINAL_STATES:
+                    break
+                await asyncio.sleep(interval)
+                interval = min(interval * self.backoff, self.max_poll_interval)
+            if status != JobStatus.DONE:
+                raise JobFailedError(f'Job {job.job_id()} finished with status {status.name}')
+            return await loop.run_in_executor(self._executor, job.result)
+
+    async def as_completed(self, circuits, **run_options):
+        """Submit one job per circuit and yield (index, result) pairs in completion order"""
+        async def indexed(index, circuit):
+            return index, await self.submit(circuit, **run_options)
+
+        tasks = [asyncio.ensure_future(indexed(i, qc)) for i, qc in enumerate(circuits)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def gather(self, circuits, **run_options):
+        """Submit one job per circuit and return the results in submission order"""
+        return await asyncio.gather(*(self.submit(qc, **run_options) for qc in circuits))
+
+    def run_all(self, circuits, **run_options):
+        """Blocking convenience wrapper around gather for scripts without an event loop"""
+        return asyncio.run(self.gather(circuits, **run_options))
+
+    def close(self):
+        """Shut down the worker threads"""
+        self._executor.shutdown(wait=False)
+
+
+@functools.lru_cache(maxsize=None)
+def ibmq_backend(name='ibmq_qasm_simulator', hub='ibm-q'):
+    """Load the IBMQ account once per process and return the named backend"""
+    from qiskit import IBMQ
+    if IBMQ.active_account() is None:
+        IBMQ.load_account()
+    return IBMQ.get_provider(hub=hub).get_backend(name)
+
+
+class FakeQueueBackend:
+    """Local stand-in for a remote backend with queue latency and a single device"""
+
+    # Jobs are simulated locally from the circuits as given, so there is no target to transpile for
+    requires_transpile = False
+
+    def __init__(self, queue_delay=60.0, jitter=0.5, job_overhead=2.0, circuit_time=0.5, max_experiments=300,
+                 time_scale=1.0, seed=None):
+        # Delays are in simulated seconds; time_scale converts them to real seconds (e.g. 0.001 for fast runs)
+        self.queue_delay = queue_delay
+        self.jitter = jitter
+        self.job_overhead = job_overhead
+        self.circuit_time = circuit_time
+        self.max_experiments = max_experiments
+        self.time_scale = time_scale
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._device_free = 0.0
+        self._ids = itertools.count()
+        self.jobs_submitted = 0
+
+    @property
+    def name(self):
+        """Backend name, as on BackendV2"""
+        return 'fake_queue_backend'
+
+    def run(self, circuits, shots=1024, seed_simulator=None, **options):
+        """Queue a job for one circuit or a list of circuits"""
+        if not isinstance(circuits, (list, tuple)):
+            circuits = [circuits]
+        if len(circuits) > self.max_experiments:
+            raise ValueError(f'{len(circuits)} circuits exceed max_experiments={self.max_experiments}')
+        with self._lock:
+            now = time.monotonic()
+            delay = self.queue_delay * self._rng.uniform(1 - self.jitter, 1 + self.jitter) * self.time_scale
+            start = max(now + delay, self._device_free)
+            end = start + (self.job_overhead + self.circuit_time * len(circuits)) * self.time_scale
+            self._device_free = end
+            self.jobs_submitted += 1
+            job_id = f'fake-{next(self._ids)}'
+        return FakeJob(job_id, list(circuits), start, end, shots, seed_simulator)
+
+
+class FakeJob:
+    """Job handle returned by FakeQueueBackend, with the status/result interface of a Qiskit job"""
+
+    def __init__(self, job_id, circuits, start, end, shots, seed):
+        self._job_id = job_id
+        self._circuits = circuits
+        self._start = start
+        self._end = end
+        self._shots = shots
+        self._seed = seed
+        self._result = None
+
+    def job_id(self):
+        """Identifier of the job"""
+        return self._job_id
+
+    def status(self):
+        """QUEUED until the device picks the job up, RUNNING while it executes, then DONE"""
+        from qiskit.providers import JobStatus
+        now = time.monotonic()
+        if now < self._start:
+            return JobStatus.QUEUED
+        if now < self._end:
+            return JobStatus.RUNNING
+        return JobStatus.DONE
+
+    def result(self):
+        """Block until the job is done and return its result"""
+        time.sleep(max(0.0, self._end - time.monotonic()))
+        if self._result is None:
+            from .statevector import sample_counts
+            counts = [sample_counts(qc, shots=self._shots, seed=self._seed) for qc in self._circuits]
+            self._result = FakeResult(self._job_id, counts)
+        return self._result
+
+
+class FakeResult:
+    """Result of a FakeJob, with Result.get_counts semantics"""
+
+    def __init__(self, job_id, counts):
+        self.job_id = job_id
+        self._counts = counts
+
+    def get_counts(self, experiment=None):
+        """Counts of one experiment by index, or of all experiments (a single dict for one circuit)"""
+        if experiment is None:
+            return self._counts[0] if len(self._counts) == 1 else list(self._counts)
+        return self._counts[experiment]
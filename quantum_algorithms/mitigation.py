@@ -0,0 +1,204 @@
+# Readout-Error Mitigation
+
+# Explanation:
+# Real devices misread measured bits, which biases every counts dictionary they return. This module calibrates the
+# readout error of each qubit and removes it from measured counts:
+# - Calibration is tensored: two circuits, all qubits in |0⟩ and all in |1⟩, give a 2x2 assignment matrix per qubit
+#   (A[measured, true]), assuming readout errors are independent between qubits. Calibrations are kept per backend
+#   in memory and, optionally, in a ResultCache, and are rerun once they are older than max_age seconds.
+# - Correction solves A x = p only on the subspace of bitstrings that were actually measured, as M3 does
+#   (Nation et al., PRX Quantum 2, 040326): the full 2^n x 2^n matrix is never built, and its columns are
+#   renormalized over the subspace. Subspaces of up to 2000 bitstrings are solved exactly with a dense matrix.
+#   For larger ones, entries between bitstrings that differ in more than max_distance bits (default 3) are dropped
+#   and the sparse system is solved with Jacobi-preconditioned GMRES.
+# - The result is a quasi-probability distribution (it may have small negative entries); nearest_probability
+#   projects it onto the closest probability distribution.
+
+import hashlib
+import json
+import time
+
+import numpy as np
+
+from .results import decode_counts, encode_counts
+
+DEFAULT_MAX_AGE = 3600.0
+# Largest subspace solved with a dense matrix
+MAX_DENSE_SUBSPACE = 2000
+
+_calibrations = {}
+
+
+class ReadoutCalibration:
+    """Per-qubit 2x2 assignment matrices, A[measured, true], measured on one backend"""
+
+    def __init__(self, matrices, backend='local_statevector', created=None, shots=None):
+        self.matrices = np.asarray(matrices, dtype=float)
+        self.backend = backend
+        self.created = time.time() if created is None else created
+        self.shots = shots
+
+    @property
+    def num_qubits(self):
+        """Number of calibrated qubits"""
+        return len(self.matrices)
+
+    def age(self):
+        """Seconds since the calibration was measured"""
+        return time.time() - self.created
+
+    def to_json(self):
+        """Serialize the calibration for a ResultCache"""
+        return json.dumps({'matrices': self.matrices.tolist(), 'backend': self.backend, 'created': self.created,
+                           'shots': self.shots})
+
+    @classmethod
+    def from_json(cls, data):
+        """Inverse of to_json"""
+        return cls(**json.loads(data))
+
+
+def calibration_circuits(num_qubits):
+    """The two tensored calibration circuits: every qubit in |0⟩, and every qubit in |1⟩"""
+    from qiskit import QuantumCircuit
+    zeros = QuantumCircuit(num_qubits, name='cal_0')
+    ones = QuantumCircuit(num_qubits, name='cal_1')
+    ones.x(range(num_qubits))
+    zeros.measure_all()
+    ones.measure_all()
+    return [zeros, ones]
+
+
+def bit_frequencies(counts, num_bits):
+    """Fraction of shots in which each bit (bit 0 first) was measured as 1"""
+    outcomes, values, _ = encode_counts(counts)
+    outcomes = outcomes.astype(np.uint64)
+    bits = (outcomes[:, None] >> np.arange(num_bits, dtype=np.uint64)) & np.uint64(1)
+    return (values[:, None] * bits).sum(axis=0) / values.sum()
+
+
+def calibrate_readout(num_qubits, backend=None, shots=8192, seed=None, noise=None):
+    """Run the calibration circuits and return a ReadoutCalibration"""
+    from .cache import backend_name
+    from .runner import run_circuit
+    zeros, ones = [run_circuit(qc, backend=backend, shots=shots, seed=seed, optimize=False, noise=noise)
+                   for qc in calibration_circuits(num_qubits)]
+    p01 = bit_frequencies(zeros, num_qubits)
+    p10 = 1 - bit_frequencies(ones, num_qubits)
+    matrices = np.stack([np.array([[1 - a, b], [a, 1 - b]]) for a, b in zip(p01, p10)])
+    return ReadoutCalibration(matrices, backend_name(backend), shots=shots)
+
+
+def get_calibration(num_qubits, backend=None, cache=None, max_age=DEFAULT_MAX_AGE, shots=8192, seed=None,
+                    noise=None):
+    """Return a calibration of backend no older than max_age, measuring a new one only when needed"""
+    from .cache import backend_name
+    name = backend_name(backend)
+    key = hashlib.sha256(json.dumps(['readout_calibration', name, num_qubits, repr(noise)]).encode()).hexdigest()
+    calibration = _calibrations.get(key)
+    if calibration is None and cache is not None:
+        data = cache.get(key)
+        if data is not None:
+            calibration = ReadoutCalibration.from_json(data)
+    if calibration is None or calibration.age() > max_age:
+        calibration = calibrate_readout(num_qubits, backend, shots, seed, noise)
+        if cache is not None:
+            cache.put(key, calibration.to_json().encode(), kind='calibration')
+    _calibrations[key] = calibration
+    return calibration
+
+
+def _dense_subspace_matrix(outcomes, matrices):
+    """Assignment matrix restricted to the measured bitstrings, with every entry kept"""
+    m = len(matrices)
+    bits = ((outcomes[:, None] >> np.arange(m, dtype=np.uint64)) & np.uint64(1)).astype(float)
+    # log A_sub[i, j] = sum_q log A_q[b_iq, b_jq], written as four matrix products over the bit matrix.
+    # Zero entries (no observed error) are clipped to a tiny log instead of -inf, which would give 0 * -inf = nan
+    logs = np.log(np.maximum(matrices, 1e-300))
+    zeros = 1 - bits
+    log_matrix = (zeros * logs[:, 0, 0]) @ zeros.T + (bits * logs[:, 1, 0]) @ zeros.T + \
+        (zeros * logs[:, 0, 1]) @ bits.T + (bits * logs[:, 1, 1]) @ bits.T
+    return np.exp(log_matrix)
+
+
+def _subspace_matrix(outcomes, matrices, max_distance):
+    """Assignment matrix restricted to the measured bitstrings, as (rows, cols, values) of its kept entries"""
+    k, m = len(outcomes), len(matrices)
+    bits = ((outcomes[:, None] >> np.arange(m, dtype=np.uint64)) & np.uint64(1)).astype(np.intp)
+    qubits = np.arange(m)
+    # Entry (i, j) = prod_q A_q[b_i, b_j]: the product of column j's diagonal entries, times A_q[~b_j, b_j] /
+    # A_q[b_j, b_j] for every qubit q where the two bitstrings differ
+    with np.errstate(divide='ignore'):
+        # A qubit with no observed readout error has zero off-diagonal entries, so log(0) = -inf is expected here
+        log_diagonal = np.log(matrices[qubits, bits, bits]).sum(axis=1)
+        log_ratio = np.log(matrices[qubits, 1 - bits, bits]) - np.log(matrices[qubits, bits, bits])
+    rows, cols, values = [], [], []
+    # Compare the bitstrings block by block so the k x k distance table never has to fit in memory at once
+    block = max(1, 2 ** 22 // max(k, 1))
+    for start in range(0, k, block):
+        diff = outcomes[start:start + block, None] ^ outcomes[None, :]
+        distance = _popcount(diff)
+        i, j = np.nonzero(distance <= max_distance)
+        flipped = ((diff[i, j][:, None] >> np.arange(m, dtype=np.uint64)) & np.uint64(1)).astype(bool)
+        values.append(np.exp(log_diagonal[j] + np.where(flipped, log_ratio[j], 0).sum(axis=1)))
+        rows.append(i + start)
+        cols.append(j)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(values)
+
+
+def _popcount(x):
+    """Number of set bits of every element of a uint64 array"""
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+def mitigate_counts(counts, calibration, qubits=None, max_distance=None, nearest_probability=False):
+    """Remove readout errors from counts and return a quasi-probability distribution keyed like counts"""
+    # qubits[i] is the qubit measured into classical bit i (default: bit i from qubit i)
+    outcomes, values, widths = encode_counts(counts)
+    num_bits = sum(widths)
+    qubits = list(range(num_bits)) if qubits is None else list(qubits)
+    matrices = calibration.matrices[qubits]
+    outcomes = outcomes.astype(np.uint64)
+    probabilities = values / values.sum()
+    k = len(outcomes)
+    if k <= MAX_DENSE_SUBSPACE and max_distance is None:
+        matrix = _dense_subspace_matrix(outcomes, matrices)
+        # Columns are renormalized over the subspace, so the solution still sums to one
+        quasi = np.linalg.solve(matrix / matrix.sum(axis=0), probabilities)
+    else:
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.linalg import LinearOperator, gmres
+        rows, cols, entries = _subspace_matrix(outcomes, matrices, min(num_bits, max_distance or 3))
+        entries = entries / np.bincount(cols, weights=entries, minlength=k)[cols]
+        matrix = csr_matrix((entries, (rows, cols)), shape=(k, k))
+        # Jacobi preconditioner: the diagonal dominates for realistic error rates
+        inverse_diagonal = 1 / matrix.diagonal()
+        preconditioner = LinearOperator((k, k), matvec=lambda x: inverse_diagonal * x)
+        quasi, info = gmres(matrix, probabilities, M=preconditioner, rtol=1e-6, atol=0)
+        if info:
+            raise RuntimeError(f'GMRES did not converge after {info} iterations')
+    if nearest_probability:
+        quasi = nearest_probability_distribution(quasi)
+    return decode_counts(outcomes, quasi, widths)
+
+
+def nearest_probability_distribution(quasi):
+    """Closest probability distribution (in L2 norm) to a quasi-probability vector that sums to one"""
+    # Smolin, Gambetta and Smith, PRL 108, 070502: zero the most negative entries and spread their mass evenly
+    order = np.argsort(quasi)
+    values = quasi[order].astype(float)
+    result = np.zeros_like(values)
+    accumulator = 0.0
+    k = len(values)
+    for i in range(k):
+        if values[i] + accumulator / (k - i) >= 0:
+            result[i:] = values[i:] + accumulator / (k - i)
+            break
+        accumulator += values[i]
+    probabilities = np.empty_like(result)
+    probabilities[order] = result
+    return probabilities
+
@@ -0,0 +1,286 @@
+# Matrix Product State Simulator
+
+# Explanation:
+# The QFT of a product state such as the |101⟩ and |1001⟩ inputs of `Quantum Fourier Transform.py` has little
+# entanglement, and so does the state inside phase estimation. A matrix product state stores an n-qubit state as n
+# tensors of shape (left bond, 2, right bond); its memory grows with the bond dimensions instead of 2^n, so weakly
+# entangled circuits can be simulated on far more qubits than a dense statevector allows.
+
+# Method:
+# - Sites hold qubits; a layout records which qubit sits on which site. A multi-qubit gate first moves its qubits
+#   next to each other with SWAPs between neighbouring sites. For a pair, either qubit may move and stop on either
+#   side of the other; the choice that needs the fewest SWAPs now plus the fewest for the next multi-qubit gate
+#   wins, so a QFT ladder costs one SWAP per controlled phase instead of a walk across the chain. The layout is
+#   never restored, and circuit SWAP gates only update it.
+# - The state is kept in mixed canonical form: every site left of the orthogonality center is left-orthonormal and
+#   every site right of it is right-orthonormal. A gate moves the center into its block of sites, contracts them,
+#   applies its matrix and splits them again with SVDs, so each truncation is the optimal one for that bond.
+#   Controls are applied as projectors: the targets' matrix only updates the slice of the block where every control
+#   is 1, so a multi-controlled gate costs 2^k amplitudes per bond pair instead of a dense 4^k matrix.
+# - Truncation keeps at most max_bond singular values per bond and drops the smallest ones whose squared sum is
+#   below cutoff. The discarded weight of every SVD is recorded: fidelity is the product of (1 - discarded weight)
+#   over all truncations, an estimate of the overlap with the exact state, and truncation_error is 1 - fidelity.
+
+import numpy as np
+
+from .gates import Gate, _apply_diagonal, _apply_matrix, circuit_to_gates, gate_qubits
+from .peephole import optimize_circuit
+from .profiling import span
+
+# Number of upcoming multi-qubit gates considered when choosing how to bring a pair of qubits together; looking
+# further ahead made QPE routing worse, as it trades the ladder order for short-term savings
+LOOKAHEAD = 1
+
+# Widest gate (controls included) applied to one contracted block of sites: the block holds 2^k amplitudes per pair
+# of outer bond indices
+MAX_GATE_QUBITS = 24
+
+SWAP = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=complex)
+
+
+def full_matrix(gate, max_qubits=12):
+    """Matrix of a gate on gate_qubits(gate), with its controls and diagonal expanded"""
+    matrix = np.diag(gate.matrix) if gate.matrix.ndim == 1 else gate.matrix
+    if not gate.controls:
+        return matrix
+    if len(gate_qubits(gate)) > max_qubits:
+        raise ValueError(f'{gate.name} on {len(gate_qubits(gate))} qubits is too wide to expand into a dense matrix '
+                         f'(at most {max_qubits})')
+    # Controls are the low bits of the index; the gate acts where all of them are 1
+    c, size = len(gate.controls), len(matrix)
+    full = np.eye(2 ** c * size, dtype=complex)
+    active = np.arange(size) * 2 ** c + 2 ** c - 1
+    full[np.ix_(active, active)] = matrix
+    return full
+
+
+def _apply_to_axes(tensor, gate, axis_of):
+    """Apply a gate to the tensor axes axis_of[qubit]; controls select the slice the targets' matrix acts on"""
+    apply = _apply_diagonal if gate.matrix.ndim == 1 else _apply_matrix
+    if not gate.controls:
+        return apply(tensor, gate.matrix, [axis_of[q] for q in reversed(gate.targets)])
+    # Only the slice where every control is |1⟩ changes, so the controls never become part of a matrix
+    index = [slice(None)] * tensor.ndim
+    for c in gate.controls:
+        index[axis_of[c]] = 1
+    index = tuple(index)
+    control_axes = [axis_of[c] for c in gate.controls]
+    axes = [axis_of[q] - sum(1 for c in control_axes if c < axis_of[q]) for q in reversed(gate.targets)]
+    tensor[index] = apply(tensor[index], gate.matrix, axes)
+    return tensor
+
+
+class MatrixProductState:
+    """n-qubit state as a chain of tensors with bounded bond dimension"""
+
+    def __init__(self, num_qubits, max_bond=None, cutoff=1e-12):
+        self.num_qubits = num_qubits
+        self.max_bond = max_bond
+        self.cutoff = cutoff
+        tensor = np.zeros((1, 2, 1), dtype=complex)
+        tensor[0, 0, 0] = 1
+        self.tensors = [tensor.copy() for _ in range(num_qubits)]
+        self.site_of = list(range(num_qubits))
+        self.qubit_at = list(range(num_qubits))
+        self.center = 0
+        self.fidelity = 1.0
+        self.truncations = 0
+        self.swaps = 0
+
+    @property
+    def truncation_error(self):
+        """Estimated infidelity caused by truncation, 1 - product of (1 - discarded weight)"""
+        return 1 - self.fidelity
+
+    def bond_dimensions(self):
+        """Bond dimension between every pair of neighbouring sites"""
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+
+    def apply(self, gate, upcoming=()):
+        """Apply a gate, routing its qubits onto neighbouring sites first"""
+        # upcoming are the qubits of the next few multi-qubit gates, which decide how a pair is brought together
+        qubits = gate_qubits(gate)
+        if gate.name == 'swap' and not gate.controls:
+            a, b = (self.site_of[q] for q in qubits)
+            self._relabel(a, b)
+            return
+        if len(qubits) == 1:
+            site = self.site_of[qubits[0]]
+            self.tensors[site] = np.einsum('ij,ajb->aib', full_matrix(gate), self.tensors[site])
+            return
+        if len(qubits) > MAX_GATE_QUBITS:
+            raise ValueError(f'{gate.name} acts on {len(qubits)} qubits; the MPS engine applies gates on at most '
+                             f'{MAX_GATE_QUBITS}')
+        if len(qubits) == 2:
+            mover, site = self._route_pair(qubits, upcoming)
+            while self.site_of[mover] < site:
+                self._swap(self.site_of[mover])
+            while self.site_of[mover] > site:
+                self._swap(self.site_of[mover] - 1)
+            start = min(self.site_of[q] for q in qubits)
+        else:
+            # Walk the other qubits up, from the highest site down, until they sit right below the highest one
+            sites = sorted(self.site_of[q] for q in qubits)
+            top = sites[-1]
+            for offset, site in enumerate(reversed(sites[:-1]), start=1):
+                for s in range(site, top - offset):
+                    self._swap(s)
+            start = top - len(qubits) + 1
+        self._apply_block(start, len(qubits), gate)
+
+    def _route_pair(self, qubits, upcoming):
+        """(qubit to move, site to move it to) that brings a pair together with the fewest SWAPs now and later"""
+        best = None
+        for mover, anchor in (qubits, qubits[::-1]):
+            for side in (0, 1):
+                # Moving one qubit along the chain removes it from the order and inserts it next to the anchor
+                order = [q for q in self.qubit_at if q != mover]
+                site = order.index(anchor) + side
+                order.insert(site, mover)
+                position = {q: i for i, q in enumerate(order)}
+                cost = abs(site - self.site_of[mover])
+                cost += sum(max(position[q] for q in later) - min(position[q] for q in later) - len(later) + 1
+                            for later in upcoming)
+                if best is None or cost < best[0]:
+                    best = cost, mover, site
+        return best[1], best[2]
+
+    def _relabel(self, a, b):
+        """Exchange the qubits on sites a and b without touching the tensors"""
+        qa, qb = self.qubit_at[a], self.qubit_at[b]
+        self.qubit_at[a], self.qubit_at[b] = qb, qa
+        self.site_of[qa], self.site_of[qb] = b, a
+
+    def _swap(self, site):
+        """Exchange the states of sites site and site + 1, and their qubits in the layout"""
+        self._apply_block(site, 2, Gate('swap', (self.qubit_at[site], self.qubit_at[site + 1]), SWAP))
+        self._relabel(site, site + 1)
+        self.swaps += 1
+
+    def _apply_block(self, start, k, gate):
+        """Apply a gate to the k neighbouring sites from start on, which hold its qubits, then split them with SVDs"""
+        self._move_center(start)
+        theta = self.tensors[start]
+        for site in range(start + 1, start + k):
+            theta = np.tensordot(theta, self.tensors[site], axes=([-1], [0]))
+        # Axis 1 + i of theta is site start + i
+        theta = _apply_to_axes(theta, gate, {q: 1 + self.site_of[q] - start for q in gate_qubits(gate)})
+        left = theta.shape[0]
+        for site in range(start, start + k - 1):
+            rest = theta.shape[2:]
+            u, s, vh = np.linalg.svd(theta.reshape(left * 2, -1), full_matrices=False)
+            keep = self._truncate(s)
+            self.tensors[site] = u[:, :keep].reshape(left, 2, keep)
+            theta = (s[:keep, None] * vh[:keep]).reshape((keep,) + rest)
+            left = keep
+        self.tensors[start + k - 1] = theta
+        self.center = start + k - 1
+
+    def _truncate(self, s):
+        """Number of singular values to keep; records the discarded weight and renormalizes s in place"""
+        weights = s ** 2
+        total = weights.sum()
+        # discarded[i] is the weight of s[i:], the tail that would be dropped by keeping i values
+        discarded = np.concatenate([np.cumsum(weights[::-1])[::-1], [0.0]])
+        keep = max(1, int(np.argmax(discarded <= self.cutoff * total)))
+        if self.max_bond is not None:
+            keep = min(keep, self.max_bond)
+        lost = discarded[keep] / total
+        if lost > 0:
+            self.fidelity *= 1 - lost
+            self.truncations += 1
+            s[:keep] /= np.sqrt(1 - lost)
+        return keep
+
+    def _move_center(self, site):
+        """Move the orthogonality center to site with QR decompositions"""
+        while self.center < site:
+            c = self.center
+            left, _, right = self.tensors[c].shape
+            q, r = np.linalg.qr(self.tensors[c].reshape(left * 2, right))
+            self.tensors[c] = q.reshape(left, 2, -1)
+            self.tensors[c + 1] = np.tensordot(r, self.tensors[c + 1], axes=([1], [0]))
+            self.center += 1
+        while self.center > site:
+            c = self.center
+            left, _, right = self.tensors[c].shape
+            q, r = np.linalg.qr(self.tensors[c].reshape(left, 2 * right).T)
+            self.tensors[c] = q.T.reshape(-1, 2, right)
+            self.tensors[c - 1] = np.tensordot(self.tensors[c - 1], r.T, axes=([2], [0]))
+            self.center -= 1
+
+    def to_statevector(self):
+        """Contract the chain into a flat dense statevector in Qiskit's qubit order"""
+        psi = self.tensors[0]
+        for tensor in self.tensors[1:]:
+            psi = np.tensordot(psi, tensor, axes=([-1], [0]))
+        psi = psi.reshape((2,) * self.num_qubits)
+        # Axis i of the dense tensor is qubit n-1-i
+        order = [self.site_of[self.num_qubits - 1 - i] for i in range(self.num_qubits)]
+        return np.ascontiguousarray(psi.transpose(order)).reshape(-1)
+
+    def sample(self, shots, seed=None):
+        """Sample every qubit shots times; returns a (shots, num_qubits) array of bits indexed by qubit"""
+        rng = np.random.default_rng(seed)
+        # With the center on site 0 every other site is right-orthonormal, so marginals only need the left part
+        self._move_center(0)
+        bits = np.zeros((shots, self.num_qubits), dtype=np.uint8)
+        environment = np.ones((shots, 1), dtype=complex)
+        for site, tensor in enumerate(self.tensors):
+            branches = np.einsum('ta,abc->tbc', environment, tensor)
+            weights = np.sum(np.abs(branches) ** 2, axis=2)
+            outcome = rng.random(shots) * weights.sum(axis=1) < weights[:, 1]
+            bits[:, self.qubit_at[site]] = outcome
+            chosen = branches[np.arange(shots), outcome.astype(np.intp)]
+            environment = chosen / np.sqrt(weights[np.arange(shots), outcome.astype(np.intp)])[:, None]
+        return bits
+
+
+def run_mps(gates, num_qubits, max_bond=None, cutoff=1e-12, lookahead=LOOKAHEAD):
+    """Apply gates to |0...0⟩ and return the MatrixProductState"""
+    state = MatrixProductState(num_qubits, max_bond, cutoff)
+    # Qubits of the next lookahead multi-qubit gates after each gate, used to route SWAPs
+    following = [()] * len(gates)
+    upcoming = ()
+    for i in range(len(gates) - 1, -1, -1):
+        following[i] = upcoming
+        qubits = gate_qubits(gates[i])
+        if len(qubits) > 1:
+            upcoming = (qubits,) + upcoming[:lookahead - 1]
+    for gate, later in zip(gates, following):
+        state.apply(gate, later)
+    return state
+
+
+def simulate_mps(qc, max_bond=None, cutoff=1e-12, optimize=True):
+    """Simulate qc, ignoring its measurements, and return the MatrixProductState"""
+    if optimize:
+        qc = optimize_circuit(qc, absorb_swaps=False)
+    with span('transpile', engine='mps', qubits=qc.num_qubits):
+        gates, _ = circuit_to_gates(qc)
+    with span('run', engine='mps', qubits=qc.num_qubits, gates=len(gates)):
+        return run_mps(gates, qc.num_qubits, max_bond, cutoff)
+
+
+def sample_counts_mps(qc, shots=1024, seed=None, max_bond=None, cutoff=1e-12, optimize=True):
+    """Simulate qc as a matrix product state and sample its measurements into a counts dictionary"""
+    if optimize:
+        qc = optimize_circuit(qc)
+    with span('transpile', engine='mps', qubits=qc.num_qubits):
+        gates, measurements = circuit_to_gates(qc)
+    with span('run', engine='mps', qubits=qc.num_qubits, gates=len(gates)):
+        state = run_mps(gates, qc.num_qubits, max_bond, cutoff)
+    with span('sample', shots=shots):
+        bits = state.sample(shots, seed)
+    with span('post-process'):
+        # Keys are built as strings, so circuits with more than 64 classical bits work too
+        qubits = [qubit for qubit, _ in measurements]
+        rows, frequencies = np.unique(bits[:, qubits], axis=0, return_counts=True)
+        counts = {}
+        for row, frequency in zip(rows.tolist(), frequencies.tolist()):
+            key = ['0'] * qc.num_clbits
+            for (_, clbit), bit in zip(measurements, row):
+                key[qc.num_clbits - 1 - clbit] = str(bit)
+            key = ''.join(key) or '0'
+            counts[key] = counts.get(key, 0) + frequency
+    return counts
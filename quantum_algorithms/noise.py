@@ -0,0 +1,201 @@
+# Noisy Simulation
+
+# Explanation:
+# `Running Quantum Algorithms.py` notes that simulators do not capture the noise of real hardware. This module
+# simulates a simple hardware noise model locally, so we can see how circuits such as Grover and QPE degrade before
+# spending time on a device:
+# - Depolarizing noise: after every gate, each qubit it touches suffers a random X, Y or Z error with probability p
+#   (a separate probability can be given for gates on two or more qubits).
+# - Amplitude damping: after every gate, each qubit it touches decays from |1⟩ to |0⟩ with probability gamma.
+# - Readout error: each measured bit is flipped with probability p01 (0 read as 1) or p10 (1 read as 0).
+
+# Engines:
+# - Density matrix: the exact mixed state, stored as a tensor of 2n axes that `apply_gate` treats as 2n qubits:
+#   row qubit q is "qubit" q + n and column qubit q is "qubit" q. A gate U is applied as U on the row qubits and
+#   conj(U) on the column qubits, a channel as its 4x4 superoperator on the (column, row) pair of its qubit.
+#   Memory grows as 4^n, so this is for small circuits (up to about 12 qubits).
+# - Trajectories: many pure states evolved side by side in one array with the trajectories on a trailing axis, with
+#   errors drawn at random per trajectory. The averaged outcome probabilities converge to the density-matrix ones as
+#   the number of trajectories grows, with memory of 2^n per trajectory.
+# Readout errors act on the outcome probabilities, so they are exact in both engines.
+
+import numpy as np
+
+from .gates import Gate, apply_gate, circuit_to_gates, gate_qubits
+from .peephole import optimize_circuit
+from .profiling import span
+from .statevector import counts_from_probabilities, initial_state
+
+PAULIS = {
+    'x': np.array([[0, 1], [1, 0]], dtype=complex),
+    'y': np.array([[0, -1j], [1j, 0]], dtype=complex),
+    'z': np.array([1, -1], dtype=complex),
+}
+
+# Largest number of qubits simulated with the density-matrix engine when method='auto'
+MAX_DENSITY_MATRIX_QUBITS = 10
+
+
+class NoiseModel:
+    """Depolarizing, amplitude-damping and readout error rates applied uniformly to every gate and qubit"""
+
+    def __init__(self, depolarizing=0.0, two_qubit_depolarizing=None, amplitude_damping=0.0, readout_error=0.0):
+        self.depolarizing = depolarizing
+        self.two_qubit_depolarizing = depolarizing if two_qubit_depolarizing is None else two_qubit_depolarizing
+        self.amplitude_damping = amplitude_damping
+        # A single readout error applies to both directions; a pair is (p01, p10)
+        if np.isscalar(readout_error):
+            readout_error = (readout_error, readout_error)
+        self.readout_error = tuple(readout_error)
+
+    def __repr__(self):
+        return (f'NoiseModel(depolarizing={self.depolarizing!r}, '
+                f'two_qubit_depolarizing={self.two_qubit_depolarizing!r}, '
+                f'amplitude_damping={self.amplitude_damping!r}, readout_error={self.readout_error!r})')
+
+    def has_gate_noise(self):
+        """Whether any error follows gates; without it only readout errors apply"""
+        return bool(self.depolarizing or self.two_qubit_depolarizing or self.amplitude_damping)
+
+    def gate_depolarizing(self, gate):
+        """Depolarizing probability applied to each qubit of gate"""
+        return self.depolarizing if len(gate_qubits(gate)) == 1 else self.two_qubit_depolarizing
+
+    def readout_matrix(self):
+        """2x2 matrix taking true outcome probabilities of one bit to measured ones"""
+        p01, p10 = self.readout_error
+        return np.array([[1 - p01, p10], [p01, 1 - p10]])
+
+
+def depolarizing_kraus(p):
+    """Kraus operators of a single-qubit channel applying X, Y or Z with probability p/3 each"""
+    return [np.sqrt(1 - p) * np.eye(2)] + [np.sqrt(p / 3) * np.diag(m) if m.ndim == 1 else np.sqrt(p / 3) * m
+                                           for m in PAULIS.values()]
+
+
+def amplitude_damping_kraus(gamma):
+    """Kraus operators of amplitude damping with decay probability gamma"""
+    return [np.array([[1, 0], [0, np.sqrt(1 - gamma)]]), np.array([[0, np.sqrt(gamma)], [0, 0]])]
+
+
+def superoperator(kraus):
+    """4x4 matrix acting on a row-major vectorized single-qubit density matrix"""
+    return sum(np.kron(k, k.conj()) for k in kraus)
+
+
+def gate_channels(gate, noise):
+    """(qubit, Kraus operators) of the noise that follows gate"""
+    channels = []
+    p = noise.gate_depolarizing(gate)
+    for qubit in gate_qubits(gate):
+        if p:
+            channels.append((qubit, depolarizing_kraus(p)))
+        if noise.amplitude_damping:
+            channels.append((qubit, amplitude_damping_kraus(noise.amplitude_damping)))
+    return channels
+
+
+def apply_readout_error(probabilities, qubits, num_qubits, noise):
+    """Apply the readout error of every measured qubit to the outcome probabilities"""
+    if not any(noise.readout_error):
+        return probabilities
+    tensor = probabilities.reshape((2,) * num_qubits)
+    matrix = noise.readout_matrix()
+    for qubit in qubits:
+        tensor = apply_gate(tensor, Gate('readout', (qubit,), matrix), num_qubits)
+    return tensor.reshape(-1)
+
+
+def density_matrix_probabilities(gates, num_qubits, noise):
+    """Outcome probabilities of every basis state, from the exact noisy density matrix"""
+    n = num_qubits
+    state = initial_state(n)
+    rho = np.multiply.outer(state, state.conj())
+    for gate in gates:
+        row = Gate(gate.name, tuple(q + n for q in gate.targets), gate.matrix, tuple(c + n for c in gate.controls))
+        rho = apply_gate(rho, row, 2 * n)
+        rho = apply_gate(rho, Gate(gate.name, gate.targets, gate.matrix.conj(), gate.controls), 2 * n)
+        for qubit, kraus in gate_channels(gate, noise):
+            rho = apply_gate(rho, Gate('channel', (qubit, qubit + n), superoperator(kraus)), 2 * n)
+    return np.real(np.diagonal(rho.reshape(2 ** n, 2 ** n))).copy()
+
+
+def _apply_pauli_errors(state, qubit, p, num_qubits, rng):
+    """Apply X, Y or Z to a random subset of the trajectories, each with probability p/3"""
+    draws = rng.random(state.shape[-1])
+    for i, matrix in enumerate(PAULIS.values()):
+        hit = np.flatnonzero((draws >= i * p / 3) & (draws < (i + 1) * p / 3))
+        if hit.size:
+            state[..., hit] = apply_gate(state[..., hit], Gate('pauli', (qubit,), matrix), num_qubits)
+    return state
+
+
+def _apply_amplitude_damping(state, qubit, gamma, num_qubits, rng):
+    """Let each trajectory decay (quantum jump) or not, with the jump probability set by its |1⟩ population"""
+    axis = num_qubits - 1 - qubit
+    # Views of the |0⟩ and |1⟩ halves of the qubit, updated in place
+    zero = state[(slice(None),) * axis + (0,)]
+    one = state[(slice(None),) * axis + (1,)]
+    population = np.sum(one.real ** 2 + one.imag ** 2, axis=tuple(range(num_qubits - 1)))
+    jump = np.flatnonzero(rng.random(population.shape) < gamma * population)
+    jumped = one[..., jump] / np.sqrt(population[jump])
+    stay = 1 / np.sqrt(1 - gamma * population)
+    zero *= stay
+    one *= np.sqrt(1 - gamma) * stay
+    if jump.size:
+        zero[..., jump] = jumped
+        one[..., jump] = 0
+    return state
+
+
+def trajectory_probabilities(gates, num_qubits, noise, trajectories=1000, seed=None, max_amplitudes=2 ** 22):
+    """Outcome probabilities of every basis state, averaged over Monte Carlo trajectories"""
+    rng = np.random.default_rng(seed)
+    # Trajectories run in batches that keep the state array under max_amplitudes complex numbers
+    batch_size = max(1, min(trajectories, max_amplitudes >> num_qubits))
+    probabilities = np.zeros(2 ** num_qubits)
+    done = 0
+    while done < trajectories:
+        batch = min(batch_size, trajectories - done)
+        state = np.zeros((2,) * num_qubits + (batch,), dtype=complex)
+        state[(0,) * num_qubits] = 1
+        for gate in gates:
+            state = apply_gate(state, gate, num_qubits)
+            p = noise.gate_depolarizing(gate)
+            for qubit in gate_qubits(gate):
+                if p:
+                    state = _apply_pauli_errors(state, qubit, p, num_qubits, rng)
+                if noise.amplitude_damping:
+                    state = _apply_amplitude_damping(state, qubit, noise.amplitude_damping, num_qubits, rng)
+        probabilities += np.sum(np.abs(state.reshape(2 ** num_qubits, batch)) ** 2, axis=1)
+        done += batch
+    return probabilities / trajectories
+
+
+def noisy_probabilities(qc, noise, method='auto', trajectories=1000, seed=None, optimize=True):
+    """Probabilities of every basis state of qc, including readout errors, and its measurements"""
+    if optimize:
+        qc = optimize_circuit(qc)
+    with span('transpile', engine='noise', qubits=qc.num_qubits):
+        gates, measurements = circuit_to_gates(qc)
+    n = qc.num_qubits
+    if method == 'auto':
+        method = 'density_matrix' if n <= MAX_DENSITY_MATRIX_QUBITS else 'trajectories'
+    with span('run', engine=method, qubits=n, gates=len(gates)):
+        if method == 'density_matrix':
+            probabilities = density_matrix_probabilities(gates, n, noise)
+        elif method == 'trajectories':
+            # Without gate errors every trajectory is the same pure state
+            trajectories = trajectories if noise.has_gate_noise() else 1
+            probabilities = trajectory_probabilities(gates, n, noise, trajectories, seed)
+        else:
+            raise ValueError(f'Unknown noise simulation method: {method}')
+    probabilities = apply_readout_error(probabilities, sorted({q for q, _ in measurements}), n, noise)
+    return probabilities, measurements
+
+
+def noisy_counts(qc, noise, shots=1024, seed=None, method='auto', trajectories=1000, optimize=True):
+    """Simulate qc under a noise model and sample its measurements into a counts dictionary"""
+    rng = np.random.default_rng(seed)
+    probabilities, measurements = noisy_probabilities(qc, noise, method, trajectories, rng, optimize)
+    return counts_from_probabilities(probabilities, measurements, qc.num_clbits, shots, rng)
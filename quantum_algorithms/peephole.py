@@ -0,0 +1,231 @@
+# Peephole Optimizer
+
+# Explanation:
+# The hand-built circuits in this repository contain redundant gates: Deutsch's constant case applies h(0) twice,
+# and the Grover oracle ends with h/x on the last qubit right before the diffusion operator applies x/h to it again.
+# This pass rewrites a Qiskit circuit into an equivalent one with fewer gates before it is simulated or submitted.
+
+# Rewrites:
+# 1. Cancel adjacent inverse pairs (h h, x x, cx cx, swap swap, mcx mcx, s sdg, t tdg, ...).
+# 2. Merge rotations about the same axis (rz, rx, ry, p, cp, crz, ...) and drop the ones that become the identity.
+# 3. Commute gates to expose cancellations: a gate can move past gates on other qubits, diagonal gates move past
+#    each other, and a diagonal gate moves past a controlled gate when it only shares the controls.
+# 4. Rewrite h(t) mcx(controls, t) h(t), as used by the Grover oracle and diffusion operator, into a diagonal
+#    multi-controlled Z, which then commutes with the other diagonal gates.
+# 5. Absorb swaps that are only followed by measurements by measuring the swapped qubits instead.
+#    This keeps the counts identical but changes the post-measurement state, so it is skipped for circuits without
+#    measurements (e.g. the statevector QFT examples).
+
+import functools
+
+import numpy as np
+
+from .profiling import traced
+
+# Multi-controlled X gates, named after the synthesis Qiskit picked for them
+MCX = {'cx', 'ccx', 'mcx', 'mcx_gray'}
+SELF_INVERSE = {'h', 'x', 'y', 'z', 'cy', 'cz', 'ch', 'swap', 'ccz', 'cswap', 'id'} | MCX
+INVERSE_PAIRS = {('s', 'sdg'), ('sdg', 's'), ('t', 'tdg'), ('tdg', 't'), ('sx', 'sxdg'), ('sxdg', 'sx'),
+                 ('cs', 'csdg'), ('csdg', 'cs')}
+DIAGONAL = {'id', 'z', 's', 'sdg', 't', 'tdg', 'rz', 'p', 'u1', 'cz', 'cp', 'cu1', 'crz', 'cs', 'csdg', 'ccz', 'rzz',
+            'mcphase'}
+# Rotations that merge by adding their angle, with the angle at which they become the identity
+ROTATION_PERIOD = {'rx': 4 * np.pi, 'ry': 4 * np.pi, 'rz': 4 * np.pi, 'rxx': 4 * np.pi, 'ryy': 4 * np.pi,
+                   'rzz': 4 * np.pi, 'crx': 4 * np.pi, 'cry': 4 * np.pi, 'crz': 4 * np.pi,
+                   'p': 2 * np.pi, 'u1': 2 * np.pi, 'cp': 2 * np.pi, 'cu1': 2 * np.pi, 'mcphase': 2 * np.pi}
+# Gates whose qubits can be listed in any order
+SYMMETRIC = {'cz', 'cp', 'cu1', 'ccz', 'swap', 'rxx', 'ryy', 'rzz', 'mcphase'}
+
+
+@functools.lru_cache(maxsize=None)
+def known_gates():
+    """Gates kept as they are; anything else with a definition (e.g. the QFT library circuit) is inlined"""
+    from qiskit.circuit.library.standard_gates import get_standard_gate_name_mapping
+    return frozenset(get_standard_gate_name_mapping()) | SELF_INVERSE | DIAGONAL | set(ROTATION_PERIOD) | {'barrier'}
+
+
+@traced('optimize')
+def optimize_circuit(qc, absorb_swaps=True, max_passes=10):
+    """Return an equivalent copy of qc with redundant gates removed"""
+    ops, global_phase = flatten_instructions(qc)
+    for _ in range(max_passes):
+        size = len(ops)
+        ops = _peephole_pass(ops)
+        if len(ops) == size:
+            break
+    if absorb_swaps and any(op[0].name == 'measure' for op in ops):
+        ops = _absorb_swaps(ops)
+    return _build(qc, ops, global_phase)
+
+
+def flatten_circuit(qc):
+    """Return a copy of qc with composite gates inlined, for like-for-like gate counts"""
+    ops, global_phase = flatten_instructions(qc)
+    return _build(qc, ops, global_phase)
+
+
+def _build(qc, ops, global_phase):
+    """Create a circuit with the registers of qc from an instruction list"""
+    circuit = qc.copy_empty_like()
+    circuit.global_phase = global_phase
+    for operation, qubits, clbits in ops:
+        circuit.append(operation, [circuit.qubits[q] for q in qubits], [circuit.clbits[c] for c in clbits])
+    return circuit
+
+
+def flatten_instructions(qc, qubit_map=None, clbit_map=None):
+    """List the instructions of qc as (operation, qubit indices, clbit indices) plus the accumulated global phase"""
+    if qubit_map is None:
+        qubit_map = list(range(qc.num_qubits))
+        clbit_map = list(range(qc.num_clbits))
+    ops = []
+    global_phase = qc.global_phase
+    for instruction, qargs, cargs in qc.data:
+        qubits = tuple(qubit_map[qc.find_bit(q).index] for q in qargs)
+        clbits = tuple(clbit_map[qc.find_bit(c).index] for c in cargs)
+        # Library circuits such as QFT are inlined so their gates can cancel against the surrounding ones
+        if (instruction.name not in known_gates() and instruction.definition is not None
+                and getattr(instruction, 'condition', None) is None):
+            inner, phase = flatten_instructions(instruction.definition, list(qubits), list(clbits))
+            ops.extend(inner)
+            global_phase += phase
+        else:
+            ops.append((instruction, qubits, clbits))
+    return ops, global_phase
+
+
+def _peephole_pass(ops):
+    """One sweep of cancellations and merges over the instruction list"""
+    out = []
+    for op in ops:
+        if not _is_unitary(op):
+            out.append(op)
+            continue
+        if _controlled_z(out, op):
+            continue
+        partner = _find_partner(out, op)
+        if partner is None:
+            out.append(op)
+            continue
+        index, result = partner
+        if result is None:
+            del out[index]
+        else:
+            out[index] = result
+    return out
+
+
+def _find_partner(out, op):
+    """Walk backwards for a gate op cancels or merges with; return (index, replacement or None)"""
+    qubits = set(op[1])
+    for index in range(len(out) - 1, -1, -1):
+        other = out[index]
+        if not qubits & set(other[1]):
+            continue
+        if _is_unitary(other):
+            merged = _combine(other, op)
+            if merged is not False:
+                return index, merged
+            if _commute(other, op):
+                continue
+        return None
+    return None
+
+
+def _controlled_z(out, op):
+    """Turn h(t) cx/ccx/mcx(controls, t) h(t) into a controlled Z, when op is the closing h; return True if done"""
+    if op[0].name != 'h':
+        return False
+    target = op[1][0]
+    on_target = [i for i in range(len(out) - 1, -1, -1) if target in out[i][1]][:2]
+    if len(on_target) < 2:
+        return False
+    middle, first = out[on_target[0]], out[on_target[1]]
+    # A classically conditioned h (c_if) is applied or not at run time, so neither h may be folded away
+    if (first[0].name != 'h' or not _is_unitary(first) or not _is_unitary(op)
+            or middle[0].name not in MCX or not _is_unitary(middle)
+            or middle[1][-1] != target or middle[0].ctrl_state != 2 ** middle[0].num_ctrl_qubits - 1):
+        return False
+    from qiskit.circuit.library import CCZGate, CZGate, MCPhaseGate
+    num_ctrl = middle[0].num_ctrl_qubits
+    gate = {1: CZGate, 2: CCZGate}.get(num_ctrl)
+    out[on_target[0]] = (gate() if gate else MCPhaseGate(np.pi, num_ctrl)), middle[1], middle[2]
+    del out[on_target[1]]
+    return True
+
+
+def _combine(first, second):
+    """Combine two gates on the same qubits: False if they don't simplify, None if they cancel, else the merged op"""
+    a, b = first[0], second[0]
+    if _key(first) != _key(second):
+        return False
+    if a.name == b.name and a.name in SELF_INVERSE:
+        return None
+    if (a.name, b.name) in INVERSE_PAIRS:
+        return None
+    if a.name == b.name and a.name in ROTATION_PERIOD:
+        from qiskit.circuit import ParameterExpression
+        if any(isinstance(p, ParameterExpression) for p in a.params + b.params):
+            return False
+        angle = float(a.params[0]) + float(b.params[0])
+        period = ROTATION_PERIOD[a.name]
+        if np.isclose(np.remainder(angle + period / 2, period) - period / 2, 0):
+            return None
+        merged = a.copy()
+        merged.params = [angle]
+        return merged, first[1], first[2]
+    return False
+
+
+def _key(op):
+    """Qubits of an op in the form that identifies 'the same gate position'"""
+    operation, qubits, _ = op
+    if operation.name in SYMMETRIC:
+        return frozenset(qubits)
+    num_ctrl = getattr(operation, 'num_ctrl_qubits', 0)
+    if num_ctrl:
+        return frozenset(qubits[:num_ctrl]), qubits[num_ctrl:]
+    return qubits
+
+
+def _commute(first, second):
+    """Conservative check that two overlapping gates commute"""
+    if first[0].name in DIAGONAL and second[0].name in DIAGONAL:
+        return True
+    for diagonal, other in ((first, second), (second, first)):
+        num_ctrl = getattr(other[0], 'num_ctrl_qubits', 0)
+        if diagonal[0].name in DIAGONAL and num_ctrl:
+            # A diagonal gate commutes with a controlled gate if it only touches the controls
+            if set(diagonal[1]) & set(other[1]) <= set(other[1][:num_ctrl]):
+                return True
+    return False
+
+
+def _is_unitary(op):
+    """Gates the optimizer may move or remove: no measurements, resets, barriers or classical conditions"""
+    operation = op[0]
+    return (bool(op[1]) and not op[2] and operation.name not in ('measure', 'reset', 'barrier', 'delay')
+            and getattr(operation, 'condition', None) is None)
+
+
+def _absorb_swaps(ops):
+    """Remove swaps followed only by measurements on their qubits, relabelling those measurements"""
+    out = []
+    measured_only = set(q for op in ops for q in op[1])
+    for operation, qubits, clbits in reversed(ops):
+        if operation.name == 'swap' and set(qubits) <= measured_only:
+            a, b = qubits
+            swap = {a: b, b: a}
+            out = [(o, tuple(swap.get(q, q) for q in qs), cs) for o, qs, cs in out]
+            continue
+        if operation.name not in ('measure', 'barrier'):
+            measured_only -= set(qubits)
+        out.append((operation, qubits, clbits))
+    return out[::-1]
+
+
+def circuit_stats(qc):
+    """Gate count (excluding measurements and barriers) and depth of a circuit"""
+    ops = qc.count_ops()
+    size = sum(count for name, count in ops.items() if name not in ('measure', 'barrier'))
+    return size, qc.depth()
@@ -0,0 +1,194 @@
+# Profiling Spans
+
+# Explanation:
+# A slow Shor or QPE run in `Running Quantum Algorithms.py` is one opaque `execute(...).result()` call. The pipeline
+# in this package is instrumented with spans around each of its stages instead:
+#   build         building a circuit (build.qft for the QFT inside it, build.import for importing Qiskit)
+#   optimize      the peephole optimizer
+#   transpile     qiskit.transpile for a backend, or converting a circuit to the simulator's gate list
+#   run           executing the circuit on a simulator or backend
+#   sample        drawing shots from the final state
+#   post-process  turning counts into results, e.g. a period and factors in Shor's algorithm
+# Spans only record anything inside `with profile():`. Otherwise span() returns one shared object whose __enter__
+# and __exit__ do nothing, so the instrumentation costs a function call per stage.
+
+# Output:
+# Every span becomes an event with its name, start, duration, thread, nesting depth and attributes (for example
+# the number of qubits), and with memory=True the memory allocated and the peak reached inside it, from tracemalloc.
+# Events can be written as JSON lines, or as a Chrome trace file, which chrome://tracing and https://ui.perfetto.dev
+# show as a timeline.
+
+# Usage:
+#   from quantum_algorithms.profiling import profile
+#   with profile(memory=True, trace='shor_trace.json') as profiler:
+#       shors_quantum_part(7, 15, 8)
+#   print(profiler.summary())
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+_profiler = None
+
+
+class _NullSpan:
+    """Span returned while profiling is off"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, **attributes):
+    """Context manager timing one stage while a profiler is active"""
+    if _profiler is None:
+        return _NULL_SPAN
+    return _Span(_profiler, name, attributes)
+
+
+def traced(name):
+    """Decorator running every call of a function inside span(name)"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return function(*args, **kwargs)
+            with _Span(_profiler, name, {'function': function.__name__}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enabled():
+    """Whether a profiler is active"""
+    return _profiler is not None
+
+
+class _Span:
+    """Span recorded into a Profiler"""
+    __slots__ = ('profiler', 'name', 'attributes', 'start', 'allocated', 'peak')
+
+    def __init__(self, profiler, name, attributes):
+        self.profiler = profiler
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        if self.profiler.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # The enclosing span keeps the peak reached so far, since this span resets it
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.allocated, self.peak = current, current
+        stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        stack = self.profiler._stack()
+        stack.pop()
+        event = {'name': self.name, 'start_us': (self.start - self.profiler.origin) / 1000,
+                 'duration_us': (end - self.start) / 1000, 'thread': threading.get_ident(), 'depth': len(stack),
+                 'attributes': self.attributes}
+        if self.profiler.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            event['allocated_mib'] = (current - self.allocated) / 2 ** 20
+            event['peak_mib'] = (self.peak - self.allocated) / 2 ** 20
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+        self.profiler.events.append(event)
+        return False
+
+
+class Profiler:
+    """Collects the events of the spans run while it is active"""
+
+    def __init__(self, memory=False):
+        # Memory peaks are tracked per span with tracemalloc, which is global: with memory=True, spans running in
+        # several threads at once see each other's allocations
+        self.memory = memory
+        self.events = []
+        self.origin = time.perf_counter_ns()
+        self._local = threading.local()
+        self._started_tracing = False
+
+    def _stack(self):
+        """Open spans of the calling thread"""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self):
+        """Make this the active profiler"""
+        global _profiler
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _profiler = self
+
+    def stop(self):
+        """Stop recording spans"""
+        global _profiler
+        _profiler = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def summary(self):
+        """Number of spans and total seconds per stage, sorted by total time"""
+        totals = {}
+        for event in self.events:
+            count, seconds = totals.get(event['name'], (0, 0.0))
+            totals[event['name']] = (count + 1, seconds + event['duration_us'] / 1e6)
+        return dict(sorted(totals.items(), key=lambda item: -item[1][1]))
+
+    def write_events(self, path):
+        """Write the events as JSON lines"""
+        with open(path, 'w') as f:
+            for event in self.events:
+                f.write(json.dumps(event, default=str) + '\n')
+
+    def write_chrome_trace(self, path):
+        """Write the events in the Trace Event Format read by chrome://tracing and Perfetto"""
+        pid = os.getpid()
+        trace = []
+        for event in self.events:
+            args = dict(event['attributes'])
+            for key in ('allocated_mib', 'peak_mib'):
+                if key in event:
+                    args[key] = round(event[key], 3)
+            trace.append({'name': event['name'], 'cat': event['name'].split('.')[0], 'ph': 'X',
+                          'ts': event['start_us'], 'dur': event['duration_us'], 'pid': pid, 'tid': event['thread'],
+                          'args': args})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f, default=str)
+
+
+@contextlib.contextmanager
+def profile(memory=False, trace=None, events=None):
+    """Record spans inside the block; optionally write a Chrome trace and/or JSON-lines events at the end"""
+    profiler = Profiler(memory)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        if trace:
+            profiler.write_chrome_trace(trace)
+        if events:
+            profiler.write_events(events)
@@ -0,0 +1,217 @@
+# Binary Result Files
+
+# Explanation:
+# `result.get_counts()` returns a dict keyed by bitstrings and statevectors only live in memory. Written as JSON, a
+# 20-qubit statevector is tens of megabytes of decimal text and every load parses all of it. This module stores
+# results in an append-only binary file instead:
+# - Counts are stored as two integer arrays, the measured outcomes (bitstrings as integers) and their counts, using
+#   the smallest unsigned dtype that holds them.
+# - Statevectors are stored as their raw complex128 buffer.
+# - Readers map the file into memory, so arrays are views into the file: opening a file with many large results
+#   costs the same as opening an empty one, and only the pages that are used are read from disk.
+# - Writers append one record at a time, so streaming runs can add results while readers pick them up with refresh().
+
+# Layout:
+#   file header   8-byte magic b'QARESULT', uint16 version, 6 reserved bytes
+#   record        uint32 metadata length, uint32 reserved, uint64 data length,
+#                 JSON metadata (kind, name, register widths, array dtypes/shapes/offsets, user metadata),
+#                 array data; the metadata and every array start at a 16-byte boundary.
+# A record that was only partly written (an interrupted run) ends the file for readers.
+
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+MAGIC = b'QARESULT'
+VERSION = 1
+FILE_HEADER = struct.Struct('<8sH6x')
+RECORD_HEADER = struct.Struct('<I4xQ')
+ALIGNMENT = 16
+
+Record = namedtuple('Record', ['kind', 'name', 'metadata', 'arrays'])
+
+
+def _padding(size):
+    """Bytes needed after size to reach the next 16-byte boundary"""
+    return -size % ALIGNMENT
+
+
+def _smallest_uint(maximum):
+    """Smallest unsigned integer dtype that holds maximum"""
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if maximum <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise ValueError(f'{maximum} does not fit in 64 bits')
+
+
+def encode_counts(counts):
+    """Return (outcomes, values, widths) arrays for a counts dict; widths are the register sizes of its keys"""
+    if not counts:
+        return np.zeros(0, np.uint8), np.zeros(0, np.uint8), []
+    first = next(iter(counts))
+    # Keys of circuits with several classical registers are space separated, e.g. '01 110'
+    widths = [len(part) for part in first.split(' ')]
+    if sum(widths) > 64:
+        raise ValueError(f'{sum(widths)}-bit outcomes do not fit in 64 bits')
+    outcomes = [int(key.replace(' ', ''), 2) for key in counts]
+    values = list(counts.values())
+    outcome_dtype = _smallest_uint(max(2 ** sum(widths) - 1, 1))
+    value_dtype = _smallest_uint(max(values))
+    return np.array(outcomes, dtype=outcome_dtype), np.array(values, dtype=value_dtype), widths
+
+
+def decode_counts(outcomes, values, widths):
+    """Inverse of encode_counts"""
+    num_bits = sum(widths)
+    if not num_bits:
+        return {}
+    # Build every key at once as a matrix of ASCII characters, one row per outcome
+    outcomes = outcomes.astype(np.uint64)
+    shifts = np.arange(num_bits - 1, -1, -1, dtype=np.uint64)
+    bits = ((outcomes[:, None] >> shifts) & np.uint64(1)).astype(np.uint8) + ord('0')
+    separators = np.cumsum(widths)[:-1]
+    chars = np.insert(bits, separators, ord(' '), axis=1)
+    keys = np.ascontiguousarray(chars).view(f'S{chars.shape[1]}').ravel().tolist()
+    return {key.decode(): value for key, value in zip(keys, values.tolist())}
+
+
+class ResultWriter:
+    """Append counts and statevectors to a binary result file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_counts(self, name, counts, **metadata):
+        """Append a counts dictionary"""
+        outcomes, values, widths = encode_counts(counts)
+        self._write_record('counts', name, {'outcomes': outcomes, 'counts': values},
+                           dict(metadata, widths=widths))
+
+    def write_statevector(self, name, statevector, **metadata):
+        """Append a statevector as its raw complex128 buffer"""
+        statevector = np.ascontiguousarray(statevector, dtype=np.complex128)
+        self._write_record('statevector', name, {'amplitudes': statevector}, metadata)
+
+    def _write_record(self, kind, name, arrays, metadata):
+        """Write one record and flush it, so readers never see it partly written unless the process dies"""
+        layout, offset = {}, 0
+        for key, array in arrays.items():
+            layout[key] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset += array.nbytes + _padding(array.nbytes)
+        header = json.dumps({'kind': kind, 'name': name, 'arrays': layout, 'metadata': metadata}).encode()
+        header += b' ' * _padding(len(header))
+        self._file.write(RECORD_HEADER.pack(len(header), offset))
+        self._file.write(header)
+        for array in arrays.values():
+            self._file.write(memoryview(array).cast('B'))
+            self._file.write(b'\0' * _padding(array.nbytes))
+        self._file.flush()
+
+    def close(self):
+        """Close the file"""
+        self._file.close()
+
+
+class ResultReader:
+    """Memory-mapped view of a result file; arrays returned by it are read-only views into the file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = []
+        self._names = {}
+        self._map = None
+        self._end = FILE_HEADER.size
+        self.refresh()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, key):
+        """Record by position or by name (the last record written under that name)"""
+        if isinstance(key, str):
+            return self.records[self._names[key]]
+        return self.records[key]
+
+    def refresh(self):
+        """Map the file again and index records appended since the last call"""
+        size = os.path.getsize(self.path)
+        if size < FILE_HEADER.size:
+            return
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{self.path} is not a result file')
+        if version > VERSION:
+            raise ValueError(f'{self.path} has format version {version}, newer than {VERSION}')
+        # Records already indexed keep their views into the previous map, which stays open while they exist
+        position = self._end
+        while position + RECORD_HEADER.size <= size:
+            header_size, data_size = RECORD_HEADER.unpack_from(self._map, position)
+            start = position + RECORD_HEADER.size
+            end = start + header_size + data_size
+            if end > size:
+                break
+            header = json.loads(self._map[start:start + header_size])
+            data = start + header_size
+            arrays = {key: np.frombuffer(self._map, dtype=spec['dtype'], count=int(np.prod(spec['shape'])),
+                                         offset=data + spec['offset']).reshape(spec['shape'])
+                      for key, spec in header['arrays'].items()}
+            self._names[header['name']] = len(self.records)
+            self.records.append(Record(header['kind'], header['name'], header['metadata'], arrays))
+            position = end
+        self._end = position
+
+    def counts_arrays(self, key):
+        """(outcomes, counts) arrays of a counts record, without building a dict"""
+        record = self[key]
+        return record.arrays['outcomes'], record.arrays['counts']
+
+    def get_counts(self, key):
+        """Counts of a record as a dict with bitstring keys, as returned by Result.get_counts"""
+        record = self[key]
+        return decode_counts(record.arrays['outcomes'], record.arrays['counts'], record.metadata['widths'])
+
+    def get_statevector(self, key):
+        """Statevector of a record, as a read-only view into the file"""
+        return self[key].arrays['amplitudes']
+
+    def close(self):
+        """Drop this reader's map; it is unmapped once no returned array refers to it"""
+        self.records = []
+        self._names = {}
+        self._map = None
+
+
+def write_results(path, counts=None, statevectors=None):
+    """Write dicts of name -> counts and name -> statevector to a new result file"""
+    if os.path.exists(path):
+        os.remove(path)
+    with ResultWriter(path) as writer:
+        for name, value in (counts or {}).items():
+            writer.write_counts(name, value)
+        for name, value in (statevectors or {}).items():
+            writer.write_statevector(name, value)
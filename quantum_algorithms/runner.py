@@ -0,0 +1,56 @@
+# Running Circuits
+
+# Explanation:
+# One entry point for running the example circuits, locally or on a Qiskit backend such as the IBMQ one in
+# `Running Quantum Algorithms.py`. The peephole optimizer runs automatically before the circuit is simulated
+# or submitted, so redundant gates never reach the simulator or the remote queue.
+# With a ResultCache, transpiled circuits and seeded results are reused across runs.
+# With a NoiseModel, local runs use the noisy simulator in `noise.py` instead of the ideal statevector simulator.
+
+from .cache import backend_name, cached_counts, cached_statevector, cached_transpile
+from .peephole import optimize_circuit
+from .profiling import span
+from .statevector import sample_counts, simulate_statevector
+
+
+def run_circuit(qc, backend=None, shots=1024, seed=None, optimize=True, cache=None, noise=None):
+    """Run qc and return its counts, on the local statevector simulator when backend is None"""
+    if noise is not None and backend is not None:
+        raise ValueError('Noise models are only simulated locally; pass backend=None')
+    if cache is not None:
+        # The noise model only enters the key when given, so keys of ideal runs stay the same
+        options = {'optimize': optimize} if noise is None else {'optimize': optimize, 'noise': noise}
+        return cached_counts(qc, cache, lambda: _run(qc, backend, shots, seed, optimize, cache, noise), backend,
+                             shots, seed, **options)
+    return _run(qc, backend, shots, seed, optimize, cache, noise)
+
+
+def run_statevector(qc, optimize=True, cache=None):
+    """Return the final statevector of qc from the local simulator"""
+    if cache is not None:
+        return cached_statevector(qc, cache, lambda: simulate_statevector(qc, optimize=optimize), optimize=optimize)
+    return simulate_statevector(qc, optimize=optimize)
+
+
+def _run(qc, backend, shots, seed, optimize, cache, noise=None):
+    """Optimize, transpile and execute a circuit without looking up its counts"""
+    if optimize:
+        qc = optimize_circuit(qc)
+    if noise is not None:
+        from .noise import noisy_counts
+        return noisy_counts(qc, noise, shots=shots, seed=seed, optimize=False)
+    if backend is None:
+        return sample_counts(qc, shots=shots, seed=seed, optimize=False)
+    with span('transpile', backend=backend_name(backend), qubits=qc.num_qubits):
+        if cache is not None:
+            compiled = cached_transpile(qc, backend, cache, seed=seed)
+        else:
+            from qiskit import transpile
+            compiled = transpile(qc, backend, seed_transpiler=seed)
+    options = {'shots': shots}
+    if seed is not None:
+        options['seed_simulator'] = seed
+    with span('run', backend=backend_name(backend), shots=shots):
+        result = backend.run(compiled, **options).result()
+    with span('post-process'):
+        return result.get_counts()
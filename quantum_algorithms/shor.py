@@ -0,0 +1,85 @@
+# Shor's Algorithm
+
+# Explanation:
+# The classical and quantum parts of `Shors Algorithm.py` as importable functions.
+# The classical helpers only use the standard library, so tools that need nothing else start without loading
+# NumPy or Qiskit; the quantum part imports the circuit builders and the simulator on first use.
+
+# Usage:
+#   python -m quantum_algorithms.shor          # runs the N=15 and N=21 examples of the script
+
+import math
+import random
+
+from .profiling import span
+
+
+# Define a function for the classical part of Shor's algorithm
+def shors_classical_part(N):
+    """Return a factor of N found classically, or a random base a coprime to N for the quantum part"""
+    # Step 1: Check if N is even
+    if N % 2 == 0:
+        return 2
+
+    # Step 2: Check if N is a perfect power
+    for a in range(2, math.isqrt(N) + 1):
+        b = 2
+        while a ** b <= N:
+            if a ** b == N:
+                return a
+            b += 1
+
+    # Step 3: Choose a random integer a such that 1 < a < N
+    a = random.randrange(2, N)
+    d = math.gcd(a, N)
+    if d != 1:
+        return d
+    return a
+
+
+def factors_from_period(a, r, N):
+    """Use an even period r of a^x mod N to split N, or return None if r gives no factors"""
+    if r is None or r % 2 != 0:
+        return None
+    factor1 = math.gcd(a ** (r // 2) - 1, N)
+    factor2 = math.gcd(a ** (r // 2) + 1, N)
+    return factor1, factor2
+
+
+# Function to perform the quantum part of Shor's algorithm
+def shors_quantum_part(a, N, n_count, backend=None, shots=1024, seed=None):
+    """Estimate the period of a^x mod N from the most frequent phase-estimation outcome"""
+    from .circuits import shor_circuit
+    from .runner import run_circuit
+
+    counts = run_circuit(shor_circuit(a, N, n_count), backend=backend, shots=shots, seed=seed)
+
+    with span('post-process', algorithm='shor'):
+        # Get the most frequent measurement result and convert it to a phase
+        measured_value = max(counts, key=counts.get)
+        phase = int(measured_value, 2) / (2 ** n_count)
+
+        # A phase of 0 carries no information about the period
+        if phase == 0:
+            return None
+        return int(1 / phase)
+
+
+def run_example(N, n_count, simple_factors):
+    """Run one of the examples of `Shors Algorithm.py`"""
+    a = shors_classical_part(N)
+    if a in simple_factors:
+        print(f"Found factor: {a}")
+        return
+    r = shors_quantum_part(a, N, n_count)
+    print(f"Estimated period: {r}")
+    factors = factors_from_period(a, r, N)
+    if factors is not None:
+        print(f"Factors of {N} are {factors[0]} and {factors[1]}")
+
+
+if __name__ == '__main__':
+    # Example with N=15
+    run_example(15, 3, [2, 3, 5, 7, 11, 13])
+    # Example with N=21
+    run_example(21, 4, [2, 3, 5, 7, 11, 13, 17, 19])
@@ -0,0 +1,163 @@
+# Sparse Statevector Simulator
+
+# Explanation:
+# Circuits such as Bernstein-Vazirani, Deutsch-Jozsa with a constant oracle or `Qubits and Superposition.py` only
+# ever populate a handful of basis states, yet a dense simulator stores all 2^n amplitudes. SparseStatevector keeps
+# only the nonzero amplitudes, as an array of basis-state indices and an array of amplitudes, so its cost follows
+# the number of populated basis states instead of the number of qubits. It switches to the dense simulator once
+# more than density_threshold of all basis states are populated, if the dense state fits in memory.
+
+# Gate order:
+# The example circuits apply H to every qubit first, which populates all 2^n basis states at once even though the
+# final state is a single basis state. schedule_gates reorders the gate list, keeping the order of the gates on
+# each qubit (so the circuit is unchanged), to finish the qubits that are already in use before it starts new ones.
+# For Bernstein-Vazirani this keeps at most 4 basis states populated at any time.
+
+import numpy as np
+
+from .gates import circuit_to_gates, gate_qubits
+from .peephole import optimize_circuit
+from .profiling import span
+from .statevector import counts_from_probabilities
+
+# Amplitudes smaller than this are dropped after every gate
+AMPLITUDE_TOLERANCE = 1e-12
+# Largest number of qubits the sparse engine may convert to a dense statevector
+MAX_DENSE_QUBITS = 28
+# Basis-state indices are stored as uint64
+MAX_SPARSE_QUBITS = 63
+
+
+class SparseStatevector:
+    """Statevector stored as the indices and amplitudes of its nonzero basis states"""
+
+    def __init__(self, num_qubits, indices=None, amplitudes=None):
+        if num_qubits > MAX_SPARSE_QUBITS:
+            raise ValueError(f'The sparse simulator supports at most {MAX_SPARSE_QUBITS} qubits')
+        self.num_qubits = num_qubits
+        self.indices = np.zeros(1, dtype=np.uint64) if indices is None else np.asarray(indices, dtype=np.uint64)
+        self.amplitudes = np.ones(1, dtype=complex) if amplitudes is None else np.asarray(amplitudes, dtype=complex)
+        self.max_nonzero = len(self.indices)
+
+    def __len__(self):
+        return len(self.indices)
+
+    @property
+    def density(self):
+        """Fraction of the 2^n basis states that are populated"""
+        return len(self.indices) / 2 ** self.num_qubits
+
+    def apply(self, gate):
+        """Apply a gate in place"""
+        indices, amplitudes = self.indices, self.amplitudes
+        control_mask = np.uint64(sum(1 << c for c in gate.controls))
+        # Only basis states with every control qubit set are changed
+        active = (indices & control_mask) == control_mask
+        if not active.all():
+            passive_indices, passive_amplitudes = indices[~active], amplitudes[~active]
+            indices, amplitudes = indices[active], amplitudes[active]
+        else:
+            passive_indices = passive_amplitudes = None
+        local = np.zeros(len(indices), dtype=np.intp)
+        for bit, target in enumerate(gate.targets):
+            local |= (((indices >> np.uint64(target)) & np.uint64(1)) << np.uint64(bit)).astype(np.intp)
+        if gate.matrix.ndim == 1:
+            amplitudes = amplitudes * gate.matrix[local]
+        else:
+            indices, amplitudes = self._apply_matrix(indices, amplitudes, local, gate)
+        if passive_indices is not None:
+            indices = np.concatenate([passive_indices, indices])
+            amplitudes = np.concatenate([passive_amplitudes, amplitudes])
+        self.indices, self.amplitudes = indices, amplitudes
+        self.max_nonzero = max(self.max_nonzero, len(indices))
+
+    @staticmethod
+    def _apply_matrix(indices, amplitudes, local, gate):
+        """Apply a dense gate matrix to the populated states it touches"""
+        size = 2 ** len(gate.targets)
+        target_mask = np.uint64(sum(1 << t for t in gate.targets))
+        # Group basis states that differ only in the target bits; each group is one vector the matrix acts on
+        bases, group = np.unique(indices & ~target_mask, return_inverse=True)
+        vectors = np.zeros((len(bases), size), dtype=complex)
+        vectors[group, local] = amplitudes
+        vectors = vectors @ gate.matrix.T
+        offsets = np.array([sum(1 << t for bit, t in enumerate(gate.targets) if j >> bit & 1) for j in range(size)],
+                           dtype=np.uint64)
+        keep = np.abs(vectors) > AMPLITUDE_TOLERANCE
+        rows, columns = np.nonzero(keep)
+        return bases[rows] | offsets[columns], vectors[keep]
+
+    def to_dense(self):
+        """Flat dense statevector"""
+        state = np.zeros(2 ** self.num_qubits, dtype=complex)
+        state[self.indices.astype(np.intp)] = self.amplitudes
+        return state
+
+
+def schedule_gates(gates, num_qubits):
+    """Reorder gates, keeping each qubit's gate order, to finish qubits in use before starting new ones"""
+    wires = [[] for _ in range(num_qubits)]
+    for i, gate in enumerate(gates):
+        for q in gate_qubits(gate):
+            wires[q].append(i)
+    position = [0] * num_qubits
+    opened = [False] * num_qubits
+    scheduled = []
+    ready = {i for i, gate in enumerate(gates) if all(wires[q][0] == i for q in gate_qubits(gate))}
+    while ready:
+        # Prefer gates that open the fewest new qubits, then the earliest one in the original order
+        best = min(ready, key=lambda i: (sum(not opened[q] for q in gate_qubits(gates[i])), i))
+        ready.remove(best)
+        scheduled.append(gates[best])
+        for q in gate_qubits(gates[best]):
+            opened[q] = True
+            position[q] += 1
+            if position[q] < len(wires[q]):
+                candidate = wires[q][position[q]]
+                if all(wires[p][position[p]] == candidate if position[p] < len(wires[p]) else False
+                       for p in gate_qubits(gates[candidate])):
+                    ready.add(candidate)
+            else:
+                # Nothing else happens on a finished qubit, so it no longer counts as in use
+                opened[q] = False
+    return scheduled
+
+
+def run_sparse(gates, num_qubits, density_threshold=0.125, schedule=True):
+    """Apply gates to |0...0⟩ and return a SparseStatevector, or a flat dense statevector after switching"""
+    if schedule:
+        gates = schedule_gates(gates, num_qubits)
+    state = SparseStatevector(num_qubits)
+    for i, gate in enumerate(gates):
+        state.apply(gate)
+        if num_qubits <= MAX_DENSE_QUBITS and state.density > density_threshold:
+            from .statevector import prepare_gates, run_gates
+            return run_gates(prepare_gates(gates[i + 1:], num_qubits), num_qubits, state.to_dense())
+    return state
+
+
+def simulate_sparse(qc, density_threshold=0.125, schedule=True, optimize=True):
+    """Return the final state of qc as (indices, amplitudes) of its nonzero basis states"""
+    if optimize:
+        qc = optimize_circuit(qc, absorb_swaps=False)
+    with span('transpile', engine='sparse', qubits=qc.num_qubits):
+        gates, _ = circuit_to_gates(qc)
+    with span('run', engine='sparse', qubits=qc.num_qubits, gates=len(gates)):
+        state = run_sparse(gates, qc.num_qubits, density_threshold, schedule)
+    if isinstance(state, SparseStatevector):
+        return state.indices, state.amplitudes
+    return np.flatnonzero(state).astype(np.uint64), state[state != 0]
+
+
+def sample_counts_sparse(qc, shots=1024, seed=None, density_threshold=0.125, schedule=True, optimize=True):
+    """Simulate qc with the sparse engine and sample its measurements into a counts dictionary"""
+    if optimize:
+        qc = optimize_circuit(qc)
+    with span('transpile', engine='sparse', qubits=qc.num_qubits):
+        gates, measurements = circuit_to_gates(qc)
+    with span('run', engine='sparse', qubits=qc.num_qubits, gates=len(gates)):
+        state = run_sparse(gates, qc.num_qubits, density_threshold, schedule)
+    if isinstance(state, SparseStatevector):
+        return counts_from_probabilities(np.abs(state.amplitudes) ** 2, measurements, qc.num_clbits, shots, seed,
+                                         indices=state.indices)
+    return counts_from_probabilities(np.abs(state) ** 2, measurements, qc.num_clbits, shots, seed)
@@ -0,0 +1,88 @@
+# Statevector Simulator
+
+# Explanation:
+# A small NumPy statevector simulator for the circuits built in this repository.
+# Every gate application is one sweep over the statevector, which is why the optimization passes
+# (diagonal batching, then gate fusion) work on the gate list before it reaches `run_gates`.
+
+import numpy as np
+
+from .diagonal import batch_diagonal_gates
+from .fusion import fuse_gates
+from .gates import apply_gate, circuit_to_gates
+from .peephole import optimize_circuit
+from .profiling import span
+
+
+def initial_state(num_qubits):
+    """Return the |0...0⟩ state tensor"""
+    state = np.zeros((2,) * num_qubits, dtype=complex)
+    state[(0,) * num_qubits] = 1
+    return state
+
+
+def run_gates(gates, num_qubits, state=None):
+    """Apply a list of gates to the state (default |0...0⟩) and return the flat statevector"""
+    if state is None:
+        state = initial_state(num_qubits)
+    else:
+        state = np.array(state, dtype=complex).reshape((2,) * num_qubits)
+    for gate in gates:
+        state = apply_gate(state, gate, num_qubits)
+    return np.ascontiguousarray(state).reshape(-1)
+
+
+def prepare_gates(gates, num_qubits, fuse=True, batch_diagonal=True, max_fused_qubits=3):
+    """Run the optimization passes selected by the flags over a gate list"""
+    # Batch diagonal runs first, so fusion does not fold cp gates into dense blocks
+    if batch_diagonal:
+        gates = batch_diagonal_gates(gates)
+    if fuse:
+        gates = fuse_gates(gates, num_qubits, max_qubits=max_fused_qubits)
+    return gates
+
+
+def simulate_statevector(qc, fuse=True, batch_diagonal=True, max_fused_qubits=3, optimize=True):
+    """Return the final statevector of a Qiskit circuit, ignoring its measurements"""
+    if optimize:
+        qc = optimize_circuit(qc, absorb_swaps=False)
+    with span('transpile', engine='statevector', qubits=qc.num_qubits):
+        gates, _ = circuit_to_gates(qc)
+        gates = prepare_gates(gates, qc.num_qubits, fuse, batch_diagonal, max_fused_qubits)
+    with span('run', engine='statevector', qubits=qc.num_qubits, gates=len(gates)):
+        return run_gates(gates, qc.num_qubits)
+
+
+def sample_counts(qc, shots=1024, seed=None, fuse=True, batch_diagonal=True, max_fused_qubits=3, optimize=True):
+    """Simulate a Qiskit circuit and sample its measurements into a counts dictionary"""
+    if optimize:
+        qc = optimize_circuit(qc)
+    with span('transpile', engine='statevector', qubits=qc.num_qubits):
+        gates, measurements = circuit_to_gates(qc)
+        gates = prepare_gates(gates, qc.num_qubits, fuse, batch_diagonal, max_fused_qubits)
+    with span('run', engine='statevector', qubits=qc.num_qubits, gates=len(gates)):
+        statevector = run_gates(gates, qc.num_qubits)
+    return counts_from_statevector(statevector, measurements, qc.num_clbits, shots, seed)
+
+
+def counts_from_statevector(statevector, measurements, num_clbits, shots=1024, seed=None):
+    """Sample measurement outcomes from a flat statevector into Qiskit-style bitstring counts"""
+    return counts_from_probabilities(np.abs(statevector) ** 2, measurements, num_clbits, shots, seed)
+
+
+def counts_from_probabilities(probabilities, measurements, num_clbits, shots=1024, seed=None, indices=None):
+    """Sample outcomes from the probabilities of the given basis states (default: all) into bitstring counts"""
+    with span('sample', shots=shots):
+        rng = np.random.default_rng(seed)
+        probabilities = probabilities / probabilities.sum()
+        samples = rng.multinomial(shots, probabilities)
+    with span('post-process', outcomes=int(np.count_nonzero(samples))):
+        counts = {}
+        for position in np.flatnonzero(samples):
+            index = position if indices is None else indices[position]
+            outcome = 0
+            for qubit, clbit in measurements:
+                outcome |= ((int(index) >> qubit) & 1) << clbit
+            key = format(outcome, f'0{num_clbits}b')
+            counts[key] = counts.get(key, 0) + int(samples[position])
+    return counts
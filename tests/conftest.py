@@ -0,0 +1,49 @@
+# Shared fixtures: the repository root on sys.path, small synthetic WBS sheets, and the example circuits with
+# Qiskit's statevector as the reference
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def costs(elements=6, years=20, seed=0, last_year=2024):
+    """Elements x years costs like a normalized workbook: WBS numbers 1.01, 1.02, ... as rows, years as columns"""
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    base = rng.lognormal(10, 1, size=(elements, 1))
+    growth = rng.normal(0.03, 0.02, size=(elements, 1))
+    values = base * (1 + growth) ** np.arange(years) * rng.lognormal(0, 0.05, size=(elements, years))
+    index = pd.Index([f'1.{i:02d}' for i in range(1, elements + 1)], name='wbs')
+    return pd.DataFrame(values.round(2), index=index, columns=[str(year) for year in range(last_year - years + 1,
+                                                                                           last_year + 1)])
+
+
+@pytest.fixture
+def sheet():
+    return costs()
+
+
+@pytest.fixture
+def prepared(sheet):
+    from wbs_forecast.pipeline import Prepared, prepare
+    return Prepared(prepare(sheet))
+
+
+# (name, qubits) of the example circuits the simulators are checked on
+EXAMPLES = [(name, n) for name in ('qft', 'grover', 'bernstein_vazirani', 'deutsch_jozsa', 'deutsch', 'qpe', 'shor')
+            for n in (4, 5)]
+
+
+def example(name, n):
+    from quantum_algorithms.circuits import EXAMPLE_BUILDERS
+    return EXAMPLE_BUILDERS[name](n)
+
+
+def reference_statevector(qc):
+    """Qiskit's statevector of qc without its final measurements"""
+    from qiskit.quantum_info import Statevector
+    return Statevector(qc.remove_final_measurements(inplace=False)).data
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression, Ridge
+
+from conftest import costs
+from wbs_forecast.backtest import IncrementalLinear, backtest
+from wbs_forecast.pipeline import Prepared, prepare
+
+
+@pytest.mark.parametrize('alpha', [0.0, 10.0])
+def test_incremental_linear_matches_scikit_learn(prepared, alpha):
+    X, y = prepared.X.to_numpy(), prepared.y.to_numpy()
+    model = IncrementalLinear(alpha)
+    for start in range(0, len(X), 4):
+        model.partial_fit(X[start:start + 4], y[start:start + 4])
+    reference = (Ridge(alpha=alpha) if alpha else LinearRegression()).fit(X, y)
+    scale = np.abs(y).max()
+    np.testing.assert_allclose(model.predict(X), reference.predict(X), rtol=0, atol=1e-6 * scale)
+    np.testing.assert_allclose(model.predict(prepared.future_X), reference.predict(prepared.future_X.to_numpy()),
+                               rtol=0, atol=1e-6 * scale)
+
+
+def test_warm_linear_backtest_matches_a_cold_one(prepared):
+    warm = backtest(prepared, 'linear', min_train=12)
+    cold = backtest(prepared, 'linear', min_train=12, warm=False)
+    np.testing.assert_allclose(warm['forecast'], cold['forecast'], rtol=1e-6)
+
+
+def test_backtest_rejects_years_with_a_gap():
+    sheet = costs()
+    sheet.loc['1.03', '2015'] = np.nan
+    with pytest.raises(ValueError, match='2014 to 2016'):
+        backtest(Prepared(prepare(sheet)), 'linear', min_train=12)
+
+
+def test_incremental_linear_matches_scikit_learn_with_more_elements_than_years():
+    data = Prepared(prepare(costs(elements=30, years=12), elements=None))
+    X, y = data.X.to_numpy(), data.y.to_numpy()
+    model = IncrementalLinear().partial_fit(X[:5], y[:5]).partial_fit(X[5:], y[5:])
+    # Both take the minimum-norm solution of the underdetermined system
+    expected = LinearRegression().fit(X, y).predict(data.future_X.to_numpy())
+    np.testing.assert_allclose(model.predict(data.future_X), expected, rtol=0, atol=1e-6 * np.abs(y).max())
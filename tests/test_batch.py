@@ -0,0 +1,30 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import costs
+from wbs_forecast.batch import _r2, forecast_frame
+
+
+def test_r2_matches_scikit_learn():
+    from sklearn.metrics import r2_score
+    rng = np.random.default_rng(0)
+    y_true, y_pred = rng.normal(size=(2, 5, 3)), rng.normal(size=(2, 5, 3))
+    mask = np.ones((2, 3))
+    np.testing.assert_allclose(_r2(y_true, y_pred, mask), [r2_score(t, p) for t, p in zip(y_true, y_pred)])
+
+
+def test_r2_is_nan_for_a_single_test_year():
+    assert np.isnan(_r2(np.ones((2, 1, 3)), np.zeros((2, 1, 3)), np.ones((2, 3)))).all()
+
+
+@pytest.mark.parametrize('vectorize', [True, False])
+def test_stacked_and_per_batch_fits_agree_on_a_single_test_year(tmp_path, vectorize):
+    # Six years give five pairs, so a 20% test split holds one year
+    output = tmp_path / 'forecast.csv'
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        forecast_frame(costs(elements=4, years=6), str(output), model='linear', batch_size=2, vectorize=vectorize)
+    assert pd.read_csv(output)['r2'].isna().all()
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from conftest import costs
+from wbs_forecast.features import build_features
+from wbs_forecast.pipeline import prepare
+
+
+def test_lags_are_the_years_before_each_target(prepared):
+    features = build_features(prepared.data, lags=3, windows=(2,), growth=True)
+    frame = features.frame()
+    data = prepared.data
+    assert frame.index[0] == data.index[3] and frame.index[-1] == data.index[-1] + 1
+    for lag in (1, 2, 3):
+        np.testing.assert_allclose(frame.loc[2010, f'lag_{lag}'], data.loc[2010 - lag], rtol=1e-6)
+    np.testing.assert_allclose(frame.loc[2010, 'mean_2'], data.loc[2008:2009].mean(), rtol=1e-6)
+    np.testing.assert_array_equal(features.y, data.loc[data.index[3]:].to_numpy())
+
+
+def test_years_with_a_gap_are_rejected():
+    sheet = costs()
+    sheet.loc['1.02', '2012'] = np.nan
+    with pytest.raises(ValueError, match='2011 to 2013'):
+        build_features(prepare(sheet), lags=3)
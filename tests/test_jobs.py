@@ -0,0 +1,63 @@
+import warnings
+
+import pytest
+
+from quantum_algorithms.batching import run_batched
+from quantum_algorithms.circuits import bernstein_vazirani_circuit, grover_circuit
+from quantum_algorithms.jobs import AsyncJobPool, FakeQueueBackend
+from quantum_algorithms.statevector import sample_counts
+
+
+@pytest.fixture
+def recording_backend():
+    """A generic backend that records the circuits of every job it runs"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        from qiskit.providers.fake_provider import GenericBackendV2
+        backend = GenericBackendV2(4, seed=1)
+    backend.submitted = []
+    run = backend.run
+
+    def recording_run(circuits, **options):
+        backend.submitted.extend(circuits if isinstance(circuits, list) else [circuits])
+        return run(circuits, **options)
+
+    backend.run = recording_run
+    return backend
+
+
+def most_frequent(counts):
+    return max(counts, key=counts.get)
+
+
+def only_native(circuit, backend):
+    return {instruction.operation.name for instruction in circuit.data} <= set(backend.operation_names) | {'barrier'}
+
+
+def test_pool_transpiles_for_the_backend(recording_backend):
+    pool = AsyncJobPool(recording_backend, max_in_flight=2, poll_interval=0.01)
+    try:
+        results = pool.run_all([bernstein_vazirani_circuit('101')] * 3, shots=128)
+    finally:
+        pool.close()
+    # The generic backend is noisy, so only the most frequent outcome is certain
+    assert all(most_frequent(result.get_counts()) == '101' for result in results)
+    assert len(recording_backend.submitted) == 3
+    assert all(only_native(qc, recording_backend) for qc in recording_backend.submitted)
+
+
+def test_pool_runs_again_with_more_jobs_than_in_flight():
+    pool = AsyncJobPool(FakeQueueBackend(time_scale=0.0005, seed=1), max_in_flight=2, poll_interval=0.01)
+    try:
+        for _ in range(2):
+            assert len(pool.run_all([grover_circuit(3)] * 5)) == 5
+    finally:
+        pool.close()
+
+
+def test_batches_are_transpiled_before_they_are_packed(recording_backend):
+    circuits = [bernstein_vazirani_circuit(secret) for secret in ('101', '011', '110')]
+    counts = run_batched(circuits, recording_backend, max_batch=2, shots=128)
+    assert [most_frequent(c) for c in counts] == [most_frequent(sample_counts(qc, shots=128)) for qc in circuits]
+    assert len(recording_backend.submitted) == 3
+    assert all(only_native(qc, recording_backend) for qc in recording_backend.submitted)
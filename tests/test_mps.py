@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+
+from conftest import EXAMPLES, example, reference_statevector
+from quantum_algorithms.mps import simulate_mps
+
+
+@pytest.mark.parametrize('name, n', EXAMPLES)
+def test_mps_statevector_matches_qiskit(name, n):
+    qc = example(name, n)
+    np.testing.assert_allclose(simulate_mps(qc).to_statevector(), reference_statevector(qc), atol=1e-10)
+
+
+def test_controlled_gates_on_distant_qubits():
+    qc = QuantumCircuit(6)
+    qc.h(range(6))
+    qc.ry(0.3, 2)
+    qc.ccx(0, 5, 3)
+    qc.cp(0.7, 4, 1)
+    qc.mcx([1, 3, 5], 0)
+    qc.cswap(2, 0, 5)
+    qc.rz(1.1, 3)
+    np.testing.assert_allclose(simulate_mps(qc, optimize=False).to_statevector(), reference_statevector(qc),
+                               atol=1e-10)
+
+
+def test_qft_keeps_a_small_bond_dimension():
+    qc = example('qft', 10)
+    state = simulate_mps(qc)
+    # The QFT of a basis state is a product state, so no bond needs more than one singular value
+    assert max(state.bond_dimensions()) == 1
+    np.testing.assert_allclose(state.to_statevector(), reference_statevector(qc), atol=1e-10)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+
+from conftest import EXAMPLES, example, reference_statevector
+from quantum_algorithms.peephole import flatten_circuit, optimize_circuit
+
+
+@pytest.mark.parametrize('name, n', EXAMPLES)
+def test_optimized_circuits_have_the_same_statevector(name, n):
+    qc = example(name, n)
+    optimized = optimize_circuit(qc, absorb_swaps=False)
+    assert optimized.size() <= flatten_circuit(qc).size()
+    np.testing.assert_allclose(reference_statevector(optimized), reference_statevector(qc), atol=1e-12)
+
+
+def test_h_cx_h_becomes_a_controlled_z():
+    qc = QuantumCircuit(2)
+    qc.h(1)
+    qc.cx(0, 1)
+    qc.h(1)
+    assert dict(optimize_circuit(qc).count_ops()) == {'cz': 1}
+
+
+# c_if is deprecated in recent Qiskit releases, but the optimizer still has to respect it
+@pytest.mark.filterwarnings('ignore::DeprecationWarning')
+@pytest.mark.parametrize('conditioned', [0, 2])
+def test_a_conditioned_h_is_not_folded(conditioned):
+    qc = QuantumCircuit(2, 1)
+    qc.measure(0, 0)
+    for position in range(3):
+        instruction = qc.cx(0, 1) if position == 1 else qc.h(1)
+        if position == conditioned:
+            instruction.c_if(0, 1)
+    assert dict(optimize_circuit(qc).count_ops()) == {'measure': 1, 'h': 2, 'cx': 1}
@@ -0,0 +1,21 @@
+import os
+
+import numpy as np
+
+from quantum_algorithms.reporting import Report, file_stem
+
+
+def test_file_stems_are_safe_and_unique():
+    assert file_stem(3, 'grover') == '003-grover'
+    assert file_stem(0, '../../etc/passwd', width=1) == '0-_.._etc_passwd'
+    assert file_stem(7, '..', width=2) == '07'
+
+
+def test_results_with_the_same_name_get_their_own_files(tmp_path):
+    report = Report()
+    report.add_counts('grover', {'00': 3, '11': 5})
+    report.add_counts('grover', {'01': 8})
+    report.add_statevector('sub/qft', np.array([1, 0, 0, 0], dtype=complex))
+    files = report.render(str(tmp_path), workers=1)
+    assert [os.path.basename(f) for f in files] == ['0-grover.png', '1-grover.png', '2-sub_qft.png']
+    assert sorted(os.listdir(tmp_path)) == ['0-grover.png', '1-grover.png', '2-sub_qft.png']
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from quantum_algorithms.reporting import Report
+from quantum_algorithms.results import ResultReader, ResultWriter, write_results
+
+COUNTS = {
+    'single': {'0': 3, '1': 1021},
+    'registers': {'01 110': 5, '10 001': 70000, '00 000': 1},
+    'wide': {'1' * 64: 2, '0' * 63 + '1': 9},
+    'empty': {},
+}
+
+
+def test_counts_and_statevectors_round_trip(tmp_path):
+    path = str(tmp_path / 'results.qar')
+    rng = np.random.default_rng(0)
+    statevector = rng.normal(size=32) + 1j * rng.normal(size=32)
+    write_results(path, COUNTS, {'random': statevector})
+    with ResultReader(path) as reader:
+        assert [record.name for record in reader] == list(COUNTS) + ['random']
+        for name, counts in COUNTS.items():
+            assert reader.get_counts(name) == counts
+        np.testing.assert_array_equal(reader.get_statevector('random'), statevector)
+        assert not reader.get_statevector('random').flags.writeable
+
+
+def test_appended_records_appear_after_refresh(tmp_path):
+    path = str(tmp_path / 'results.qar')
+    with ResultWriter(path) as writer:
+        writer.write_counts('first', {'00': 1}, shots=1)
+        reader = ResultReader(path)
+        writer.write_counts('second', {'11': 2})
+        assert len(reader) == 1
+        reader.refresh()
+    assert reader.get_counts('second') == {'11': 2}
+    assert reader['first'].metadata == {'shots': 1, 'widths': [2]}
+
+
+def test_a_partly_written_record_ends_the_file(tmp_path):
+    path = tmp_path / 'results.qar'
+    write_results(str(path), {'kept': {'1': 1}, 'cut': {'0': 1}})
+    path.write_bytes(path.read_bytes()[:-5])
+    with ResultReader(str(path)) as reader:
+        assert [record.name for record in reader] == ['kept']
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / 'results.qar'
+    path.write_bytes(b'not a result file')
+    with pytest.raises(ValueError, match='not a result file'):
+        ResultReader(str(path))
+
+
+def test_reports_round_trip(tmp_path):
+    report = Report()
+    report.add_counts('grover', {'00': 3, '11': 5})
+    report.add_statevector('qft', np.array([0.6, 0.8j]))
+    path = str(tmp_path / 'report.qar')
+    report.save(path)
+    loaded = Report.load(path)
+    assert [(kind, name) for kind, name, _ in loaded.items] == [('counts', 'grover'), ('statevector', 'qft')]
+    assert loaded.items[0][2] == {'00': 3, '11': 5}
+    np.testing.assert_array_equal(loaded.items[1][2], [0.6, 0.8j])
@@ -0,0 +1,54 @@
+import numpy as np
+
+from wbs_forecast.persistence import load_model, save_model
+from wbs_forecast.service import Client, ModelRegistry, make_server
+
+
+def _forest(seed):
+    from sklearn.ensemble import RandomForestRegressor
+    rng = np.random.default_rng(seed)
+    return RandomForestRegressor(10, random_state=seed).fit(rng.random((40, 3)), rng.random((40, 3)))
+
+
+def test_saved_forest_predicts_like_sklearn(tmp_path):
+    forest = _forest(0)
+    X = np.random.default_rng(1).random((20, 3))
+    assert np.allclose(load_model(save_model(forest, tmp_path / 'm')).predict(X), forest.predict(X))
+
+
+def test_resave_leaves_loaded_model_alone(tmp_path):
+    old, new = _forest(0), _forest(1)
+    X = np.random.default_rng(2).random((5, 3))
+    save_model(old, tmp_path / 'm', next_year=2025)
+    loaded = load_model(tmp_path / 'm')
+    save_model(new, tmp_path / 'm', next_year=2026)
+    assert np.allclose(loaded.predict(X), old.predict(X))
+    assert loaded.meta['next_year'] == 2025
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['m']
+
+
+def test_registry_reloads_a_model_saved_again(tmp_path):
+    old, new = _forest(0), _forest(1)
+    X = np.random.default_rng(3).random((5, 3))
+    save_model(old, tmp_path / 'm')
+    registry = ModelRegistry(str(tmp_path))
+    assert np.allclose(registry.get('m').predict(X), old.predict(X))
+    save_model(new, tmp_path / 'm')
+    assert np.allclose(registry.get('m').predict(X), new.predict(X))
+
+
+def test_service_answers_queries(tmp_path):
+    import threading
+    forest = _forest(0)
+    save_model(forest, tmp_path / 'm', ['a', 'b', 'c'], 2025)
+    server = make_server(str(tmp_path), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = Client(*server.server_address)
+        X = np.random.default_rng(4).random((2, 3))
+        assert np.allclose(client.predict('m', X), forest.predict(X))
+        assert client.models()['m']['next_year'] == 2025
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from conftest import EXAMPLES, example, reference_statevector
+from quantum_algorithms.sparse import simulate_sparse
+
+
+def dense(indices, amplitudes, num_qubits):
+    state = np.zeros(2 ** num_qubits, dtype=complex)
+    state[indices.astype(np.int64)] = amplitudes
+    return state
+
+
+@pytest.mark.parametrize('schedule', [True, False])
+@pytest.mark.parametrize('density_threshold', [0.125, 1.0])
+@pytest.mark.parametrize('name, n', EXAMPLES)
+def test_sparse_statevector_matches_qiskit(name, n, density_threshold, schedule):
+    qc = example(name, n)
+    indices, amplitudes = simulate_sparse(qc, density_threshold, schedule)
+    np.testing.assert_allclose(dense(indices, amplitudes, qc.num_qubits), reference_statevector(qc), atol=1e-12)
+
+
+def test_bernstein_vazirani_stays_sparse():
+    qc = example('bernstein_vazirani', 12)
+    indices, amplitudes = simulate_sparse(qc, density_threshold=1.0)
+    assert len(indices) <= 2
+    np.testing.assert_allclose(dense(indices, amplitudes, qc.num_qubits), reference_statevector(qc), atol=1e-12)
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from conftest import EXAMPLES, example, reference_statevector
+from quantum_algorithms.statevector import sample_counts, simulate_statevector
+
+PASSES = {
+    'plain': {'fuse': False, 'batch_diagonal': False, 'optimize': False},
+    'diagonal': {'fuse': False, 'batch_diagonal': True, 'optimize': False},
+    'fused': {'fuse': True, 'batch_diagonal': False, 'optimize': False},
+    'fused 2 qubits': {'fuse': True, 'batch_diagonal': True, 'max_fused_qubits': 2, 'optimize': False},
+    'all': {},
+}
+
+
+@pytest.mark.parametrize('passes', list(PASSES))
+@pytest.mark.parametrize('name, n', EXAMPLES)
+def test_statevector_matches_qiskit(name, n, passes):
+    qc = example(name, n)
+    np.testing.assert_allclose(simulate_statevector(qc, **PASSES[passes]), reference_statevector(qc), atol=1e-12)
+
+
+@pytest.mark.filterwarnings('ignore::DeprecationWarning')
+@pytest.mark.parametrize('name', ['bernstein_vazirani', 'deutsch_jozsa', 'deutsch'])
+def test_counts_match_qiskit_on_deterministic_circuits(name):
+    from qiskit import BasicAer, execute
+    qc = example(name, 4)
+    expected = execute(qc, BasicAer.get_backend('qasm_simulator'), shots=100).result().get_counts()
+    assert sample_counts(qc, shots=100, seed=1) == expected
@@ -0,0 +1,21 @@
+import pytest
+
+from wbs_forecast.tuning import GRIDS, tune
+
+
+@pytest.mark.parametrize('name', ['linear', 'ridge'])
+def test_every_model_has_a_grid_it_accepts(prepared, name):
+    result = tune(prepared, name, n_splits=3, use_cache=False)
+    assert set(result.best_params) == set(GRIDS[name])
+    assert result.model.predict(prepared.future_X.to_numpy()).shape == (1, prepared.data.shape[1])
+
+
+def test_model_without_a_grid_needs_one(prepared):
+    from wbs_forecast.pipeline import MODELS, register_model
+    register_model('constant', MODELS['linear'])
+    try:
+        with pytest.raises(ValueError, match='No default grid'):
+            tune(prepared, 'constant', use_cache=False)
+        assert tune(prepared, 'constant', {'fit_intercept': [True]}, n_splits=3, use_cache=False).best_params
+    finally:
+        del MODELS['constant']
@@ -0,0 +1,45 @@
+# WBS Cost Forecasting
+
+# Shared building blocks for the WBS cost-forecast scripts in the repository root (`Testing`, `Me`, `Other` and
+# `Random Forrest`), which read a workbook of WBS elements (rows) by year (columns) and forecast the next year.
+
+# Names are exported lazily: importing the package does not load pandas or scikit-learn; each submodule is imported
+# the first time one of its names is used.
+
+import importlib
+
+_EXPORTS = {
+    'load_workbook': 'ingest',
+    'load_model': 'persistence',
+    'update_workbook': 'incremental',
+    'build_features': 'features',
+    'PredictionWriter': 'output',
+    'read_predictions': 'output',
+    'save_model': 'persistence',
+    'Client': 'service',
+    'make_server': 'service',
+    'backtest': 'backtest',
+    'summarize': 'backtest',
+    'tune': 'tuning',
+    'forecast_frame': 'batch',
+    'forecast_workbook': 'batch',
+    'MODELS': 'pipeline',
+    'VARIANTS': 'pipeline',
+    'register_model': 'pipeline',
+    'run_models': 'pipeline',
+    'run_variant': 'pipeline',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
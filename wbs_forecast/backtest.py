@@ -0,0 +1,208 @@
+# Walk-Forward Backtesting
+
+# Explanation:
+# The scripts score their models with train_test_split(..., test_size=0.2, random_state=42), which shuffles the
+# years, so the model is trained on years after the ones it is tested on. A backtest replays history instead: at
+# every origin year it trains on the pairs (year, next year) up to that year only, forecasts the following years,
+# and compares the forecasts with what happened. The window expands by `step` years from one origin to the next.
+# Forecasts further than one year ahead are recursive: the forecast for origin + 1 is fed back to forecast origin + 2,
+# and so on up to the largest horizon.
+
+# Warm starts:
+# Refitting from scratch at every origin repeats almost all the work of the previous one, so by default:
+# - linear and ridge models keep running sums of the window (X'X, X'y and the means) and add the new pairs to them,
+#   then solve a small system of elements x elements, instead of refitting on the whole window;
+# - random and extra-trees forests keep their trees and, at each new origin, replace the `refresh` oldest trees by
+#   as many new ones grown on the whole window, so the forest stays the same size and moves with the data at a
+#   fraction of the cost of a new forest. Trees only predict values they were trained on, so the older trees lag a
+#   trend: the fewer trees are replaced, the faster and the less accurate the backtest (bench_backtest.py shows both);
+# - other models are refitted from scratch.
+# warm=False refits every model from scratch, which gives the reference scores.
+
+# Usage:
+#   python -m wbs_forecast.backtest your_file.xlsx --model random_forest --horizons 1 2 3 --min-train 10
+
+import argparse
+import time
+
+import numpy as np
+
+from .ingest import add_sheet_argument
+from .pipeline import MODELS, RANDOM_STATE, SELECTED_ELEMENTS, check_consecutive_years, load_prepared, make_model
+
+# Models updated with running sums, and forests updated by replacing their oldest trees
+INCREMENTAL = {'linear', 'ridge'}
+WARM_FORESTS = {'random_forest', 'extra_trees'}
+
+
+class IncrementalLinear:
+    """Least squares (or ridge) regression with an intercept, updated a few rows at a time"""
+
+    def __init__(self, alpha=0.0):
+        self.alpha = alpha
+        self.count = 0
+        self.coef_ = self.intercept_ = None
+
+    def partial_fit(self, X, y):
+        """Add rows to the running sums and solve again"""
+        X, y = np.asarray(X, dtype=float), np.asarray(y, dtype=float)
+        if not self.count:
+            # Sums are kept around the first rows' means, so X'X does not lose precision on large costs
+            self._x_shift, self._y_shift = X.mean(axis=0), y.mean(axis=0)
+            self._sx = np.zeros(X.shape[1])
+            self._sy = np.zeros(y.shape[1])
+            self._sxx = np.zeros((X.shape[1], X.shape[1]))
+            self._sxy = np.zeros((X.shape[1], y.shape[1]))
+        X, y = X - self._x_shift, y - self._y_shift
+        self.count += len(X)
+        self._sx += X.sum(axis=0)
+        self._sy += y.sum(axis=0)
+        self._sxx += X.T @ X
+        self._sxy += X.T @ y
+        self._solve()
+        return self
+
+    def _solve(self):
+        x_mean, y_mean = self._sx / self.count, self._sy / self.count
+        # Centred, as scikit-learn does to fit the intercept
+        gram = self._sxx - self.count * np.outer(x_mean, x_mean)
+        moment = self._sxy - self.count * np.outer(x_mean, y_mean)
+        if self.alpha:
+            self.coef_ = np.linalg.solve(gram + self.alpha * np.eye(len(gram)), moment)
+        else:
+            self.coef_ = np.linalg.pinv(gram, hermitian=True) @ moment
+        self.intercept_ = y_mean + self._y_shift - (x_mean + self._x_shift) @ self.coef_
+
+    def predict(self, X):
+        return np.asarray(X, dtype=float) @ self.coef_ + self.intercept_
+
+
+class _Refit:
+    """Fits a new model on the whole window at every origin"""
+
+    def __init__(self, name, params):
+        self.name = name
+        self.params = params
+        self.model = None
+
+    def update(self, X, y, start, end):
+        self.model = make_model(self.name, **self.params)
+        self.model.fit(X[:end], y[:end])
+
+    def predict(self, x):
+        return self.model.predict(x)
+
+
+class _Incremental(_Refit):
+    """Adds the window's new pairs to an IncrementalLinear"""
+
+    def update(self, X, y, start, end):
+        if self.model is None:
+            alpha = self.params.get('alpha', 1.0) if self.name == 'ridge' else 0.0
+            self.model = IncrementalLinear(alpha)
+            start = 0
+        self.model.partial_fit(X[start:end], y[start:end])
+
+
+class _WarmForest(_Refit):
+    """Replaces the forest's oldest trees by trees grown on the whole window"""
+
+    def __init__(self, name, params, refresh):
+        super().__init__(name, params)
+        self.refresh = refresh
+        self.origins = 0
+
+    def update(self, X, y, start, end):
+        if self.model is None:
+            self.model = make_model(self.name, **self.params)
+            self.model.fit(X[:end], y[:end])
+        else:
+            self.model.estimators_ = self.model.estimators_[self.refresh:]
+            # A new seed per origin, otherwise the new trees would reuse the dropped trees' seeds
+            seed = self.params.get('random_state', RANDOM_STATE)
+            self.model.set_params(warm_start=True, random_state=seed + self.origins)
+            self.model.fit(X[:end], y[:end])
+        self.origins += 1
+
+
+def _updater(name, warm, refresh, params):
+    if warm and name in INCREMENTAL:
+        return _Incremental(name, params)
+    if warm and name in WARM_FORESTS:
+        trees = params.get('n_estimators', 100)
+        return _WarmForest(name, params, refresh or max(1, trees // 3))
+    return _Refit(name, params)
+
+
+def backtest(prepared, name, horizons=(1, 2, 3), min_train=10, step=1, warm=True, refresh=None, **params):
+    """Walk forward over the years of prepared data and return one row per origin, horizon and element
+
+    Rows have the origin year, the horizon, the forecast year, the element, the forecast and the actual cost (NaN
+    when the forecast year is after the last one). min_train is the number of pairs in the first window; refresh is
+    the number of trees a warm forest replaces at each origin (a third of the forest by default). The years must be
+    consecutive, since each one is paired with the next row and horizons count rows.
+    """
+    import pandas as pd
+    check_consecutive_years(prepared.data)
+    values = prepared.data.to_numpy(dtype=float)
+    years = prepared.data.index.to_numpy()
+    elements = list(prepared.data.columns)
+    X, y = values[:-1], values[1:]
+    if len(X) <= min_train:
+        raise ValueError(f'Not enough years for a backtest: {len(values)} years, min_train={min_train}')
+    updater = _updater(name, warm, refresh, params)
+    frames = []
+    previous = 0
+    # The origin is the last year the model knows; the pairs up to it are X[:origin], y[:origin]
+    for origin in range(min_train, len(values) - 1, step):
+        updater.update(X, y, previous, origin)
+        previous = origin
+        state = values[origin:origin + 1]
+        for horizon in range(1, max(horizons) + 1):
+            state = np.asarray(updater.predict(state)).reshape(1, -1)
+            if horizon not in horizons:
+                continue
+            target = origin + horizon
+            actual = values[target] if target < len(values) else np.full(len(elements), np.nan)
+            frames.append(pd.DataFrame({'origin': years[origin], 'horizon': horizon, 'year': years[origin] + horizon,
+                                        'wbs': elements, 'forecast': state[0], 'actual': actual}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize(results):
+    """MAE, RMSE and mean absolute percentage error by horizon, over the forecasts with an actual cost"""
+    scored = results.dropna(subset=['actual'])
+    error = scored['forecast'] - scored['actual']
+    frame = scored.assign(abs_error=error.abs(), squared_error=error ** 2,
+                          pct_error=(error / scored['actual']).abs() * 100)
+    summary = frame.groupby('horizon').agg(forecasts=('abs_error', 'size'), mae=('abs_error', 'mean'),
+                                           rmse=('squared_error', 'mean'), mape=('pct_error', 'mean'))
+    summary['rmse'] = np.sqrt(summary['rmse'])
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Walk-forward backtest of a forecast model on a WBS workbook')
+    parser.add_argument('path', help='workbook with WBS elements as rows and years as columns')
+    parser.add_argument('--model', choices=list(MODELS), default='random_forest')
+    parser.add_argument('--elements', nargs='*', default=list(SELECTED_ELEMENTS),
+                        help='elements to model; none given means every element')
+    parser.add_argument('--horizons', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--min-train', type=int, default=10, help='pairs of years in the first window')
+    parser.add_argument('--step', type=int, default=1, help='years between origins')
+    parser.add_argument('--cold', action='store_true', help='refit every model from scratch')
+    add_sheet_argument(parser)
+    parser.add_argument('--output', help='write every forecast to this .csv file')
+    args = parser.parse_args(argv)
+
+    prepared = load_prepared(args.path, args.elements or None, sheet_name=args.sheet)
+    start = time.perf_counter()
+    results = backtest(prepared, args.model, tuple(args.horizons), args.min_train, args.step, warm=not args.cold)
+    print(summarize(results).to_string(float_format=lambda value: f'{value:.2f}'))
+    print(f'Backtest: {results["origin"].nunique()} origins in {time.perf_counter() - start:.2f} s')
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+# Forecasting Every Element
+
+# Explanation:
+# The scripts model six elements, 1.01 to 1.06, together: each year's costs of the six predict the next year's. This
+# module forecasts every element of a sheet the same way, in batches that follow the WBS numbering: siblings (the
+# children of one parent, e.g. 1.01.001, 1.01.002, ...) are modelled together, in chunks of at most batch_size, just
+# as the scripts model the siblings 1.01 to 1.06. Each batch keeps its own years without missing values and gets the
+# scripts' shuffled 80/20 split, MAE and R², and a forecast for the year after its last complete year.
+# - Linear and ridge regressions are fitted for all batches at once: batches with the same years are stacked into
+#   one array (padded with zero columns up to the largest batch) and solved with one batched pseudo-inverse or linear
+#   solve, which gives the same coefficients as scikit-learn's LinearRegression and Ridge. Parameters other than
+#   Ridge's alpha are not implemented by the solve, so with them the batches are fitted one by one as below.
+# - Other models (random forests, ...) are fitted batch by batch through fit_and_forecast, in a pool of n_jobs
+#   processes, each task fitting several batches so the data sent between processes stays small.
+# - Forecasts are written as they are produced, one row per element (model, wbs, batch, year, forecast and the
+#   batch's mae and r2), to a Parquet or CSV file or by default to a new run of the prediction dataset (see
+#   output.py), so memory does not grow with the sheet.
+
+# Usage:
+#   python -m wbs_forecast.batch your_file.xlsx --model ridge
+#   python -m wbs_forecast.batch your_file.xlsx --model random_forest --jobs 4 --output forecasts.csv
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from .ingest import add_sheet_argument, load_workbook
+from .output import DEFAULT_ROOT, ForecastWriter, PredictionWriter
+from .pipeline import RANDOM_STATE, MODELS, Prepared, fit_and_forecast
+
+# Models fitted for all batches at once with NumPy
+VECTORIZED = {'linear', 'ridge'}
+# Model parameters the stacked solve implements; with any other parameter the batches are fitted one by one
+STACKED_PARAMS = {'linear': set(), 'ridge': {'alpha'}}
+# Fewest years (after dropping missing values) a batch needs: two pairs to train on and one to test
+MIN_YEARS = 4
+COLUMNS = ['model', 'wbs', 'batch', 'year', 'forecast', 'mae', 'r2']
+
+
+def parent(element):
+    """WBS number of an element's parent ('' for top-level elements)"""
+    return element.rpartition('.')[0]
+
+
+def group_elements(elements, batch_size=32):
+    """Split elements into batches of siblings, in sheet order, with at most batch_size elements each"""
+    siblings = {}
+    for element in elements:
+        siblings.setdefault(parent(element), []).append(element)
+    batches = []
+    for children in siblings.values():
+        step = batch_size or len(children)
+        batches.extend(children[start:start + step] for start in range(0, len(children), step))
+    return batches
+
+
+def years_by_elements(df):
+    """Transpose a workbook frame to years x elements, dropping elements without any value"""
+    data = df.T
+    data.index = data.index.astype(int)
+    return data.dropna(axis=1, how='all')
+
+
+def _rows(model, batches, elements, year, forecast, mae, r2):
+    """Output rows, one per element, with its batch's number, forecast year (shared or per batch) and scores"""
+    import pandas as pd
+    sizes = [len(names) for names in elements]
+    year = np.broadcast_to(year, len(sizes))
+    return pd.DataFrame({'model': model, 'wbs': np.concatenate(elements), 'batch': np.repeat(batches, sizes),
+                         'year': np.repeat(year, sizes), 'forecast': np.concatenate(forecast),
+                         'mae': np.repeat(mae, sizes), 'r2': np.repeat(r2, sizes)})
+
+
+def _r2(y_true, y_pred, mask):
+    """R² averaged over the real (unpadded) targets, as sklearn's r2_score, for a stack of batches"""
+    if y_true.shape[1] < 2:
+        # R² is not defined for a single test year; r2_score returns NaN then
+        return np.full(len(y_true), np.nan)
+    ss_res = ((y_true - y_pred) ** 2).sum(axis=1)
+    ss_tot = ((y_true - y_true.mean(axis=1, keepdims=True)) ** 2).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.where(ss_res > 0, 0.0, 1.0))
+    return (scores * mask).sum(axis=1) / mask.sum(axis=1)
+
+
+def _fit_stacked(values, year, members, names, model, test_size, random_state, alpha=1.0):
+    """Fit linear or ridge regressions for batches sharing the same years (the rows of values); return their rows"""
+    from sklearn.model_selection import train_test_split
+    width = max(len(columns) for _, columns in members)
+    # Batches x years x elements, padded with zero columns; the mask marks the real elements
+    stacked = np.zeros((len(members), len(values), width))
+    mask = np.zeros((len(members), width))
+    for slot, (_, columns) in enumerate(members):
+        stacked[slot, :, :len(columns)] = values[:, columns]
+        mask[slot, :len(columns)] = 1
+    X, y, future = stacked[:, :-1], stacked[:, 1:], stacked[:, -1:]
+    # Every batch has the same number of pairs, so they all get the same split
+    train, test = train_test_split(np.arange(X.shape[1]), test_size=test_size, random_state=random_state)
+    X_train, y_train = X[:, train], y[:, train]
+    # Centred, as scikit-learn does to fit the intercept
+    x_mean, y_mean = X_train.mean(axis=1, keepdims=True), y_train.mean(axis=1, keepdims=True)
+    Xc, yc = X_train - x_mean, y_train - y_mean
+    if model == 'linear':
+        coef = np.linalg.pinv(Xc) @ yc
+    else:
+        gram = Xc.transpose(0, 2, 1) @ Xc + alpha * np.eye(width)
+        coef = np.linalg.solve(gram, Xc.transpose(0, 2, 1) @ yc)
+    intercept = y_mean - x_mean @ coef
+    y_pred = X[:, test] @ coef + intercept
+    y_test = y[:, test]
+    mae = (np.abs(y_test - y_pred).mean(axis=1) * mask).sum(axis=1) / mask.sum(axis=1)
+    r2 = _r2(y_test, y_pred, mask)
+    forecast = (future @ coef + intercept)[:, 0]
+    return _rows(model, [batch for batch, _ in members], [names[columns] for _, columns in members], year,
+                 [forecast[slot, :len(columns)] for slot, (_, columns) in enumerate(members)], mae, r2)
+
+
+def _fit_batches(tasks, model, test_size, random_state, params):
+    """Fit one model per batch with fit_and_forecast; return the rows of all the batches"""
+    import pandas as pd
+    batches, elements, years, forecasts, mae, r2 = [], [], [], [], [], []
+    for batch, (names, index, values) in tasks:
+        prepared = Prepared(pd.DataFrame(values, index=index, columns=names))
+        result = fit_and_forecast(prepared, model, test_size, random_state, **params)
+        batches.append(batch)
+        elements.append(names)
+        # Batches missing different years can forecast different years
+        years.append(prepared.next_year)
+        forecasts.append(result.forecast.to_numpy()[0])
+        mae.append(result.mae)
+        r2.append(result.r2)
+    return _rows(model, batches, elements, years, forecasts, mae, r2)
+
+
+def _complete_batches(values, batches):
+    """Each batch's years without missing values, as a mask of rows; skips batches with fewer than MIN_YEARS"""
+    missing = np.isnan(values)
+    for batch, columns in enumerate(batches):
+        rows = ~missing[:, columns].any(axis=1)
+        if rows.sum() >= MIN_YEARS:
+            yield batch, columns, rows
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def forecast_frame(df, output, model='random_forest', batch_size=32, n_jobs=1, test_size=0.2,
+                   random_state=RANDOM_STATE, chunk_batches=64, vectorize=True, **params):
+    """Forecast every element of a workbook frame (elements x years) and write the rows to output
+
+    output is a .parquet or .csv path, or an open writer such as a PredictionWriter. Returns the number of elements
+    forecast. vectorize=False fits linear models batch by batch as well.
+    """
+    if model not in MODELS:
+        raise ValueError(f'Unknown model: {model} (choose from {", ".join(MODELS)})')
+    data = years_by_elements(df)
+    names = data.columns.to_numpy()
+    years = data.index.to_numpy()
+    values = data.to_numpy(dtype=float)
+    position = {element: index for index, element in enumerate(names)}
+    batches = [np.array([position[element] for element in elements])
+               for elements in group_elements(list(names), batch_size)]
+    if hasattr(output, 'write'):
+        return _forecast_batches(output, model, names, years, values, batches, n_jobs, test_size, random_state,
+                                 chunk_batches, vectorize, params)
+    with ForecastWriter(output) as writer:
+        return _forecast_batches(writer, model, names, years, values, batches, n_jobs, test_size, random_state,
+                                 chunk_batches, vectorize, params)
+
+
+def _forecast_batches(writer, model, names, years, values, batches, n_jobs, test_size, random_state, chunk_batches,
+                      vectorize, params):
+    """Fit the batches and write their rows; returns the number of rows written"""
+    start = writer.rows
+    if vectorize and model in VECTORIZED and set(params) <= STACKED_PARAMS[model]:
+        # Batches are stacked by their years, so each stack is one array without missing values
+        stacks = {}
+        for batch, columns, rows in _complete_batches(values, batches):
+            stacks.setdefault(rows.tobytes(), (rows, []))[1].append((batch, columns))
+        for rows, members in stacks.values():
+            year = int(years[rows][-1]) + 1
+            for chunk in _chunks(members, chunk_batches * 16):
+                writer.write(_fit_stacked(values[rows], year, chunk, names, model, test_size, random_state,
+                                          **params))
+        return writer.rows - start
+    # Plain arrays are cheaper to send to the workers than DataFrames
+    tasks = ((batch, (list(names[columns]), years[rows], values[np.ix_(rows, columns)]))
+             for batch, columns, rows in _complete_batches(values, batches))
+    chunks = _chunks(tasks, chunk_batches)
+    if n_jobs == 1:
+        for chunk in chunks:
+            writer.write(_fit_batches(chunk, model, test_size, random_state, params))
+        return writer.rows - start
+    from concurrent.futures import ProcessPoolExecutor
+    workers = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+    with ProcessPoolExecutor(workers) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(_fit_batches, chunk, model, test_size, random_state, params))
+            # Keep a few chunks per worker queued, writing the oldest as it finishes
+            while len(pending) > 2 * workers:
+                writer.write(pending.pop(0).result())
+        for future in pending:
+            writer.write(future.result())
+    return writer.rows - start
+
+
+def forecast_workbook(path, output, model='random_forest', batch_size=32, n_jobs=1, sheet_name=0, cache=None,
+                      **params):
+    """Forecast every element of a workbook sheet, loaded through the columnar cache; see forecast_frame"""
+    df = load_workbook(path, sheet_name, cache=cache)
+    return forecast_frame(df, output, model, batch_size, n_jobs, **params)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Forecast the next year of every WBS element in a workbook')
+    parser.add_argument('path', help='workbook with WBS elements as rows and years as columns')
+    parser.add_argument('--output', help='.parquet or .csv file for the forecasts (default: a new prediction run)')
+    parser.add_argument('--root', default=DEFAULT_ROOT, help='prediction dataset the run is written to')
+    parser.add_argument('--model', choices=list(MODELS), default='random_forest')
+    parser.add_argument('--batch-size', type=int, default=32, help='most siblings modelled together')
+    parser.add_argument('--jobs', type=int, default=1, help='worker processes for non-linear models (-1: all)')
+    add_sheet_argument(parser)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.output:
+        count = forecast_workbook(args.path, args.output, args.model, args.batch_size, args.jobs, args.sheet)
+        destination = args.output
+    else:
+        with PredictionWriter(args.root) as writer:
+            count = forecast_workbook(args.path, writer, args.model, args.batch_size, args.jobs, args.sheet)
+        destination = writer.path
+    seconds = time.perf_counter() - start
+    print(f'Forecast {count} elements in {seconds:.2f} s ({count / seconds:.0f} elements/s), written to '
+          f'{destination}')
+
+
+if __name__ == '__main__':
+    main()
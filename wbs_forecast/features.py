@@ -0,0 +1,183 @@
+# Lag Features
+
+# Explanation:
+# The scripts pair each year with the next one (X = df.iloc[:-1], y = df.iloc[1:]), so a model only ever sees the
+# year before the one it forecasts. build_features gives it longer history, for every element at once:
+# - lags: the costs of the `lags` years before the target year. The years x elements values are stored once as a
+#   C-ordered float32 array, in which `lags` consecutive years are `lags * elements` consecutive numbers, so the whole
+#   lag block (a row per target year, a column per lag and element) is a strided view of that array: no lag is ever
+#   copied, whatever the number of lags. Shifting and concatenating the frame once per lag instead keeps a float64
+#   copy of the frame per lag.
+# - rolling means of the last w years for each window w, computed from one cumulative sum instead of per window.
+# - growth: the relative change between the two years before the target year (0 where the earlier year is 0).
+# Each feature block has one row per target year from the first year with enough history to the year after the
+# last, whose row is the forecast input (future_X). Features has the same X, y, future_X, next_year and data as
+# pipeline.Prepared, so fit_and_forecast fits and scores a model on it unchanged; X is a view when there is only the
+# lag block, and the blocks are concatenated into one float32 matrix otherwise.
+# Lags count rows, so the years must be consecutive: build_features raises a ValueError when prepare has dropped a
+# year with missing costs, rather than treating the year before the gap as the year before the target.
+
+# Usage:
+#   python -m wbs_forecast.features your_file.xlsx --lags 3 --windows 3 --growth
+#   from wbs_forecast.features import build_features
+#   features = build_features(prepared.data, lags=3, windows=(3,), growth=True)
+#   fit_and_forecast(features, 'random_forest')
+
+import argparse
+
+import numpy as np
+
+DTYPE = np.float32
+
+
+def as_values(data, dtype=DTYPE):
+    """Years x elements values as a C-ordered array of dtype (not copied if it already is one)"""
+    values = data.to_numpy() if hasattr(data, 'to_numpy') else data
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+def lag_view(values, lags, start=None):
+    """Read-only view of the lags before each target year, from year `start` (default: lags) to the year after the
+    last: row t - start holds years t - lags to t - 1, oldest first, each as a block of elements"""
+    values = np.ascontiguousarray(values)
+    years, elements = values.shape
+    start = lags if start is None else start
+    if start < lags or start > years:
+        raise ValueError(f'Need {lags} years before the first target year {start}, and at most {years}')
+    first = values[start - lags:]
+    return np.lib.stride_tricks.as_strided(first, shape=(years - start + 1, lags * elements),
+                                           strides=(values.strides[0], values.strides[1]), writeable=False)
+
+
+def rolling_means(values, windows, start, dtype=DTYPE):
+    """Mean of the w years before each target year (start to the year after the last), one block per window"""
+    years, elements = values.shape
+    totals = np.zeros((years + 1, elements))
+    np.cumsum(values, axis=0, dtype=float, out=totals[1:])
+    blocks = []
+    for window in windows:
+        if window < 1 or window > start:
+            raise ValueError(f'Window {window} must be between 1 and the first target year {start}')
+        block = np.empty((years - start + 1, elements), dtype=dtype)
+        np.subtract(totals[start:], totals[start - window:years + 1 - window], out=block)
+        block /= window
+        blocks.append(block)
+    return blocks
+
+
+def growth_rates(values, start, dtype=DTYPE):
+    """Relative change from two years to one year before each target year; 0 where the earlier year is 0"""
+    if start < 2:
+        raise ValueError('Growth needs two years before the first target year')
+    before, last = values[start - 2:-1], values[start - 1:]
+    block = np.zeros(last.shape, dtype=dtype)
+    np.divide(last - before, before, out=block, where=before != 0, casting='same_kind')
+    return block
+
+
+class Features:
+    """Feature blocks for each target year, the targets, and the forecast input for the year after the last"""
+
+    def __init__(self, data, values, blocks, start):
+        self.data = data
+        self.values = values
+        self.blocks = blocks
+        self.start = start
+
+    @property
+    def rows(self):
+        """All feature rows, the forecast input last: the lag view itself if it is the only block"""
+        blocks = list(self.blocks.values())
+        return blocks[0] if len(blocks) == 1 else np.hstack(blocks)
+
+    @property
+    def X(self):
+        """Features of the target years with known costs"""
+        return self.rows[:-1]
+
+    @property
+    def y(self):
+        """Costs of the target years"""
+        return self.data.to_numpy(dtype=float)[self.start:]
+
+    @property
+    def future_X(self):
+        """Features of the year after the last"""
+        return self.rows[-1:]
+
+    @property
+    def next_year(self):
+        return int(self.data.index[-1]) + 1
+
+    @property
+    def years(self):
+        """Target year of each feature row"""
+        return np.arange(self.start, len(self.data) + 1) + int(self.data.index[0])
+
+    @property
+    def nbytes(self):
+        """Memory held: the values the lags view, and the other blocks"""
+        return self.values.nbytes + sum(block.nbytes for name, block in self.blocks.items() if name != 'lag')
+
+    def columns(self):
+        """(feature, element) of every column of X"""
+        elements = [str(element) for element in self.data.columns]
+        return [column for name, block in self.blocks.items()
+                for column in self._block_columns(name, block, elements)]
+
+    @staticmethod
+    def _block_columns(name, block, elements):
+        if name == 'lag':
+            lags = block.shape[1] // len(elements)
+            return [(f'lag_{lags - step}', element) for step in range(lags) for element in elements]
+        return [(name, element) for element in elements]
+
+    def frame(self):
+        """All feature rows as a DataFrame indexed by target year, with (feature, element) columns"""
+        import pandas as pd
+        return pd.DataFrame(self.rows, index=pd.Index(self.years, name='year'),
+                            columns=pd.MultiIndex.from_tuples(self.columns(), names=['feature', 'wbs']))
+
+
+def build_features(data, lags=3, windows=(), growth=False, dtype=DTYPE):
+    """Lag, rolling-mean and growth features of years x elements data (e.g. Prepared.data)"""
+    from .pipeline import check_consecutive_years
+    check_consecutive_years(data)
+    values = as_values(data, dtype)
+    start = max([lags] + list(windows) + ([2] if growth else []))
+    if start >= len(values):
+        raise ValueError(f'{len(values)} years are not enough for {start} years of history and a target year')
+    blocks = {'lag': lag_view(values, lags, start)}
+    for window, block in zip(windows, rolling_means(values, windows, start, dtype)):
+        blocks[f'mean_{window}'] = block
+    if growth:
+        blocks['growth'] = growth_rates(values, start, dtype)
+    return Features(data, values, blocks, start)
+
+
+def main(argv=None):
+    from .ingest import add_sheet_argument
+    from .pipeline import MODELS, SELECTED_ELEMENTS, fit_and_forecast, load_prepared
+    parser = argparse.ArgumentParser(description='Compare a model on the previous year with one on lag features')
+    parser.add_argument('path', help='workbook with WBS elements as rows and years as columns')
+    parser.add_argument('--model', choices=list(MODELS), default='random_forest')
+    parser.add_argument('--lags', type=int, default=3)
+    parser.add_argument('--windows', type=int, nargs='*', default=[], help='rolling-mean windows in years')
+    parser.add_argument('--growth', action='store_true', help='add the last growth rate')
+    parser.add_argument('--elements', nargs='*', default=list(SELECTED_ELEMENTS),
+                        help='elements to model; none given means every element')
+    add_sheet_argument(parser)
+    args = parser.parse_args(argv)
+
+    prepared = load_prepared(args.path, args.elements or None, sheet_name=args.sheet)
+    features = build_features(prepared.data, args.lags, args.windows, args.growth)
+    print(f'{len(features.columns())} features for {len(features.X)} target years, '
+          f'{features.nbytes / 1e3:.1f} kB (the lags are a view of the values)')
+    for label, source in (('previous year', prepared), ('lag features', features)):
+        result = fit_and_forecast(source, args.model)
+        print(f'{label:<14} MAE {result.mae:12.2f}  R² {result.r2:6.2f}')
+        print(result.forecast)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+# Incremental Retraining
+
+# Explanation:
+# Every year one column is appended to the WBS workbook, and the scripts then transpose and refit everything. update
+# keeps the state of the last run (the prepared years x elements frame, the fitted model, the modelled elements and
+# a hash of every year of their costs) and compares the new sheet with it:
+# - unchanged: nothing to do; the stored model's forecast is returned.
+# - new years only (the usual yearly update): the new years are transposed and appended to the prepared frame, and
+#   the model is updated with the new (year, next year) pairs instead of being refitted: linear and ridge models
+#   are IncrementalLinear sums (see backtest.py) that add each pair as a rank-one update, and random and extra-trees
+#   forests grow `add_trees` new trees on all the pairs with warm_start, dropping their oldest trees beyond
+#   `max_trees` so the forest does not grow without bound.
+# - anything else (an earlier year of the modelled elements was edited or added, the selection gained or lost
+#   elements, a different model): full rebuild. Elements added outside the selection do not count as a change.
+# Models are fitted on all the pairs, without the scripts' test split. Instead, before updating, the stored model
+# forecasts each new year from the year before it, which gives its one-step-ahead error on data it has never seen.
+
+# Usage:
+#   python -m wbs_forecast.incremental your_file.xlsx --variant testing
+#   (run it again after adding a year to the workbook)
+
+import argparse
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+from .backtest import IncrementalLinear
+from .ingest import add_sheet_argument, cache_dir, load_workbook, normalize
+from .pipeline import RANDOM_STATE, SELECTED_ELEMENTS, VARIANTS, make_model, prepare, select_elements
+
+STATE = 'state.json'
+PREPARED = 'prepared.feather'
+MODEL = 'model.pickle'
+FORESTS = {'random_forest', 'extra_trees'}
+
+
+class UpdateResult:
+    """What an update found and did, and the forecast of the updated model"""
+
+    def __init__(self, mode, new_years, changed_years, new_elements, forecast, new_year_mae, seconds):
+        self.mode = mode
+        self.new_years = new_years
+        self.changed_years = changed_years
+        self.new_elements = new_elements
+        self.forecast = forecast
+        self.new_year_mae = new_year_mae
+        self.seconds = seconds
+
+
+def column_hashes(df):
+    """Hash of every year column of a workbook frame (elements x years), over its elements in order"""
+    import pandas as pd
+    hashes = pd.util.hash_pandas_object(df.T, index=False)
+    # One hash per row of the transpose, i.e. per year, covering its values in element order
+    return {str(year): format(int(value), '016x') for year, value in zip(df.columns, hashes.to_numpy())}
+
+
+def state_dir(name, directory=None):
+    """Directory of the stored state of an incremental model"""
+    return os.path.join(directory or os.path.join(cache_dir(), 'incremental'), name)
+
+
+def _load_state(path):
+    try:
+        with open(os.path.join(path, STATE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _save(path, state, data, model):
+    os.makedirs(path, exist_ok=True)
+    data.rename_axis('year').reset_index().to_feather(os.path.join(path, PREPARED), compression='uncompressed')
+    # Plain pickle: several times faster than joblib for forests of many small trees
+    with open(os.path.join(path, MODEL), 'wb') as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    # state.json last, so it always describes a complete set of files
+    temporary = os.path.join(path, STATE + '.tmp')
+    with open(temporary, 'w') as f:
+        json.dump(state, f)
+    os.replace(temporary, os.path.join(path, STATE))
+
+
+def _load(path):
+    from pyarrow import feather
+    data = feather.read_table(os.path.join(path, PREPARED)).to_pandas().set_index('year')
+    with open(os.path.join(path, MODEL), 'rb') as f:
+        return data, pickle.load(f)
+
+
+def _fit(model_name, X, y, params):
+    """New model on all the pairs: an IncrementalLinear for linear models, else the pipeline's model"""
+    if model_name in ('linear', 'ridge'):
+        alpha = params.get('alpha', 1.0) if model_name == 'ridge' else 0.0
+        return IncrementalLinear(alpha).partial_fit(X, y)
+    model = make_model(model_name, **params)
+    model.fit(X, y)
+    return model
+
+
+def _grow(model, model_name, X, y, new_X, new_y, add_trees, max_trees, year, params):
+    """Update a model with new pairs: rank-one updates for linear models, new trees for forests"""
+    if model_name in ('linear', 'ridge'):
+        return model.partial_fit(new_X, new_y)
+    if model_name in FORESTS:
+        if max_trees is not None and len(model.estimators_) + add_trees > max_trees:
+            model.estimators_ = model.estimators_[len(model.estimators_) + add_trees - max_trees:]
+        # A new seed each year, otherwise the new trees would repeat the seeds of the dropped ones
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + add_trees,
+                         random_state=RANDOM_STATE + year)
+        model.fit(X, y)
+        return model
+    return _fit(model_name, X, y, params)
+
+
+def update_frame(df, name, model_name='random_forest', elements=SELECTED_ELEMENTS, match='exact', order='selected',
+                 directory=None, add_trees=25, max_trees=200, rebuild=False, **params):
+    """Bring the stored model `name` up to date with a workbook frame (elements x years); rebuild=True refits it"""
+    import pandas as pd
+    start = time.perf_counter()
+    df = normalize(df)
+    path = state_dir(name, directory)
+    state = _load_state(path)
+    features = select_elements(df.index, elements, match, order)
+    hashes = column_hashes(df.loc[features])
+    options = {'model': model_name, 'elements': None if elements is None else list(elements), 'match': match,
+               'order': order, 'params': params}
+
+    new_years = changed_years = new_elements = []
+    new_year_mae = None
+    mode = 'rebuild'
+    if state is not None and state['options'] == options and not rebuild:
+        old = state['hashes']
+        new_years = sorted((year for year in hashes if year not in old), key=int)
+        changed_years = [year for year in old if hashes.get(year) != old[year]]
+        # Only years after the stored ones can be appended; a backfilled earlier year changes the pairs around it
+        appendable = all(int(year) > max(state['years']) for year in new_years)
+        if not changed_years and features == state['features'] and appendable:
+            mode = 'incremental' if new_years else 'unchanged'
+
+    if state is not None:
+        new_elements = sorted(set(map(str, df.index)) - set(state['elements']))
+    if mode == 'rebuild':
+        data = prepare(df, elements, match, order)
+        model = _fit(model_name, data.iloc[:-1].to_numpy(), data.iloc[1:].to_numpy(), params)
+    else:
+        data, model = _load(path)
+        if mode == 'incremental':
+            # Only the new columns are transposed; years with missing values are dropped, as prepare does
+            added = df.loc[features, new_years].T
+            added.index = added.index.astype(int)
+            added = added.dropna()
+            values = np.vstack([data.to_numpy(), added.to_numpy()])
+            count = len(data)
+            data = pd.concat([data, added])
+            new_X, new_y = values[count - 1:-1], values[count:]
+            if len(new_X):
+                new_year_mae = float(np.abs(np.asarray(model.predict(new_X)) - new_y).mean())
+                model = _grow(model, model_name, values[:-1], values[1:], new_X, new_y, add_trees, max_trees,
+                              int(data.index[-1]), params)
+
+    if mode != 'unchanged':
+        state = {'options': options, 'hashes': hashes, 'features': features, 'elements': list(map(str, df.index)),
+                 'years': [int(year) for year in data.index]}
+        _save(path, state, data, model)
+    forecast = pd.DataFrame(np.asarray(model.predict(data.iloc[-1:].to_numpy())), columns=data.columns,
+                            index=[int(data.index[-1]) + 1])
+    return UpdateResult(mode, new_years, changed_years, new_elements, forecast, new_year_mae,
+                        time.perf_counter() - start)
+
+
+def update_workbook(path, variant='testing', sheet_name=0, directory=None, **kwargs):
+    """Update the stored model of one of the scripts' variants from a workbook"""
+    options = VARIANTS[variant]
+    df = load_workbook(path, sheet_name)
+    return update_frame(df, variant, options['model'], SELECTED_ELEMENTS, options['match'], options['order'],
+                        directory, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Update a forecast model with the new years of a WBS workbook')
+    parser.add_argument('path', help='workbook with WBS elements as rows and years as columns')
+    parser.add_argument('--variant', choices=list(VARIANTS), default='testing')
+    parser.add_argument('--add-trees', type=int, default=25, help='trees a forest grows for each update')
+    parser.add_argument('--rebuild', action='store_true', help='refit the model from scratch')
+    add_sheet_argument(parser)
+    args = parser.parse_args(argv)
+
+    result = update_workbook(args.path, args.variant, args.sheet, add_trees=args.add_trees, rebuild=args.rebuild)
+    print(f'Mode: {result.mode} ({result.seconds:.2f} s)')
+    if result.new_years:
+        print(f'New years: {", ".join(result.new_years)}')
+    if result.changed_years:
+        print(f'Changed years: {", ".join(result.changed_years)}')
+    if result.new_year_mae is not None:
+        print(f'MAE of the previous model on the new years: {result.new_year_mae:.2f}')
+    print(f'Forecast:\n{result.forecast}')
+
+
+if __name__ == '__main__':
+    main()
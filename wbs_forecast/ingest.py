@@ -0,0 +1,155 @@
+# Workbook Ingestion
+
+# Explanation:
+# The forecast scripts start with `pd.read_excel(file_path, ...)`, which parses the workbook's XML in a single
+# thread on every run and takes longer than training the models on large WBS sheets. load_workbook converts a sheet
+# once into a columnar Arrow file (Feather, or Parquet for smaller files) and reads that on later runs:
+# - A manifest next to the cached files records each source's size, modification time and SHA-256. If the size
+#   and mtime are unchanged the cached file is used without reading the workbook at all; if only the mtime changed
+#   (the file was copied or touched) the workbook is hashed, and the cache is still reused when the content is the
+#   same. Otherwise the sheet is converted again.
+# - Feather files are memory-mapped on load, so reading one costs little more than building the DataFrame.
+# - The frame has the WBS elements as a string index and the years as string columns, which is what the scripts
+#   build from `pd.read_excel(file_path, index_col=0)` before transposing.
+
+# Usage:
+#   from wbs_forecast.ingest import load_workbook
+#   df = load_workbook("your_file.xlsx")      # first run converts, later runs read the cache
+
+import hashlib
+import json
+import os
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'wbs_forecast')
+FORMATS = {'feather': '.feather', 'parquet': '.parquet'}
+INDEX_NAME = 'wbs'
+MANIFEST = 'manifest.json'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_dir(path=None):
+    """Directory of the cached columnar files, created if needed"""
+    path = path or os.environ.get('WBS_FORECAST_CACHE', DEFAULT_CACHE_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _read_manifest(directory):
+    """Manifest entries keyed by source path and sheet"""
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_manifest(directory, manifest):
+    """Replace the manifest atomically, so a crash never leaves it half written"""
+    temporary = os.path.join(directory, MANIFEST + '.tmp')
+    with open(temporary, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(temporary, os.path.join(directory, MANIFEST))
+
+
+def read_sheet(path, sheet_name=0):
+    """Read a sheet with pandas and normalize it: WBS elements as a string index, years as string columns"""
+    import pandas as pd
+    df = pd.read_excel(path, sheet_name=sheet_name, index_col=0)
+    return normalize(df)
+
+
+def normalize(df):
+    """WBS elements as a string index named 'wbs' and string column names, as the columnar formats require"""
+    df = df.copy(deep=False)
+    df.index = df.index.astype(str)
+    df.index.name = INDEX_NAME
+    df.columns = df.columns.astype(str)
+    return df
+
+
+def write_columnar(df, path, fmt='feather'):
+    """Write a normalized frame as Feather or Parquet"""
+    table = df.reset_index()
+    if fmt == 'feather':
+        # Uncompressed, so the file can be memory-mapped when it is read
+        table.to_feather(path, compression='uncompressed')
+    elif fmt == 'parquet':
+        table.to_parquet(path, index=False)
+    else:
+        raise ValueError(f'Unknown columnar format: {fmt}')
+
+
+def read_columnar(path):
+    """Read a frame written by write_columnar"""
+    if path.endswith(FORMATS['feather']):
+        from pyarrow import feather
+        table = feather.read_table(path, memory_map=True)
+    else:
+        from pyarrow import parquet
+        table = parquet.read_table(path)
+    return table.to_pandas().set_index(INDEX_NAME)
+
+
+def _cached_entry(source, sheet_name, fmt, directory, manifest, refresh=False):
+    """Manifest entry of an unchanged workbook, or None when the sheet has to be converted again"""
+    entry = manifest.get(f'{source}::{sheet_name}')
+    if entry is None or refresh or entry['format'] != fmt:
+        return None
+    if not os.path.exists(os.path.join(directory, entry['file'])):
+        return None
+    stat = os.stat(source)
+    if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry
+    if entry['size'] == stat.st_size and entry['sha256'] == file_digest(source):
+        entry['mtime_ns'] = stat.st_mtime_ns
+        _write_manifest(directory, manifest)
+        return entry
+    return None
+
+
+def load_workbook(path, sheet_name=0, fmt='feather', cache=None, refresh=False):
+    """Return a sheet of the workbook at path, from the columnar cache when the workbook has not changed"""
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown columnar format: {fmt}')
+    directory = cache_dir(cache)
+    manifest = _read_manifest(directory)
+    source = os.path.abspath(path)
+    entry = _cached_entry(source, sheet_name, fmt, directory, manifest, refresh)
+    if entry is not None:
+        return read_columnar(os.path.join(directory, entry['file']))
+    stat = os.stat(source)
+    digest = file_digest(source)
+    df = read_sheet(source, sheet_name)
+    # Files are named after the content, so two copies of one workbook share a cached file
+    name = f'{digest[:24]}-{sheet_name}{FORMATS[fmt]}'
+    write_columnar(df, os.path.join(directory, name), fmt)
+    manifest[f'{source}::{sheet_name}'] = {'file': name, 'format': fmt, 'size': stat.st_size,
+                                          'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+    _write_manifest(directory, manifest)
+    return df
+
+
+def workbook_digest(path, sheet_name=0, fmt='feather', cache=None):
+    """SHA-256 of a workbook, from the manifest when the file has not changed since it was converted"""
+    directory = cache_dir(cache)
+    source = os.path.abspath(path)
+    entry = _cached_entry(source, sheet_name, fmt, directory, _read_manifest(directory))
+    return entry['sha256'] if entry is not None else file_digest(source)
+
+
+def sheet_name(value):
+    """Sheet given on a command line: a position if it is all digits (0 is the first sheet), else a sheet's name"""
+    return int(value) if value.isdigit() else value
+
+
+def add_sheet_argument(parser):
+    """Add the --sheet option shared by the command-line tools"""
+    parser.add_argument('--sheet', type=sheet_name, default=0, help='sheet position (0 is the first) or name')
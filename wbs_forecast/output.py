@@ -0,0 +1,190 @@
+# Prediction Output
+
+# Explanation:
+# The scripts end with predicted_2025_df.to_excel("predicted_2025.xlsx"), which overwrites the previous run's file
+# and is slow for many rows, and with ace_tools.display_dataframe_to_user, which only exists in a notebook. This
+# module writes predictions as a columnar dataset instead:
+# - Every run gets a run ID (time plus a random suffix) and its own partition directory,
+#   predictions/run_id=<run ID>/, so runs never overwrite each other and pyarrow or pandas read all of them as one
+#   dataset with a run_id column (read_predictions).
+# - PredictionWriter streams rows into one Parquet file per run: frames are converted to Arrow as they arrive and
+#   written as row groups of rows_per_group rows, so memory stays bounded however many elements, models and years
+#   are written. run.json, written when the writer is closed, records the row count and marks the run complete; a
+#   run that was never given a frame has no Parquet file, and readers treat it as empty.
+# - Forecasts in the scripts' wide layout (a row per year, a column per element) are stored long: one row per model,
+#   element and year (to_long).
+# - export_excel converts a finished run to Excel at the end, splitting it over sheets at Excel's row limit.
+# - show displays a frame with ace_tools when it is available and prints it otherwise.
+
+# Usage:
+#   from wbs_forecast.output import PredictionWriter
+#   with PredictionWriter() as writer:
+#       writer.write(to_long(result.forecast, 'random_forest'))
+#   writer.export_excel()
+
+import datetime
+import json
+import os
+import uuid
+
+DEFAULT_ROOT = 'predictions'
+PART = 'part-0.parquet'
+RUN_INFO = 'run.json'
+# Rows per sheet in Excel, less the header
+EXCEL_MAX_ROWS = 1048575
+
+
+def new_run_id():
+    """Sortable, unique run ID: UTC time and a random suffix"""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return f'{now:%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}'
+
+
+def to_long(forecast, model):
+    """Rows (model, wbs, year, forecast) from a forecast with years as rows and elements as columns"""
+    long = forecast.rename_axis(index='year', columns='wbs').stack().rename('forecast').reset_index()
+    long.insert(0, 'model', model)
+    long['wbs'] = long['wbs'].astype(str)
+    return long[['model', 'wbs', 'year', 'forecast']]
+
+
+class ForecastWriter:
+    """Appends frames (or Arrow tables, for Parquet) to a Parquet or CSV file, a chunk at a time"""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._writer = None
+
+    def write(self, frame):
+        if self.path.endswith('.csv'):
+            frame.to_csv(self.path, mode='a' if self.rows else 'w', header=not self.rows, index=False)
+        else:
+            import pyarrow as pa
+            from pyarrow import parquet
+            table = frame if isinstance(frame, pa.Table) else pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = parquet.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        self.rows += len(frame)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class PredictionWriter:
+    """Streams prediction rows into the run's partition of the prediction dataset"""
+
+    def __init__(self, root=DEFAULT_ROOT, run_id=None, rows_per_group=250000):
+        self.root = root
+        self.run_id = run_id or new_run_id()
+        self.path = os.path.join(root, f'run_id={self.run_id}')
+        self.rows_per_group = rows_per_group
+        os.makedirs(self.path, exist_ok=True)
+        self._file = ForecastWriter(os.path.join(self.path, PART))
+        self._pending = []
+        self._pending_rows = 0
+        self.closed = False
+
+    @property
+    def rows(self):
+        return self._file.rows + self._pending_rows
+
+    def write(self, frame):
+        """Add rows; they are written once rows_per_group of them are waiting"""
+        import pyarrow as pa
+        table = frame if isinstance(frame, pa.Table) else pa.Table.from_pandas(frame, preserve_index=False)
+        self._pending.append(table)
+        self._pending_rows += len(table)
+        if self._pending_rows >= self.rows_per_group:
+            self.flush()
+
+    def flush(self):
+        """Write the waiting rows as one row group"""
+        if self._pending:
+            import pyarrow as pa
+            self._file.write(pa.concat_tables(self._pending))
+            self._pending, self._pending_rows = [], 0
+
+    def close(self):
+        """Write the remaining rows and run.json, which marks the run complete"""
+        if self.closed:
+            return
+        self.flush()
+        self._file.close()
+        info = {'run_id': self.run_id, 'rows': self._file.rows,
+                'finished': datetime.datetime.now(datetime.timezone.utc).isoformat()}
+        with open(os.path.join(self.path, RUN_INFO), 'w') as f:
+            json.dump(info, f, indent=1)
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def export_excel(self, path=None):
+        """Write the run to an Excel file (in the run's directory by default); returns its path"""
+        self.close()
+        return export_excel(self.run_id, path, self.root)
+
+
+def read_run(run_id, root=DEFAULT_ROOT):
+    """Rows of one run as a DataFrame (empty for a run that wrote no rows)"""
+    path = os.path.join(root, f'run_id={run_id}', PART)
+    if not os.path.exists(path):
+        import pandas as pd
+        return pd.DataFrame()
+    from pyarrow import parquet
+    return parquet.read_table(path).to_pandas()
+
+
+def read_predictions(root=DEFAULT_ROOT, run_ids=None):
+    """Rows of the complete runs (all, or those in run_ids) as one DataFrame with a run_id column"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import parquet
+    runs = [name.partition('=')[2] for name in sorted(os.listdir(root))
+            if name.startswith('run_id=') and os.path.exists(os.path.join(root, name, RUN_INFO))]
+    if run_ids is not None:
+        runs = [run for run in runs if run in set(run_ids)]
+    # A run that never received a frame has run.json but no Parquet file (and no rows)
+    files = [path for path in (os.path.join(root, f'run_id={run}', PART) for run in runs) if os.path.exists(path)]
+    # Runs of different kinds (e.g. the scripts' and the batch forecasts) have different columns
+    schema = pa.unify_schemas([parquet.read_schema(path) for path in files] + [pa.schema([('run_id', pa.string())])])
+    dataset = ds.dataset(files, schema=schema, format='parquet', partitioning=ds.partitioning(flavor='hive'),
+                         partition_base_dir=root)
+    return dataset.to_table().to_pandas()
+
+
+def export_excel(run_id, path=None, root=DEFAULT_ROOT):
+    """Write a run to Excel, one sheet per EXCEL_MAX_ROWS rows; returns the file's path"""
+    import pandas as pd
+    path = path or os.path.join(root, f'run_id={run_id}', 'predictions.xlsx')
+    data = read_run(run_id, root)
+    with pd.ExcelWriter(path) as excel:
+        for sheet, start in enumerate(range(0, max(len(data), 1), EXCEL_MAX_ROWS)):
+            data.iloc[start:start + EXCEL_MAX_ROWS].to_excel(excel, sheet_name=f'predictions_{sheet + 1}',
+                                                               index=False)
+    return path
+
+
+def show(frame, name):
+    """Display a frame in the notebook with ace_tools, or print it where ace_tools is not available"""
+    try:
+        import ace_tools as tools
+    except ImportError:
+        print(f'{name}:\n{frame}')
+        return
+    tools.display_dataframe_to_user(name=name, dataframe=frame)
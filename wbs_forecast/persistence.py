@@ -0,0 +1,185 @@
+# Model Persistence
+
+# Explanation:
+# The scripts retrain their model on every run just to call model.predict(future_X) once. save_model writes a
+# fitted model to a directory so it can be loaded and queried without retraining:
+# - Random and extra-trees forests are flattened into one set of node arrays for all their trees (children, split
+#   feature, threshold and leaf values), saved as .npy files. load_model memory-maps them, so loading is nearly
+#   instant whatever the size of the forest, the pages are shared by every process serving the same model, and
+#   predicting does not need scikit-learn: all trees are walked at once with NumPy, one level per step.
+# - Linear models (LinearRegression, Ridge, IncrementalLinear) are saved as their coefficients and intercept.
+# - Other models are pickled with joblib.
+# A meta.json file records the kind of model, the elements it forecasts and the year it forecasts from, which
+# serves as a check that queries have the right number of inputs.
+# Saving over an existing model writes the new version to a temporary directory and renames it into place, so models
+# already loaded from the old files keep predicting from them, consistently with their meta.
+
+# Usage:
+#   from wbs_forecast.persistence import save_model, load_model
+#   save_model(result.model, 'models/testing', prepared.data.columns, prepared.next_year)
+#   model = load_model('models/testing')
+#   model.predict(future_X)
+
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+META = 'meta.json'
+FOREST_ARRAYS = ('left', 'right', 'feature', 'threshold', 'value', 'roots')
+LINEAR_ARRAYS = ('coef', 'intercept')
+
+
+class FlatForest:
+    """Regression forest as flat node arrays, predicting like scikit-learn's forests"""
+
+    def __init__(self, left, right, feature, threshold, value, roots):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Flatten a fitted RandomForestRegressor or ExtraTreesRegressor"""
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        # Leaves have -1 as children; the others point into the concatenated arrays
+        left = np.concatenate([np.where(tree.children_left < 0, -1, tree.children_left + offset)
+                               for tree, offset in zip(trees, offsets)])
+        right = np.concatenate([np.where(tree.children_right < 0, -1, tree.children_right + offset)
+                                for tree, offset in zip(trees, offsets)])
+        feature = np.concatenate([np.maximum(tree.feature, 0) for tree in trees])
+        threshold = np.concatenate([tree.threshold for tree in trees])
+        value = np.concatenate([tree.value.reshape(tree.node_count, -1) for tree in trees])
+        return cls(left.astype(np.int64), right.astype(np.int64), feature.astype(np.int64), threshold, value,
+                   offsets[:-1].astype(np.int64))
+
+    def predict(self, X):
+        """Average of the trees' leaf values for each row of X"""
+        # scikit-learn compares float32 inputs with the thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        while True:
+            inner = self.left[node] >= 0
+            if not inner.any():
+                break
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(inner, np.where(go_left, self.left[node], self.right[node]), node)
+        return self.value[node].mean(axis=1)
+
+
+class FlatLinear:
+    """Linear model as its coefficients (inputs x outputs) and intercept"""
+
+    def __init__(self, coef, intercept):
+        self.coef = coef
+        self.intercept = intercept
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Coefficients of a fitted LinearRegression, Ridge or IncrementalLinear"""
+        coef = np.asarray(model.coef_, dtype=float)
+        # scikit-learn stores outputs x inputs; IncrementalLinear inputs x outputs
+        if not hasattr(model, 'partial_fit'):
+            coef = np.atleast_2d(coef).T
+        return cls(coef, np.atleast_1d(np.asarray(model.intercept_, dtype=float)))
+
+    def predict(self, X):
+        return np.atleast_2d(np.asarray(X, dtype=float)) @ self.coef + self.intercept
+
+
+class SavedModel:
+    """Model loaded by load_model: predict plus what meta.json records about it"""
+
+    def __init__(self, model, meta):
+        self.model = model
+        self.meta = meta
+        self.elements = meta.get('elements')
+
+    def predict(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        if self.elements is not None and X.shape[1] != len(self.elements):
+            raise ValueError(f'Expected {len(self.elements)} inputs per row, got {X.shape[1]}')
+        return np.asarray(self.model.predict(X))
+
+
+def _kind(model):
+    """How a model is saved: 'forest', 'linear' or 'joblib'"""
+    from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+    if isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+        return 'forest'
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_'):
+        return 'linear'
+    return 'joblib'
+
+
+def save_model(model, directory, elements=None, next_year=None):
+    """Save a fitted model to directory, with the elements it forecasts and the year it forecasts"""
+    directory = os.path.normpath(directory)
+    parent = os.path.dirname(directory) or '.'
+    os.makedirs(parent, exist_ok=True)
+    # Files are never rewritten in place: a model loaded earlier maps them, and would silently change (or, if they
+    # shrink, crash) under its stale meta. The new version is written to a sibling directory and renamed into place.
+    # Hidden names, so listings of the models directory (e.g. the service's) never show a partial version
+    staging = os.path.join(parent, f'.{os.path.basename(directory)}.tmp-{uuid.uuid4().hex[:8]}')
+    os.makedirs(staging)
+    try:
+        _write_model(model, staging, elements, next_year)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if os.path.exists(directory):
+        # Renaming the old version aside leaves its files alive for the models that still map them
+        retired = os.path.join(parent, f'.{os.path.basename(directory)}.old-{uuid.uuid4().hex[:8]}')
+        os.replace(directory, retired)
+        os.replace(staging, directory)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        os.replace(staging, directory)
+    return directory
+
+
+def _write_model(model, directory, elements, next_year):
+    kind = _kind(model)
+    if kind == 'forest':
+        flat = FlatForest.from_sklearn(model)
+        for name in FOREST_ARRAYS:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(flat, name))
+    elif kind == 'linear':
+        flat = FlatLinear.from_sklearn(model)
+        for name in LINEAR_ARRAYS:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(flat, name))
+    else:
+        import joblib
+        joblib.dump(model, os.path.join(directory, 'model.joblib'))
+    meta = {'kind': kind, 'class': type(model).__name__,
+            'elements': None if elements is None else [str(element) for element in elements],
+            'next_year': None if next_year is None else int(next_year)}
+    # meta.json is written last, so a directory with it holds a complete model
+    with open(os.path.join(directory, META), 'w') as f:
+        json.dump(meta, f, indent=1)
+
+
+def load_model(directory, mmap=True):
+    """Load a model saved by save_model; forest and linear arrays are memory-mapped unless mmap=False"""
+    with open(os.path.join(directory, META)) as f:
+        meta = json.load(f)
+    mode = 'r' if mmap else None
+    if meta['kind'] == 'forest':
+        model = FlatForest(*(np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mode)
+                             for name in FOREST_ARRAYS))
+    elif meta['kind'] == 'linear':
+        model = FlatLinear(*(np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mode)
+                             for name in LINEAR_ARRAYS))
+    else:
+        import joblib
+        model = joblib.load(os.path.join(directory, 'model.joblib'))
+    return SavedModel(model, meta)
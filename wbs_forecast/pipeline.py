@@ -0,0 +1,249 @@
+# Forecasting Pipeline
+
+# Explanation:
+# `Testing`, `Me`, `Other` and `Random Forrest` all run the same flow: load the workbook, transpose it so years are
+# rows, select the WBS elements 1.01 to 1.06, drop years with missing values, pair each year with the next one
+# (X = all years but the last, y = all years but the first), fit a model on a shuffled 80/20 split, report MAE and
+# R² on the test part and predict the year after the last one. They differ only in the model and in how they select
+# the elements. This module runs that flow once, for any number of models:
+# - Prepared data (the selected, transposed and cleaned years x elements frame) is cached on disk as Feather, keyed
+#   by the workbook's content hash and the selection, and kept in memory for the rest of the process, so several
+#   models share one load and one preparation.
+# - Models are looked up by name in MODELS; register_model adds more.
+# - VARIANTS reproduce the four scripts exactly, including their element order (which changes the trees a random
+#   forest grows) and Random Forrest's prefix match, which also selects children such as 1.01.001.
+
+# Usage:
+#   python -m wbs_forecast.pipeline your_file.xlsx --models random_forest linear ridge
+#   python -m wbs_forecast.pipeline your_file.xlsx --variants testing me other random_forrest
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from .ingest import add_sheet_argument, cache_dir, load_workbook, workbook_digest
+
+SELECTED_ELEMENTS = ('1.01', '1.02', '1.03', '1.04', '1.05', '1.06')
+RANDOM_STATE = 42
+
+
+def _random_forest(**params):
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(**dict({'n_estimators': 100, 'random_state': RANDOM_STATE}, **params))
+
+
+def _extra_trees(**params):
+    from sklearn.ensemble import ExtraTreesRegressor
+    return ExtraTreesRegressor(**dict({'n_estimators': 100, 'random_state': RANDOM_STATE}, **params))
+
+
+def _linear(**params):
+    from sklearn.linear_model import LinearRegression
+    return LinearRegression(**params)
+
+
+def _ridge(**params):
+    from sklearn.linear_model import Ridge
+    return Ridge(**params)
+
+
+def _gradient_boosting(**params):
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.multioutput import MultiOutputRegressor
+    # Gradient boosting predicts one target at a time
+    return MultiOutputRegressor(GradientBoostingRegressor(**dict({'random_state': RANDOM_STATE}, **params)))
+
+
+# Model factories by name; each takes keyword parameters that override its defaults
+MODELS = {
+    'random_forest': _random_forest,
+    'extra_trees': _extra_trees,
+    'linear': _linear,
+    'ridge': _ridge,
+    'gradient_boosting': _gradient_boosting,
+}
+
+# The four scripts: their model, how they match elements, and in which order the features end up
+VARIANTS = {
+    'testing': {'model': 'random_forest', 'match': 'exact', 'order': 'sheet'},
+    'me': {'model': 'random_forest', 'match': 'exact', 'order': 'selected'},
+    'other': {'model': 'linear', 'match': 'exact', 'order': 'selected'},
+    'random_forrest': {'model': 'random_forest', 'match': 'prefix', 'order': 'sheet'},
+}
+
+_prepared = {}
+
+
+def register_model(name, factory):
+    """Make a model factory available to the pipeline under name"""
+    MODELS[name] = factory
+
+
+def make_model(name, **params):
+    """New unfitted model by name"""
+    if name not in MODELS:
+        raise ValueError(f'Unknown model: {name} (choose from {", ".join(MODELS)})')
+    return MODELS[name](**params)
+
+
+class Prepared:
+    """Years x elements frame, without missing values, and the one-year-ahead pairs built from it"""
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def X(self):
+        """All years except the last"""
+        return self.data.iloc[:-1, :]
+
+    @property
+    def y(self):
+        """All years except the first: the year after each row of X"""
+        return self.data.iloc[1:, :]
+
+    @property
+    def future_X(self):
+        """The last year, input of the forecast"""
+        return self.data.iloc[-1:, :]
+
+    @property
+    def next_year(self):
+        """The year being forecast"""
+        return int(self.data.index[-1]) + 1
+
+
+class ForecastResult:
+    """Fitted model, its test-set scores and its forecast for the next year"""
+
+    def __init__(self, name, model, mae, r2, forecast, seconds):
+        self.name = name
+        self.model = model
+        self.mae = mae
+        self.r2 = r2
+        self.forecast = forecast
+        self.seconds = seconds
+
+
+def select_elements(available, elements=SELECTED_ELEMENTS, match='exact', order='selected'):
+    """Elements of a sheet (an Index of WBS numbers) to model, in the order the scripts put them"""
+    if elements is None:
+        return list(available)
+    if match == 'prefix':
+        return list(available[available.str.startswith(tuple(elements))])
+    if order == 'sheet':
+        wanted = set(elements)
+        return [element for element in available if element in wanted]
+    return [element for element in elements if element in available]
+
+
+def prepare(df, elements=SELECTED_ELEMENTS, match='exact', order='selected'):
+    """Transpose a workbook frame to years x elements, select elements and drop years with missing values"""
+    data = df.T
+    data.index = data.index.astype(int)
+    return data[select_elements(data.columns, elements, match, order)].dropna()
+
+
+def check_consecutive_years(data):
+    """Raise ValueError unless the years of a years x elements frame follow each other one by one
+
+    prepare drops years with missing values, so the year after a row is not always the next row.
+    """
+    years = [int(year) for year in data.index]
+    gaps = [(before, after) for before, after in zip(years, years[1:]) if after != before + 1]
+    if gaps:
+        listed = ', '.join(f'{before} to {after}' for before, after in gaps[:5])
+        raise ValueError(f'Years must be consecutive, but go from {listed} (years with missing costs are dropped)')
+
+
+def load_prepared(path, elements=SELECTED_ELEMENTS, match='exact', order='selected', sheet_name=0, cache=None):
+    """Prepared data for a workbook, from memory or the on-disk cache when the workbook has not changed"""
+    digest = workbook_digest(path, sheet_name, cache=cache)
+    options = [digest, sheet_name, None if elements is None else list(elements), match, order]
+    key = hashlib.sha256(json.dumps(options).encode()).hexdigest()[:24]
+    if key in _prepared:
+        return _prepared[key]
+    directory = os.path.join(cache_dir(cache), 'prepared')
+    os.makedirs(directory, exist_ok=True)
+    cached = os.path.join(directory, f'{key}.feather')
+    if os.path.exists(cached):
+        from pyarrow import feather
+        data = feather.read_table(cached, memory_map=True).to_pandas().set_index('year')
+    else:
+        data = prepare(load_workbook(path, sheet_name, cache=cache), elements, match, order)
+        data.rename_axis('year').reset_index().to_feather(cached, compression='uncompressed')
+    _prepared[key] = Prepared(data)
+    return _prepared[key]
+
+
+def fit_and_forecast(prepared, name, test_size=0.2, random_state=RANDOM_STATE, **params):
+    """Fit a model on a shuffled split, score it on the rest and forecast the next year, as the scripts do"""
+    import pandas as pd
+    from sklearn.metrics import mean_absolute_error, r2_score
+    from sklearn.model_selection import train_test_split
+    X, y = prepared.X, prepared.y
+    if len(X) == 0 or len(y) == 0:
+        raise ValueError("Not enough data available for training. Check missing values or data formatting.")
+    start = time.perf_counter()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+    model = make_model(name, **params)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    forecast = pd.DataFrame(model.predict(prepared.future_X), columns=prepared.data.columns,
+                            index=[prepared.next_year])
+    return ForecastResult(name, model, mean_absolute_error(y_test, y_pred), r2_score(y_test, y_pred), forecast,
+                          time.perf_counter() - start)
+
+
+def run_models(path, models, elements=SELECTED_ELEMENTS, match='exact', order='selected', sheet_name=0,
+               cache=None):
+    """Fit and score several models on one prepared copy of the workbook"""
+    prepared = load_prepared(path, elements, match, order, sheet_name, cache)
+    return [fit_and_forecast(prepared, name) for name in models]
+
+
+def run_variant(path, variant, sheet_name=0, cache=None):
+    """Run one of the four scripts' flows; returns (prepared data, ForecastResult)"""
+    options = VARIANTS[variant]
+    prepared = load_prepared(path, SELECTED_ELEMENTS, options['match'], options['order'], sheet_name, cache)
+    return prepared, fit_and_forecast(prepared, options['model'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fit forecast models on a WBS workbook and predict the next year')
+    parser.add_argument('path', help='workbook with WBS elements as rows and years as columns')
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), default=['random_forest', 'linear'])
+    parser.add_argument('--variants', nargs='+', choices=list(VARIANTS),
+                        help="run the scripts' flows instead of --models")
+    parser.add_argument('--elements', nargs='*', default=list(SELECTED_ELEMENTS),
+                        help='elements to model; none given means every element')
+    parser.add_argument('--prefix', action='store_true', help='select elements starting with the given numbers')
+    add_sheet_argument(parser)
+    parser.add_argument('--output', help='write every forecast to this .xlsx or .csv file')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.variants:
+        runs = [(variant, run_variant(args.path, variant, args.sheet)[1]) for variant in args.variants]
+    else:
+        elements = args.elements or None
+        match = 'prefix' if args.prefix else 'exact'
+        runs = [(result.name, result) for result in run_models(args.path, args.models, elements, match,
+                                                                sheet_name=args.sheet)]
+    print(f'{"run":<18} {"MAE":>12} {"R²":>8} {"fit (s)":>8}')
+    for label, result in runs:
+        print(f'{label:<18} {result.mae:12.2f} {result.r2:8.2f} {result.seconds:8.3f}')
+    print(f'Total: {time.perf_counter() - start:.2f} s')
+    if args.output:
+        import pandas as pd
+        forecasts = pd.concat({label: result.forecast for label, result in runs}, names=['run', 'year'])
+        if args.output.endswith('.csv'):
+            forecasts.to_csv(args.output)
+        else:
+            forecasts.to_excel(args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+# Prediction Service
+
+# Explanation:
+# A long-running local HTTP server that loads saved models (see persistence.py) once and answers forecast queries,
+# instead of retraining a model for every forecast as the scripts do.
+# - Models are the subdirectories of the models directory, loaded (memory-mapped) on their first query and kept;
+#   a model saved again (e.g. by `train`) is reloaded on its next query.
+# - POST /predict with {"model": "testing", "inputs": [[...], ...]} returns {"model", "year", "elements",
+#   "forecast"}: one forecast row per input row (a year of costs for the model's elements), so a query can batch
+#   any number of rows. GET /models lists the models and GET /health answers "ok".
+# - The server handles every connection in its own thread and keeps connections alive; Client reuses one
+#   connection, with Nagle's algorithm disabled on both ends so small queries are not delayed.
+
+# Usage:
+#   python -m wbs_forecast.service train your_file.xlsx --variants testing me other random_forrest
+#   python -m wbs_forecast.service serve --port 8765
+#   from wbs_forecast.service import Client
+#   Client('127.0.0.1', 8765).predict('testing', [[...]])
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from .ingest import add_sheet_argument, cache_dir
+from .persistence import META, load_model, save_model
+
+DEFAULT_PORT = 8765
+
+
+def models_dir(path=None):
+    """Directory of the saved models, by default in the cache directory"""
+    return path or os.path.join(cache_dir(), 'models')
+
+
+class ModelRegistry:
+    """Saved models of a directory, loaded on first use"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def names(self):
+        """Models available in the directory"""
+        if not os.path.isdir(self.directory):
+            return []
+        # Hidden directories are versions being saved or retired by save_model
+        return sorted(name for name in os.listdir(self.directory)
+                      if not name.startswith('.') and os.path.exists(os.path.join(self.directory, name, META)))
+
+    def _version(self, name):
+        """Identity of the saved version of a model (save_model renames a new directory, and meta.json, into place)"""
+        try:
+            info = os.stat(os.path.join(self.directory, name, META))
+        except FileNotFoundError:
+            return None
+        return info.st_ino, info.st_mtime_ns
+
+    def get(self, name):
+        """Loaded model by name, reloaded if it was saved again since; KeyError if there is none"""
+        version = self._version(name)
+        loaded = self._models.get(name)
+        # While a new version is renamed into place meta.json is briefly missing: keep serving the loaded one
+        if loaded is not None and (version is None or loaded[0] == version):
+            return loaded[1]
+        with self._lock:
+            loaded = self._models.get(name)
+            if loaded is None or (version is not None and loaded[0] != version):
+                if version is None or name not in self.names():
+                    raise KeyError(name)
+                self._models[name] = version, load_model(os.path.join(self.directory, name))
+            return self._models[name][1]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        registry = self.server.registry
+        if self.path == '/health':
+            self._reply(200, {'status': 'ok'})
+        elif self.path == '/models':
+            self._reply(200, {name: registry.get(name).meta for name in registry.names()})
+        else:
+            self._reply(404, {'error': f'Unknown path: {self.path}'})
+
+    def do_POST(self):
+        if self.path != '/predict':
+            self._reply(404, {'error': f'Unknown path: {self.path}'})
+            return
+        try:
+            query = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            model = self.server.registry.get(query['model'])
+            forecast = model.predict(query['inputs'])
+        except KeyError as error:
+            self._reply(404, {'error': f'Unknown model or missing field: {error}'})
+            return
+        except (ValueError, TypeError) as error:
+            self._reply(400, {'error': str(error)})
+            return
+        self._reply(200, {'model': query['model'], 'year': model.meta.get('next_year'),
+                          'elements': model.elements, 'forecast': forecast.tolist()})
+
+
+def make_server(directory=None, host='127.0.0.1', port=DEFAULT_PORT):
+    """HTTP server for the models of directory; call serve_forever() on it (port 0 picks a free port)"""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.registry = ModelRegistry(models_dir(directory))
+    return server
+
+
+class Client:
+    """Queries a prediction service over one kept-alive connection"""
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, timeout=30):
+        self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        self.connection.connect()
+        self.connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload)
+        self.connection.request(method, path, body, {'Content-Type': 'application/json'})
+        response = self.connection.getresponse()
+        reply = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f'{response.status}: {reply.get("error")}')
+        return reply
+
+    def predict(self, model, inputs):
+        """Forecast rows for rows of inputs"""
+        inputs = np.atleast_2d(np.asarray(inputs, dtype=float)).tolist()
+        return np.asarray(self._request('POST', '/predict', {'model': model, 'inputs': inputs})['forecast'])
+
+    def models(self):
+        return self._request('GET', '/models')
+
+    def close(self):
+        self.connection.close()
+
+
+def train(path, variants, directory=None, sheet_name=0):
+    """Fit the scripts' variants on a workbook and save their models under their names"""
+    from .pipeline import run_variant
+    directory = models_dir(directory)
+    for variant in variants:
+        prepared, result = run_variant(path, variant, sheet_name)
+        save_model(result.model, os.path.join(directory, variant), prepared.data.columns, prepared.next_year)
+        print(f'{variant}: MAE {result.mae:.2f}, R² {result.r2:.2f}, saved to {os.path.join(directory, variant)}')
+
+
+def main(argv=None):
+    from .pipeline import VARIANTS
+    parser = argparse.ArgumentParser(description='Save forecast models and serve their predictions')
+    commands = parser.add_subparsers(dest='command', required=True)
+    fit = commands.add_parser('train', help='fit and save the models of the scripts')
+    fit.add_argument('path', help='workbook with WBS elements as rows and years as columns')
+    fit.add_argument('--variants', nargs='+', choices=list(VARIANTS), default=list(VARIANTS))
+    fit.add_argument('--models-dir')
+    add_sheet_argument(fit)
+    run = commands.add_parser('serve', help='answer forecast queries over HTTP')
+    run.add_argument('--models-dir')
+    run.add_argument('--host', default='127.0.0.1')
+    run.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    if args.command == 'train':
+        train(args.path, args.variants, args.models_dir, args.sheet)
+        return
+    server = make_server(args.models_dir, args.host, args.port)
+    print(f'Serving {", ".join(server.registry.names()) or "no models"} on http://{args.host}:{args.port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+# Hyperparameter Tuning
+
+# Explanation:
+# `Testing`, `Me` and `Random Forrest` use RandomForestRegressor(n_estimators=100, random_state=42) untuned. tune
+# searches a grid of tree counts, depths and feature fractions (or, for the other models, the grid of GRIDS[model]:
+# ridge's alpha, gradient boosting's learning rate and depth, ...) with successive halving:
+# - Candidates are scored by their MAE on walk-forward folds (TimeSeriesSplit: each fold trains on the years before
+#   the ones it tests on), so the score does not leak future years into training as the shuffled split does.
+# - Every candidate is first scored on the most recent fold only; the best 1/factor of them are scored on factor
+#   times as many folds, and so on until the survivors have been scored on all the folds. Most fits are spent on
+#   the candidates still in the running.
+# - The fits of a round run in a pool of n_jobs processes, each of which receives the data once.
+# - Fold scores are cached on disk, keyed by a hash of the data, the model, its parameters and the fold, and so is
+#   the best model refitted on all the data. Folds scored in one round are not fitted again in the next, and a
+#   second search on the same data (e.g. with a larger grid) only fits what it has not seen before.
+
+# Usage:
+#   python -m wbs_forecast.tuning your_file.xlsx --jobs 4
+#   python -m wbs_forecast.tuning your_file.xlsx --jobs 4 --no-cache
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+from .ingest import add_sheet_argument, cache_dir
+from .pipeline import SELECTED_ELEMENTS, load_prepared, make_model
+
+DEFAULT_GRID = {
+    'n_estimators': [50, 100, 200, 400],
+    'max_depth': [None, 4, 8, 16],
+    'max_features': [1.0, 0.5, 'sqrt'],
+}
+# Grid searched for each model when tune is given none
+GRIDS = {
+    'random_forest': DEFAULT_GRID,
+    'extra_trees': DEFAULT_GRID,
+    'linear': {'fit_intercept': [True, False]},
+    'ridge': {'alpha': [0.01, 0.1, 1.0, 10.0, 100.0, 1000.0], 'fit_intercept': [True, False]},
+    'gradient_boosting': {'n_estimators': [50, 100, 200], 'learning_rate': [0.03, 0.1, 0.3], 'max_depth': [2, 3, 4]},
+}
+SCORES = 'scores.json'
+
+# Data of the worker processes, set once per process by _init_worker
+_X = _y = None
+
+
+def candidates(grid):
+    """Every combination of the grid's values, as parameter dictionaries"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def data_digest(data):
+    """SHA-256 of a DataFrame's values, index and column names"""
+    import pandas as pd
+    digest = hashlib.sha256(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    digest.update(json.dumps([str(column) for column in data.columns]).encode())
+    return digest.hexdigest()
+
+
+def _key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+class TuningCache:
+    """Fold scores and fitted models on disk, keyed by data, model and parameters"""
+
+    def __init__(self, directory=None):
+        self.directory = os.path.join(cache_dir(directory), 'tuning')
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            with open(os.path.join(self.directory, SCORES)) as f:
+                self.scores = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.scores = {}
+
+    def save(self):
+        """Write the scores, replacing the file atomically"""
+        temporary = os.path.join(self.directory, SCORES + '.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(self.scores, f)
+        os.replace(temporary, os.path.join(self.directory, SCORES))
+
+    def load_model(self, key):
+        """Cached fitted model, or None"""
+        path = os.path.join(self.directory, f'{key}.joblib')
+        if not os.path.exists(path):
+            return None
+        import joblib
+        return joblib.load(path)
+
+    def save_model(self, key, model):
+        import joblib
+        joblib.dump(model, os.path.join(self.directory, f'{key}.joblib'))
+
+
+class TuningResult:
+    """Best parameters, their model refitted on all the data, and every candidate's score"""
+
+    def __init__(self, best_params, best_mae, model, leaderboard, fits, cached, seconds):
+        self.best_params = best_params
+        self.best_mae = best_mae
+        self.model = model
+        self.leaderboard = leaderboard
+        self.fits = fits
+        self.cached = cached
+        self.seconds = seconds
+
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+
+
+def _fold_mae(task):
+    """MAE of a model trained on the pairs before train_end and tested on those up to test_end"""
+    name, params, train_end, test_end = task
+    model = make_model(name, **params)
+    model.fit(_X[:train_end], _y[:train_end])
+    return float(np.abs(model.predict(_X[train_end:test_end]) - _y[train_end:test_end]).mean())
+
+
+def tune(prepared, name='random_forest', grid=None, n_splits=5, factor=3, n_jobs=1, cache=None, use_cache=True):
+    """Successive-halving search of a model's parameters on walk-forward folds of prepared data"""
+    from sklearn.model_selection import TimeSeriesSplit
+    if grid is None and name not in GRIDS:
+        raise ValueError(f'No default grid for {name}; pass one (models with grids: {", ".join(GRIDS)})')
+    grid = grid or GRIDS[name]
+    start = time.perf_counter()
+    X, y = prepared.X.to_numpy(dtype=float), prepared.y.to_numpy(dtype=float)
+    folds = [(int(train[-1]) + 1, int(test[-1]) + 1) for train, test in TimeSeriesSplit(n_splits).split(X)]
+    digest = data_digest(prepared.data)
+    store = TuningCache(cache) if use_cache else None
+    scores = store.scores if store is not None else {}
+    fits = cached = 0
+
+    pool = None
+    if n_jobs == 1:
+        _init_worker(X, y)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        workers = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(X, y))
+    try:
+        survivors = candidates(grid)
+        # Every candidate's score on the most folds it was scored on
+        leaderboard = [{'params': params, 'folds': 0, 'mae': None} for params in survivors]
+        entries = list(leaderboard)
+        used = 1
+        while True:
+            # The most recent folds first: they train on the most years
+            round_folds = folds[-used:]
+            units = [(params, fold) for params in survivors for fold in round_folds]
+            keys = [_key(digest, name, params, fold) for params, fold in units]
+            missing = [(key, (name, params) + fold) for key, (params, fold) in zip(keys, units) if key not in scores]
+            cached += len(units) - len(missing)
+            fits += len(missing)
+            tasks = [task for _, task in missing]
+            results = pool.map(_fold_mae, tasks) if pool is not None else map(_fold_mae, tasks)
+            for (key, _), mae in zip(missing, results):
+                scores[key] = mae
+            mean_mae = [np.mean([scores[_key(digest, name, params, fold)] for fold in round_folds])
+                        for params in survivors]
+            for entry, mae in zip(entries, mean_mae):
+                entry.update(folds=len(round_folds), mae=float(mae))
+            order = np.argsort(mean_mae, kind='stable')
+            if used == len(folds) or len(survivors) == 1:
+                break
+            order = order[:max(1, math.ceil(len(order) / factor))]
+            survivors = [survivors[i] for i in order]
+            entries = [entries[i] for i in order]
+            used = min(used * factor, len(folds))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    best_params, best_mae = survivors[order[0]], entries[order[0]]['mae']
+    model_key = _key(digest, name, best_params, 'all')
+    model = store.load_model(model_key) if store is not None else None
+    if model is None:
+        model = make_model(name, **best_params)
+        model.fit(X, y)
+        fits += 1
+        if store is not None:
+            store.save_model(model_key, model)
+    else:
+        cached += 1
+    if store is not None:
+        store.save()
+    leaderboard.sort(key=lambda entry: (-entry['folds'], entry['mae']))
+    return TuningResult(best_params, best_mae, model, leaderboard, fits, cached, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tune a forecast model on a WBS workbook with successive halving')
+    parser.add_argument('path', help='workbook with WBS elements as rows and years as columns')
+    parser.add_argument('--model', choices=list(GRIDS), default='random_forest', help='searches GRIDS[model]')
+    parser.add_argument('--elements', nargs='*', default=list(SELECTED_ELEMENTS),
+                        help='elements to model; none given means every element')
+    parser.add_argument('--folds', type=int, default=5, help='walk-forward folds')
+    parser.add_argument('--factor', type=int, default=3, help='1/factor of the candidates survive each round')
+    parser.add_argument('--jobs', type=int, default=1, help='worker processes (-1: all)')
+    parser.add_argument('--no-cache', action='store_true', help='neither read nor write cached scores and models')
+    add_sheet_argument(parser)
+    args = parser.parse_args(argv)
+
+    prepared = load_prepared(args.path, args.elements or None, sheet_name=args.sheet)
+    result = tune(prepared, args.model, n_splits=args.folds, factor=args.factor, n_jobs=args.jobs,
+                  use_cache=not args.no_cache)
+    print(f'{"mae":>10} {"folds":>5}  parameters')
+    for entry in result.leaderboard[:10]:
+        print(f'{entry["mae"]:10.2f} {entry["folds"]:5d}  {entry["params"]}')
+    print(f'Best: {result.best_params} (MAE {result.best_mae:.2f})')
+    print(f'{result.fits} fits, {result.cached} from the cache, {result.seconds:.2f} s')
+    import pandas as pd
+    forecast = pd.DataFrame(result.model.predict(prepared.future_X.to_numpy(dtype=float)),
+                            columns=prepared.data.columns, index=[prepared.next_year])
+    print(f'Forecast for {prepared.next_year}:\n', forecast)
+
+
+if __name__ == '__main__':
+    main()